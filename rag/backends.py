@@ -0,0 +1,164 @@
+import logging
+import platform
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+# torch, transformers and sentence-transformers are imported where they are
+# used, so importing rag modules stays cheap for commands that never load a
+# model.
+
+logger = logging.getLogger(__name__)
+
+# "torch" = fp32 PyTorch, "int8" = dynamic int8 quantization of Linear
+# layers, "bf16" = bfloat16 weights, "onnx" = ONNX Runtime via optimum
+BACKENDS = ("torch", "int8", "bf16", "onnx")
+
+
+def _check_backend(backend: str) -> None:
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown backend: {backend} (expected one of {BACKENDS})"
+        )
+
+
+def cpu_supports_bf16() -> bool:
+    """
+    True if the CPU has native bf16 instructions (AVX512-BF16 or AMX).
+    Elsewhere bf16 is emulated and slower than fp32.
+    """
+    if platform.system() != "Linux":
+        return False
+
+    cpuinfo = Path("/proc/cpuinfo")
+    if not cpuinfo.exists():
+        return False
+
+    flags = cpuinfo.read_text(encoding="utf-8", errors="ignore")
+    return "avx512_bf16" in flags or "amx_bf16" in flags
+
+
+def quantize_int8(model: "torch.nn.Module") -> "torch.nn.Module":
+    """Dynamic int8 quantization of all Linear layers (CPU only)."""
+    import torch
+
+    return torch.ao.quantization.quantize_dynamic(
+        model,
+        {torch.nn.Linear},
+        dtype=torch.qint8,
+    )
+
+
+def load_generation_model(
+    model_name: str,
+    *,
+    is_encoder_decoder: bool,
+    backend: str = "torch",
+) -> tuple[Any, str]:
+    """
+    Load a generation model on the requested CPU backend, falling back to
+    fp32 torch when it is unavailable (missing optional dependency, CPU
+    without bf16, failed export or quantization).
+
+    Returns (model, backend actually used).
+    """
+    _check_backend(backend)
+
+    if backend == "onnx":
+        try:
+            # Optional dependency: pip install "optimum[onnxruntime]"
+            from optimum.onnxruntime import (
+                ORTModelForCausalLM,
+                ORTModelForSeq2SeqLM,
+            )
+
+            ort_cls = (
+                ORTModelForSeq2SeqLM
+                if is_encoder_decoder
+                else ORTModelForCausalLM
+            )
+            return ort_cls.from_pretrained(model_name, export=True), "onnx"
+        except Exception as exc:
+            logger.warning(
+                "ONNX Runtime backend unavailable (%s); falling back to torch",
+                exc,
+            )
+
+    import torch
+    from transformers import AutoModelForCausalLM, AutoModelForSeq2SeqLM
+
+    model_cls = (
+        AutoModelForSeq2SeqLM if is_encoder_decoder else AutoModelForCausalLM
+    )
+
+    if backend == "bf16":
+        if cpu_supports_bf16():
+            try:
+                model = model_cls.from_pretrained(
+                    model_name,
+                    torch_dtype=torch.bfloat16,
+                )
+                return model.eval(), "bf16"
+            except Exception as exc:
+                logger.warning(
+                    "bf16 load failed (%s); falling back to torch", exc
+                )
+        else:
+            logger.warning("CPU has no native bf16; falling back to torch")
+
+    model = model_cls.from_pretrained(model_name).eval()
+
+    if backend == "int8":
+        try:
+            return quantize_int8(model), "int8"
+        except Exception as exc:
+            logger.warning(
+                "int8 quantization failed (%s); falling back to torch", exc
+            )
+
+    return model, "torch"
+
+
+def load_sentence_transformer(
+    model_name: str,
+    *,
+    backend: str = "torch",
+) -> tuple["SentenceTransformer", str]:
+    """
+    SentenceTransformer counterpart of `load_generation_model`.
+    ONNX needs sentence-transformers >= 3.2 with optimum installed.
+    """
+    _check_backend(backend)
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "onnx":
+        try:
+            return SentenceTransformer(model_name, backend="onnx"), "onnx"
+        except Exception as exc:
+            logger.warning(
+                "ONNX Runtime backend unavailable (%s); falling back to torch",
+                exc,
+            )
+
+    model = SentenceTransformer(model_name)
+    model.eval()
+
+    if backend == "bf16":
+        if cpu_supports_bf16():
+            return model.to(torch.bfloat16), "bf16"
+        logger.warning("CPU has no native bf16; falling back to torch")
+
+    if backend == "int8":
+        try:
+            return quantize_int8(model), "int8"
+        except Exception as exc:
+            logger.warning(
+                "int8 quantization failed (%s); falling back to torch", exc
+            )
+
+    return model, "torch"
@@ -6,6 +6,45 @@ class Settings(BaseSettings):
     project_root: Path = Path(__file__).resolve().parents[1]
     data_raw_dir: Path = project_root / "data" / "raw"
     data_processed_dir: Path = project_root / "data" / "processed"
+    embedding_cache_dir: Path = data_processed_dir / "embedding_cache"
+    lexical_index_dir: Path = data_processed_dir / "lexical_index"
+
+    # Ingestion
+    ingest_workers: int = 1
+    ingest_pages_per_task: int = 32
+
+    # Vector index ("flat", "sq8", "fp16", "ivf_flat", "ivf_sq8", "ivf_pq",
+    # "hnsw")
+    vector_index_type: str = "flat"
+    index_train_sample: int = 100_000
+    ivf_nlist: int = 1024
+    ivf_nprobe: int = 16
+    pq_m: int = 16
+    pq_nbits: int = 8
+    hnsw_m: int = 32
+    hnsw_ef_construction: int = 200
+    hnsw_ef_search: int = 64
+
+    # Sharding: chunks per shard (0 = single index), shards opened on first
+    # use, fan-out search threads (0 = cpu_count)
+    vector_shard_size: int = 0
+    vector_shard_lazy: bool = True
+    vector_search_threads: int = 0
+
+    # Hybrid retrieval: fuse BM25 with dense results by reciprocal rank
+    # fusion when the lexical index exists (hybrid_candidates 0 = 2 * k)
+    hybrid_search: bool = True
+    rrf_k: int = 60
+    hybrid_candidates: int = 0
+
+    # Cross-encoder reranking of retrieval_k candidates down to context_k.
+    # rerank_early_exit_score (model logits) stops scoring once context_k
+    # candidates reach it; None scores them all.
+    rerank_enabled: bool = False
+    reranker_model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    rerank_batch_size: int = 32
+    rerank_cache_size: int = 4096
+    rerank_early_exit_score: float | None = None
 
     # Logging
     log_level: str = "INFO"
@@ -15,6 +54,45 @@ class Settings(BaseSettings):
     #llm_model_name: str = "TinyLlama/TinyLlama-1.1B-Chat-v1.0"
     llm_model_name: str = "Qwen/Qwen2.5-0.5B-Instruct"
 
+    # CPU inference backends ("torch", "int8", "bf16", "onnx"); unsupported
+    # ones fall back to "torch". "onnx" needs optimum[onnxruntime].
+    embedding_backend: str = "torch"
+    llm_backend: str = "torch"
+
+    # Max context tokens in a prompt (0 = fill up to the LLM's window)
+    context_token_budget: int = 0
+
+    # Relevance floor on dense retrieval scores (cosine). Chunks below it
+    # are not sent to the LLM; if none pass, the answer is "Not found"
+    # without generation. None = no floor.
+    min_relevance_score: float | None = None
+
+    # Reuse the KV cache of the constant QA prompt preamble (causal LLMs)
+    llm_prefix_cache: bool = True
+
+    # Caches: query-embedding LRU and persistent answer cache
+    query_cache_size: int = 1024
+    answer_cache_enabled: bool = True
+    answer_cache_path: Path = data_processed_dir / "answer_cache.sqlite3"
+    answer_cache_max_mb: int = 256
+
+    # Evaluation: data-parallel generation processes
+    eval_workers: int = 1
+    eval_threads_per_worker: int = 0  # 0 = cpu_count // eval_workers
+
+    # Serving: dynamic batching of concurrent generation requests
+    llm_max_batch_size: int = 8
+    llm_batch_wait_ms: float = 10.0
+
+    # Async pipeline: threads per stage, requests admitted at once (others
+    # wait), generations in flight (0 = 2 * llm_max_batch_size), request
+    # timeout in seconds (None = no timeout)
+    async_embed_workers: int = 2
+    async_search_workers: int = 4
+    async_max_pending: int = 64
+    async_max_generating: int = 0
+    async_request_timeout_s: float | None = None
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _model_dirname(model_name: str, backend: str) -> str:
+    name = model_name.replace("/", "__")
+    # Quantized and reduced-precision backends produce different vectors
+    return name if backend == "torch" else f"{name}@{backend}"
+
+
+class EmbeddingCache:
+    """
+    Content-addressed, append-only embedding cache for one embedding model
+    on one inference backend (see rag.backends).
+
+    Layout (per model and backend directory):
+    - vectors.f32 : raw float32 rows, memory-mapped on read
+    - keys.txt    : sha1 of the source text, one per line, in row order
+    - meta.json   : model name, backend and vector dimension
+
+    A directory whose meta.json names another model or backend is
+    discarded and the cache starts empty.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        model_name: str,
+        *,
+        backend: str = "torch",
+    ) -> None:
+        self.model_name = model_name
+        self.backend = backend
+        self.path = root / _model_dirname(model_name, backend)
+        self.vectors_path = self.path / "vectors.f32"
+        self.keys_path = self.path / "keys.txt"
+        self.meta_path = self.path / "meta.json"
+
+        self.dimension: int | None = None
+        self._rows: dict[str, int] = {}
+        self._vectors: np.memmap | None = None
+
+        self._load()
+
+    def _load(self) -> None:
+        if not (
+            self.meta_path.exists()
+            and self.keys_path.exists()
+            and self.vectors_path.exists()
+        ):
+            return
+
+        with self.meta_path.open("r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        # Caches written before backends were recorded are fp32 torch
+        owner = (meta.get("model_name"), meta.get("backend", "torch"))
+        if owner != (self.model_name, self.backend):
+            logger.warning(
+                "Embedding cache at %s belongs to %s (%s); starting afresh",
+                self.path,
+                *owner,
+            )
+            self._clear()
+            return
+
+        self.dimension = int(meta["dimension"])
+
+        with self.keys_path.open("r", encoding="utf-8") as f:
+            keys = [line.strip() for line in f if line.strip()]
+
+        # A crash between the two appends can leave one file longer than
+        # the other; only trust rows present in both.
+        row_bytes = self.dimension * np.dtype("float32").itemsize
+        stored_bytes = self.vectors_path.stat().st_size
+        stored_rows = min(stored_bytes // row_bytes, len(keys))
+        if stored_bytes != len(keys) * row_bytes:
+            keys = keys[:stored_rows]
+            self._repair(keys, row_bytes)
+
+        self._rows = {key: row for row, key in enumerate(keys)}
+        self._open_vectors(len(keys))
+
+    def _clear(self) -> None:
+        for path in (self.vectors_path, self.keys_path, self.meta_path):
+            path.unlink(missing_ok=True)
+
+    def _repair(self, keys: list[str], row_bytes: int) -> None:
+        logger.warning(
+            "Embedding cache at %s is inconsistent; truncating to %d rows",
+            self.path,
+            len(keys),
+        )
+        with self.vectors_path.open("r+b") as f:
+            f.truncate(len(keys) * row_bytes)
+        with self.keys_path.open("w", encoding="utf-8") as f:
+            f.writelines(key + "\n" for key in keys)
+
+    def _open_vectors(self, num_rows: int) -> None:
+        if num_rows == 0 or self.dimension is None:
+            self._vectors = None
+            return
+
+        self._vectors = np.memmap(
+            self.vectors_path,
+            dtype="float32",
+            mode="r",
+            shape=(num_rows, self.dimension),
+        )
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    def fill(self, keys: list[str], out: np.ndarray) -> np.ndarray:
+        """
+        Copy cached vectors for keys into the matching rows of out (shape
+        (len(keys), dimension)) with one gather from the memory map.
+        Returns a boolean mask of the rows that were found.
+        """
+        rows = np.fromiter(
+            (self._rows.get(key, -1) for key in keys),
+            dtype="int64",
+            count=len(keys),
+        )
+        found = rows >= 0
+        if self._vectors is not None and found.any():
+            out[found] = self._vectors[rows[found]]
+        return found
+
+    def put(self, keys: list[str], vectors: np.ndarray) -> None:
+        """
+        Append new vectors to the cache. Keys already present are skipped.
+        """
+        vectors = np.asarray(vectors, dtype="float32")
+        if len(keys) != len(vectors):
+            raise ValueError("keys and vectors must have the same length")
+
+        new_rows = [
+            i for i, key in enumerate(keys)
+            if key not in self._rows
+        ]
+        if not new_rows:
+            return
+
+        if self.dimension is None:
+            self.dimension = int(vectors.shape[1])
+            self.path.mkdir(parents=True, exist_ok=True)
+            with self.meta_path.open("w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "model_name": self.model_name,
+                        "backend": self.backend,
+                        "dimension": self.dimension,
+                    },
+                    f,
+                )
+        elif vectors.shape[1] != self.dimension:
+            raise ValueError(
+                f"Vector dimension {vectors.shape[1]} does not match "
+                f"cache dimension {self.dimension}"
+            )
+
+        # Release the read-only map before growing the file
+        self._vectors = None
+
+        with self.vectors_path.open("ab") as vf, \
+                self.keys_path.open("a", encoding="utf-8") as kf:
+            for i in new_rows:
+                key = keys[i]
+                if key in self._rows:
+                    continue
+                vf.write(vectors[i].tobytes())
+                kf.write(key + "\n")
+                self._rows[key] = len(self._rows)
+
+        self._open_vectors(len(self._rows))
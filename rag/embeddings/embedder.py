@@ -1,20 +1,148 @@
-from sentence_transformers import SentenceTransformer
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from rag.backends import load_sentence_transformer
+from rag.embeddings.cache import EmbeddingCache, text_hash
+
+# Texts per encode() call in embed_texts
+_ENCODE_SLICE = 4096
+
+
+def normalize_question(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
 
 class Embedder:
     """
     Local CPU embedding wrapper.
     Model is auto-downloaded on first use.
+
+    With a cache_dir, text embeddings are cached on disk per model and
+    backend actually in use, and only texts missing from it are encoded.
+    Query embeddings are kept in an in-memory LRU (query_cache_size
+    entries) keyed by the normalized question text.
+
+    backend selects the CPU inference backend (see rag.backends); the one
+    actually in use is exposed as `self.backend`.
     """
 
-    def __init__(self, model_name: str) -> None:
-        self.model = SentenceTransformer(model_name)
+    def __init__(
+        self,
+        model_name: str,
+        *,
+        cache_dir: Path | None = None,
+        query_cache_size: int = 0,
+        backend: str = "torch",
+    ) -> None:
+        self.model_name = model_name
+        self.model, self.backend = load_sentence_transformer(
+            model_name,
+            backend=backend,
+        )
+        self.dimension = self.model.get_sentence_embedding_dimension()
+        self.cache = (
+            EmbeddingCache(cache_dir, model_name, backend=self.backend)
+            if cache_dir is not None
+            else None
+        )
+
+        self.query_cache_size = query_cache_size
+        self._query_cache: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._query_lock = threading.Lock()
 
-    def embed_texts(self, texts: list[str]) -> list[list[float]]:
-        return self.model.encode(
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        embeddings = self.model.encode(
             texts,
             normalize_embeddings=True,
             show_progress_bar=False,
-        ).tolist()
+            convert_to_tensor=True,
+        )
+        # bf16 outputs have no NumPy dtype; FAISS and the cache want float32
+        return embeddings.float().cpu().numpy()
+
+    def _encode_into(self, texts: list[str], out: np.ndarray) -> None:
+        # Encode in slices so only one slice of intermediate tensors is
+        # alive next to the output array
+        for start in range(0, len(texts), _ENCODE_SLICE):
+            stop = start + _ENCODE_SLICE
+            out[start:stop] = self._encode(texts[start:stop])
+
+    def embed_texts(self, texts: list[str]) -> np.ndarray:
+        """
+        Embed texts into a float32 array of shape (len(texts), dimension).
+        """
+        out = np.empty((len(texts), self.dimension), dtype="float32")
+        if not texts:
+            return out
+
+        if self.cache is None:
+            self._encode_into(texts, out)
+            return out
+
+        keys = [text_hash(t) for t in texts]
+        found = self.cache.fill(keys, out)
+
+        missing: dict[str, str] = {}
+        for key, text, hit in zip(keys, texts, found):
+            if not hit and key not in missing:
+                missing[key] = text
+
+        if missing:
+            miss_vectors = np.empty(
+                (len(missing), self.dimension), dtype="float32"
+            )
+            self._encode_into(list(missing.values()), miss_vectors)
+            self.cache.put(list(missing), miss_vectors)
+
+            position = {key: i for i, key in enumerate(missing)}
+            miss_rows = np.flatnonzero(~found)
+            out[miss_rows] = miss_vectors[
+                [position[keys[row]] for row in miss_rows]
+            ]
+
+        return out
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self.embed_queries([text])[0]
+
+    def embed_queries(self, texts: list[str]) -> np.ndarray:
+        """
+        Embed questions, serving repeats from the query LRU and encoding
+        the misses in one batch. Returns a (len(texts), dimension) array.
+        """
+        if not texts:
+            return np.empty((0, self.dimension), dtype="float32")
+        if self.query_cache_size <= 0:
+            return self._encode(texts)
+
+        keys = [normalize_question(t) for t in texts]
+        found: dict[str, np.ndarray] = {}
+
+        with self._query_lock:
+            for key in keys:
+                vector = self._query_cache.get(key)
+                if vector is not None:
+                    self._query_cache.move_to_end(key)
+                    found[key] = vector
+
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+
+        if missing:
+            vectors = self._encode(list(missing.values()))
+            with self._query_lock:
+                for key, vector in zip(missing, vectors):
+                    found[key] = vector
+                    self._query_cache[key] = vector
+                    self._query_cache.move_to_end(key)
+                while len(self._query_cache) > self.query_cache_size:
+                    self._query_cache.popitem(last=False)
 
-    def embed_query(self, text: str) -> list[float]:
-        return self.embed_texts([text])[0]
\ No newline at end of file
+        # Stack copies so callers cannot mutate cached vectors
+        return np.stack([found[key] for key in keys])
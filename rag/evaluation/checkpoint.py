@@ -0,0 +1,119 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+from rag.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Settings, besides the run's own arguments, that change its answers
+ANSWER_SETTINGS = (
+    "embedding_backend",
+    "llm_backend",
+    "hybrid_search",
+    "rrf_k",
+    "hybrid_candidates",
+    "rerank_enabled",
+    "reranker_model_name",
+    "rerank_early_exit_score",
+    "min_relevance_score",
+    "context_token_budget",
+)
+
+
+def answer_settings() -> dict[str, Any]:
+    """Current values of ANSWER_SETTINGS, for a checkpoint's run_config."""
+    return {name: getattr(settings, name) for name in ANSWER_SETTINGS}
+
+
+class EvaluationCheckpoint:
+    """
+    Append-only JSONL log of answered rows for one evaluation run.
+
+    The first line is a header describing the run (models, k values, ...);
+    every following line is {"row", "answer", "seconds"}. Each record is
+    flushed and fsynced, so at most the question in flight is lost on a
+    crash. A torn final line is ignored on load.
+    """
+
+    def __init__(self, path: Path, run_config: dict[str, Any]) -> None:
+        self.path = path
+        self.run_config = run_config
+        self._file = None
+
+    def load(self) -> dict[int, dict[str, Any]]:
+        """
+        Return answered rows keyed by row index. Raises if the checkpoint
+        was written for a different run configuration.
+        """
+        if not self.path.exists():
+            return {}
+
+        records: dict[int, dict[str, Any]] = {}
+
+        with self.path.open("r", encoding="utf-8") as f:
+            lines = f.readlines()
+
+        for line_number, line in enumerate(lines):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                if line_number == len(lines) - 1:
+                    logger.warning("Ignoring incomplete last checkpoint line")
+                    continue
+                raise
+
+            if line_number == 0:
+                if record.get("run") != self.run_config:
+                    raise ValueError(
+                        f"Checkpoint {self.path} belongs to a different run: "
+                        f"{record.get('run')}"
+                    )
+                continue
+
+            records[int(record["row"])] = record
+
+        return records
+
+    def open(self, *, resume: bool) -> None:
+        """
+        Start appending. Without resume any existing checkpoint is replaced.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        if resume and self.path.exists():
+            self._drop_torn_tail()
+            if self.path.stat().st_size > 0:
+                self._file = self.path.open("a", encoding="utf-8")
+                return
+
+        self._file = self.path.open("w", encoding="utf-8")
+        self._write({"run": self.run_config})
+
+    def _drop_torn_tail(self) -> None:
+        # A crash mid-write leaves a line without its newline; cut it so
+        # new records do not get glued onto it.
+        with self.path.open("r+b") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def append(self, row: int, answer: str, seconds: float) -> None:
+        self._write(
+            {"row": row, "answer": answer, "seconds": round(seconds, 3)}
+        )
+
+    def _write(self, record: dict[str, Any]) -> None:
+        if self._file is None:
+            raise RuntimeError("Checkpoint is not open")
+
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,138 @@
+import logging
+import multiprocessing as mp
+import os
+import queue
+import time
+from collections.abc import Iterator
+
+from rag.config import settings
+from rag.generation.llm import LocalLLM
+from rag.generation.prompts import QA_PROMPT_PREFIX
+from rag.logging_config import configure_logging
+
+logger = logging.getLogger(__name__)
+
+# (row, prompt)
+Task = tuple[int, str]
+# (row, answer, answer-cache model key of the worker's LLM, seconds, error)
+Result = tuple[int, str, str | None, float, str | None]
+
+
+def default_threads_per_worker(workers: int) -> int:
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+def _worker_main(
+    model_name: str,
+    num_threads: int,
+    max_new_tokens: int,
+    tasks: "mp.Queue[Task | None]",
+    results: "mp.Queue[Result]",
+) -> None:
+    """
+    Generation worker: loads its own LLM pinned to num_threads intra-op
+    threads, then answers tasks until it receives None.
+    Only finished prompts are shipped in; retrieval, prompt building and
+    the answer cache stay in the parent.
+    """
+    import torch
+
+    configure_logging()
+    torch.set_num_threads(num_threads)
+
+    llm = LocalLLM(
+        model_name=model_name,
+        backend=settings.llm_backend,
+        prompt_prefix=QA_PROMPT_PREFIX if settings.llm_prefix_cache else None,
+    )
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+
+        row, prompt = task
+        started = time.perf_counter()
+        try:
+            answer = llm.generate(
+                prompt,
+                max_new_tokens=max_new_tokens,
+            ).strip()
+            results.put(
+                (
+                    row,
+                    answer,
+                    llm.cache_key,
+                    time.perf_counter() - started,
+                    None,
+                )
+            )
+        except Exception as exc:
+            results.put((row, "", None, 0.0, str(exc)))
+
+
+def generate_parallel(
+    tasks: list[Task],
+    *,
+    model_name: str,
+    workers: int,
+    threads_per_worker: int,
+    max_new_tokens: int,
+) -> Iterator[Result]:
+    """
+    Start `workers` generation processes fed from one work queue and yield
+    results as they complete (in completion order). Rows whose worker died
+    are reported with an error.
+    """
+    ctx = mp.get_context("spawn")
+    task_queue: "mp.Queue[Task | None]" = ctx.Queue()
+    result_queue: "mp.Queue[Result]" = ctx.Queue()
+
+    for task in tasks:
+        task_queue.put(task)
+    for _ in range(workers):
+        task_queue.put(None)
+
+    processes = [
+        ctx.Process(
+            target=_worker_main,
+            args=(
+                model_name,
+                threads_per_worker,
+                max_new_tokens,
+                task_queue,
+                result_queue,
+            ),
+            name=f"rag-eval-worker-{i}",
+            daemon=True,
+        )
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    logger.info(
+        "Started %d generation workers x %d threads",
+        workers,
+        threads_per_worker,
+    )
+
+    pending = {row for row, _prompt in tasks}
+    try:
+        while pending:
+            try:
+                result = result_queue.get(timeout=1.0)
+            except queue.Empty:
+                if not any(p.is_alive() for p in processes):
+                    for row in sorted(pending):
+                        yield (row, "", None, 0.0, "worker process exited")
+                    return
+                continue
+
+            pending.discard(result[0])
+            yield result
+    finally:
+        for process in processes:
+            process.join(timeout=5.0)
+            if process.is_alive():
+                process.terminate()
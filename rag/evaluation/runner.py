@@ -1,23 +1,31 @@
-import json
+import gc
 import logging
-from pathlib import Path
+import time
+from collections.abc import Callable
 from typing import Any
 
 from rag.config import settings
 from rag.embeddings.embedder import Embedder
-from rag.generation.context_builder import build_context
-from rag.generation.llm import LocalLLM
-from rag.generation.prompts import grounded_qa_prompt
-from rag.retrieval.store import FaissVectorStore
+from rag.evaluation.parallel import (
+    default_threads_per_worker,
+    generate_parallel,
+)
+from rag.generation.answer_cache import AnswerCache
+from rag.generation.context_builder import (
+    PromptLLM,
+    build_grounded_prompt,
+)
+from rag.generation.llm import LocalLLM, PromptTokenizer, answer_cache_key
+from rag.generation.prompts import NOT_FOUND_ANSWER, QA_PROMPT_PREFIX
+from rag.ingestion.serializer import load_chunk_texts
+from rag.models import SearchResult
+from rag.retrieval.hybrid import HybridSearcher
+from rag.retrieval.rerank import load_reranker
+from rag.retrieval.sharded import load_vector_store
 
 
-def _load_chunk_texts(chunks_path: Path) -> dict[str, str]:
-    chunk_map: dict[str, str] = {}
-    with chunks_path.open("r", encoding="utf-8") as f:
-        for line in f:
-            rec = json.loads(line)
-            chunk_map[rec["id"]] = rec["text"]
-    return chunk_map
+# on_answer(row, answer, seconds), row being the 0-based question index
+AnswerCallback = Callable[[int, str, float], None]
 
 
 class EvaluationRunner:
@@ -32,6 +40,8 @@ class EvaluationRunner:
         retrieval_k: int,
         context_k: int,
         max_new_tokens: int,
+        llm_model_name: str | None = None,
+        load_llm: bool = True,
     ) -> None:
         self.retrieval_k = retrieval_k
         self.context_k = context_k
@@ -44,48 +54,173 @@ class EvaluationRunner:
             raise FileNotFoundError(
                 "Vector store not found. Run `python scripts/embed.py` first."
             )
-        if not self.chunks_path.exists():
-            raise FileNotFoundError(
-                "chunks.jsonl not found. Run `python scripts/chunk.py` first."
-            )
 
         # Load heavy assets once
-        self.embedder = Embedder(model_name=settings.embedding_model_name)
-        self.store = FaissVectorStore.load(self.store_path)
-        self.chunk_texts = _load_chunk_texts(self.chunks_path)
-        self.llm = LocalLLM(model_name=settings.llm_model_name)
+        self.embedder = Embedder(
+            model_name=settings.embedding_model_name,
+            backend=settings.embedding_backend,
+            query_cache_size=settings.query_cache_size,
+        )
+        self.store = load_vector_store(self.store_path)
+        self.searcher = HybridSearcher.from_settings(self.store)
+        self.reranker = load_reranker()
 
-    def answer_one(self, question: str) -> str:
-        # Retrieval (breadth)
-        qvec = self.embedder.embed_query(question)
-        retrieved = self.store.search(qvec, k=self.retrieval_k)
+        # Stores saved with a chunk store serve text directly
+        self.chunk_texts: dict[str, str] = {}
+        if not self.store.has_texts:
+            if not self.chunks_path.exists():
+                raise FileNotFoundError(
+                    "chunks.jsonl not found. Run `python scripts/chunk.py` first."
+                )
+            self.chunk_texts = load_chunk_texts(self.chunks_path)
+
+        self.llm: LocalLLM | None = None
+        if load_llm:
+            self.load_llm(llm_model_name or settings.llm_model_name)
 
-        # Context selection (precision)
-        context, _sources = build_context(
+        self.answer_cache = (
+            AnswerCache(
+                settings.answer_cache_path,
+                max_bytes=settings.answer_cache_max_mb * 1024 * 1024,
+            )
+            if settings.answer_cache_enabled
+            else None
+        )
+
+    def load_llm(self, model_name: str) -> None:
+        """
+        Load (or switch to) an LLM, freeing the previous one first so only
+        one set of weights is resident at a time.
+        """
+        self.unload_llm()
+        self.llm = LocalLLM(
+            model_name=model_name,
+            backend=settings.llm_backend,
+            prompt_prefix=(
+                QA_PROMPT_PREFIX if settings.llm_prefix_cache else None
+            ),
+        )
+
+    def unload_llm(self) -> None:
+        if self.llm is not None:
+            self.llm = None
+            gc.collect()
+
+    def close(self) -> None:
+        self.unload_llm()
+        if self.answer_cache is not None:
+            self.answer_cache.close()
+        self.store.close()
+
+    def _build_prompt(
+        self,
+        question: str,
+        retrieved: list[SearchResult],
+        *,
+        llm: PromptLLM | None = None,
+    ) -> str | None:
+        """
+        Prompt for the question, or None when no chunk passes the
+        relevance floor (answered with NOT_FOUND_ANSWER, no generation).
+        llm sizes the context and defaults to the loaded LLM.
+        """
+        # Context selection (precision), sized to fit the LLM window
+        prompt, sources = build_grounded_prompt(
+            question,
             retrieved,
             self.chunk_texts,
+            llm=llm or self.llm,
             context_k=self.context_k,
+            max_new_tokens=self.max_new_tokens,
+            token_cap=settings.context_token_budget,
+            min_score=settings.min_relevance_score,
+        )
+        return prompt if sources else None
+
+    def answer_one(self, question: str) -> str:
+        # Retrieval (breadth)
+        qvec = self.embedder.embed_query(question)
+        retrieved = self.searcher.search(
+            question,
+            qvec,
+            k=self.retrieval_k,
         )
+        if self.reranker is not None:
+            retrieved = self.reranker.rerank(
+                question,
+                retrieved,
+                top_k=self.context_k,
+                chunk_texts=self.chunk_texts,
+            )
 
-        prompt = grounded_qa_prompt(context, question)
-        return self.llm.generate(
+        prompt = self._build_prompt(question, retrieved)
+        if prompt is None:
+            return NOT_FOUND_ANSWER
+
+        cached = self._cached_answer(prompt)
+        if cached is not None:
+            return cached
+
+        answer = self.llm.generate(
             prompt,
             max_new_tokens=self.max_new_tokens,
         ).strip()
+        self._store_answer(prompt, answer)
+        return answer
+
+    def _cached_answer(self, prompt: str) -> str | None:
+        if self.answer_cache is None:
+            return None
+        return self.answer_cache.get(
+            self.llm.cache_key,
+            prompt,
+            self.max_new_tokens,
+        )
+
+    def _store_answer(self, prompt: str, answer: str) -> None:
+        if self.answer_cache is not None:
+            self.answer_cache.put(
+                self.llm.cache_key,
+                prompt,
+                self.max_new_tokens,
+                answer,
+            )
+
+    def run(
+        self,
+        questions: list[str],
+        *,
+        done: dict[int, str] | None = None,
+        on_answer: AnswerCallback | None = None,
+    ) -> list[str]:
+        """
+        Answer questions one by one.
 
-    def run(self, questions: list[str]) -> list[str]:
+        Rows in `done` (0-based index -> answer) are not recomputed.
+        `on_answer(row, answer, seconds)` is called for every newly answered
+        row; failed rows are not reported so a resumed run retries them.
+        """
         logger = logging.getLogger(__name__)
 
+        done = done or {}
         total = len(questions)
         answers: list[str] = []
 
         for idx, q in enumerate(questions, start=1):
+            row = idx - 1
+            if row in done:
+                answers.append(done[row])
+                continue
+
             logger.info("Processing question %d/%d", idx, total)
 
             if not q.strip():
                 answers.append("")
+                if on_answer is not None:
+                    on_answer(row, "", 0.0)
                 continue
 
+            started = time.perf_counter()
             try:
                 answer = self.answer_one(q)
                 logger.info(f"Answer: {answer}")
@@ -93,9 +228,356 @@ class EvaluationRunner:
                 logger.error(
                     "Failed on question %d/%d: %s", idx, total, exc
                 )
-                answer = ""
+                answers.append("")
+                continue
 
             answers.append(answer)
+            if on_answer is not None:
+                on_answer(row, answer, time.perf_counter() - started)
+
+        return answers
+
+    def retrieve(
+        self,
+        questions: list[str],
+        *,
+        rows: list[int] | None = None,
+    ) -> dict[int, list[SearchResult]]:
+        """
+        Embed the given rows (default: all non-empty questions) in one call
+        and search them in one multi-query FAISS call.
+        Returns row index -> retrieved chunks.
+        """
+        if rows is None:
+            rows = [i for i, q in enumerate(questions) if q.strip()]
+        if not rows:
+            return {}
+
+        texts = [questions[i] for i in rows]
+        vectors = self.embedder.embed_queries(texts)
+        results = self.searcher.search_batch(
+            texts,
+            vectors,
+            k=self.retrieval_k,
+        )
+        if self.reranker is not None:
+            results = self.reranker.rerank_batch(
+                texts,
+                results,
+                top_k=self.context_k,
+                chunk_texts=self.chunk_texts,
+            )
+        return dict(zip(rows, results))
+
+    def run_batched(
+        self,
+        questions: list[str],
+        *,
+        batch_size: int = 8,
+        done: dict[int, str] | None = None,
+        on_answer: AnswerCallback | None = None,
+        retrieved: dict[int, list[SearchResult]] | None = None,
+    ) -> list[str]:
+        """
+        Batched variant of `run`.
+
+        Embeds all questions in one call, runs one multi-query FAISS search
+        and generates answers in padded micro-batches of `batch_size`.
+        Output order, per-question error isolation and the `done` /
+        `on_answer` resume hooks match `run`; a batch's wall time is split
+        evenly across its rows. Pass `retrieved` (from `retrieve`) to reuse
+        retrieval across runs, e.g. when sweeping several LLMs.
+        """
+        logger = logging.getLogger(__name__)
+
+        done = done or {}
+        total = len(questions)
+        answers: list[str] = [""] * total
+        for row, answer in done.items():
+            if row < total:
+                answers[row] = answer
+
+        def _report(row: int, answer: str, seconds: float) -> None:
+            if on_answer is not None:
+                on_answer(row, answer, seconds)
+
+        pending: list[int] = []
+        blank: list[int] = []
+        for i, q in enumerate(questions):
+            if i in done:
+                continue
+            if q.strip():
+                pending.append(i)
+            else:
+                blank.append(i)
+                _report(i, "", 0.0)
+
+        if not pending:
+            return answers
+
+        # Retrieval (breadth) for every question at once
+        if retrieved is None:
+            try:
+                retrieved = self.retrieve(questions, rows=pending)
+            except Exception as exc:
+                logger.error(
+                    "Batched retrieval failed (%s); "
+                    "falling back to sequential run",
+                    exc,
+                )
+                # Blank rows were reported above; don't report them twice
+                return self.run(
+                    questions,
+                    done={**done, **dict.fromkeys(blank, "")},
+                    on_answer=on_answer,
+                )
+
+        prompts: dict[int, str] = {}
+        for i in pending:
+            results = retrieved.get(i)
+            if results is None:
+                logger.error(
+                    "Failed on question %d/%d: no retrieval results",
+                    i + 1,
+                    total,
+                )
+                continue
+            try:
+                prompt = self._build_prompt(questions[i], results)
+            except Exception as exc:
+                logger.error(
+                    "Failed on question %d/%d: %s", i + 1, total, exc
+                )
+                continue
+
+            if prompt is None:
+                answers[i] = NOT_FOUND_ANSWER
+                _report(i, NOT_FOUND_ANSWER, 0.0)
+            else:
+                prompts[i] = prompt
+
+        # Answer cache hits skip generation entirely
+        cached_rows: set[int] = set()
+        for i, prompt in prompts.items():
+            cached = self._cached_answer(prompt)
+            if cached is not None:
+                answers[i] = cached
+                cached_rows.add(i)
+                _report(i, cached, 0.0)
+
+        order = [i for i in prompts if i not in cached_rows]
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            logger.info(
+                "Processing questions %d-%d/%d",
+                batch[0] + 1,
+                batch[-1] + 1,
+                total,
+            )
+
+            started = time.perf_counter()
+            failed: set[int] = set()
+            try:
+                if len(batch) == 1:
+                    # Single prompts can use the prefix KV cache
+                    batch_answers = [
+                        self.llm.generate(
+                            prompts[batch[0]],
+                            max_new_tokens=self.max_new_tokens,
+                        )
+                    ]
+                else:
+                    batch_answers = self.llm.generate_batch(
+                        [prompts[i] for i in batch],
+                        max_new_tokens=self.max_new_tokens,
+                    )
+            except Exception as exc:
+                logger.error(
+                    "Batch generation failed (%s); retrying one by one", exc
+                )
+                batch_answers = []
+                for i in batch:
+                    try:
+                        batch_answers.append(
+                            self.llm.generate(
+                                prompts[i],
+                                max_new_tokens=self.max_new_tokens,
+                            )
+                        )
+                    except Exception as item_exc:
+                        logger.error(
+                            "Failed on question %d/%d: %s",
+                            i + 1,
+                            total,
+                            item_exc,
+                        )
+                        batch_answers.append("")
+                        failed.add(i)
+
+            seconds = (time.perf_counter() - started) / len(batch)
+            for i, answer in zip(batch, batch_answers):
+                answers[i] = answer.strip()
+                if i in failed:
+                    continue
+                self._store_answer(prompts[i], answers[i])
+                _report(i, answers[i], seconds)
+                logger.info(f"Answer: {answers[i]}")
 
         return answers
 
+    def run_parallel(
+        self,
+        questions: list[str],
+        *,
+        workers: int,
+        threads_per_worker: int = 0,
+        llm_model_name: str | None = None,
+        done: dict[int, str] | None = None,
+        on_answer: AnswerCallback | None = None,
+        retrieved: dict[int, list[SearchResult]] | None = None,
+    ) -> list[str]:
+        """
+        Data-parallel variant of `run` for many-core CPUs.
+
+        Retrieval, prompt building (with the model's tokenizer only) and
+        answer cache lookups run here; each of `workers` processes loads
+        its own LLM with `threads_per_worker` torch threads (default: an
+        even share of the cores) and pulls prompts that missed the cache
+        from a shared queue, so the index, chunk store and cache are never
+        opened in the workers. If batched retrieval fails, questions are
+        retrieved one by one and only the failing ones are skipped. Answers come back in input order; `done`,
+        `on_answer` and error isolation match `run`.
+        """
+        logger = logging.getLogger(__name__)
+
+        model_name = llm_model_name or (
+            self.llm.model_name if self.llm else settings.llm_model_name
+        )
+        threads_per_worker = (
+            threads_per_worker or default_threads_per_worker(workers)
+        )
+
+        done = done or {}
+        total = len(questions)
+        answers: list[str] = [""] * total
+        for row, answer in done.items():
+            if row < total:
+                answers[row] = answer
+
+        pending: list[int] = []
+        for i, q in enumerate(questions):
+            if i in done:
+                continue
+            if q.strip():
+                pending.append(i)
+            elif on_answer is not None:
+                on_answer(i, "", 0.0)
+
+        if not pending:
+            return answers
+
+        retrieval_errors: dict[int, Exception] = {}
+        if retrieved is None:
+            try:
+                retrieved = self.retrieve(questions, rows=pending)
+            except Exception as exc:
+                logger.error(
+                    "Batched retrieval failed (%s); retrieving one by one",
+                    exc,
+                )
+                retrieved = {}
+                for i in pending:
+                    try:
+                        retrieved.update(self.retrieve(questions, rows=[i]))
+                    except Exception as item_exc:
+                        retrieval_errors[i] = item_exc
+
+        # Prompts are sized with the tokenizer of the model the workers
+        # load; the cache key assumes its backend loads without fallback
+        if self.llm is not None and self.llm.model_name == model_name:
+            prompt_llm: PromptLLM = self.llm
+            model_key = self.llm.cache_key
+        else:
+            prompt_llm = PromptTokenizer(model_name)
+            model_key = answer_cache_key(model_name, settings.llm_backend)
+
+        prompts: dict[int, str] = {}
+        for i in pending:
+            results = retrieved.get(i)
+            if results is None:
+                logger.error(
+                    "Failed on question %d/%d: %s",
+                    i + 1,
+                    total,
+                    retrieval_errors.get(i, "no retrieval results"),
+                )
+                continue
+            try:
+                prompt = self._build_prompt(
+                    questions[i], results, llm=prompt_llm
+                )
+            except Exception as exc:
+                logger.error(
+                    "Failed on question %d/%d: %s", i + 1, total, exc
+                )
+                continue
+
+            if prompt is None:
+                answers[i] = NOT_FOUND_ANSWER
+                if on_answer is not None:
+                    on_answer(i, NOT_FOUND_ANSWER, 0.0)
+                continue
+
+            # Answer cache hits are never sent to a worker
+            cached = (
+                self.answer_cache.get(model_key, prompt, self.max_new_tokens)
+                if self.answer_cache is not None
+                else None
+            )
+            if cached is not None:
+                answers[i] = cached
+                if on_answer is not None:
+                    on_answer(i, cached, 0.0)
+                continue
+
+            prompts[i] = prompt
+
+        if not prompts:
+            return answers
+
+        completed = 0
+        for row, answer, worker_key, seconds, error in generate_parallel(
+            list(prompts.items()),
+            model_name=model_name,
+            workers=workers,
+            threads_per_worker=threads_per_worker,
+            max_new_tokens=self.max_new_tokens,
+        ):
+            completed += 1
+            if error is not None:
+                logger.error(
+                    "Failed on question %d/%d: %s", row + 1, total, error
+                )
+                continue
+
+            answers[row] = answer
+            if self.answer_cache is not None and worker_key is not None:
+                # Keyed by the backend the worker actually loaded
+                self.answer_cache.put(
+                    worker_key,
+                    prompts[row],
+                    self.max_new_tokens,
+                    answer,
+                )
+            if on_answer is not None:
+                on_answer(row, answer, seconds)
+
+            logger.info(
+                "Answered question %d/%d (%d/%d done)",
+                row + 1,
+                total,
+                completed,
+                len(prompts),
+            )
+
+        return answers
@@ -0,0 +1,41 @@
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def short_model_name(model_name: str) -> str:
+    """
+    Convert HF model names into short, filesystem-safe tokens.
+    Example:
+        sentence-transformers/all-MiniLM-L6-v2 -> allminimll6v2
+        google/flan-t5-base -> flant5base
+    """
+    return (
+        model_name
+        .split("/")[-1]
+        .replace("-", "")
+        .replace("_", "")
+        .lower()
+    )
+
+
+def result_column(embedding_model_name: str, llm_model_name: str) -> str:
+    # Column name is explicit and self-documenting
+    return f"{embedding_model_name} + {llm_model_name}"
+
+
+def read_table(path: Path) -> "pd.DataFrame":
+    import pandas as pd
+
+    if path.suffix.lower() in {".xlsx", ".xls"}:
+        return pd.read_excel(path)
+    return pd.read_csv(path)
+
+
+def write_table(df: "pd.DataFrame", path: Path) -> None:
+    if path.suffix.lower() in {".xlsx", ".xls"}:
+        df.to_excel(path, index=False)
+    else:
+        df.to_csv(path, index=False)
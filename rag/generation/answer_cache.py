@@ -0,0 +1,135 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def _cache_key(model_key: str, prompt: str, max_new_tokens: int) -> str:
+    h = hashlib.sha256()
+    for part in (model_key, str(max_new_tokens), prompt):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class AnswerCache:
+    """
+    Persistent answer cache keyed by (model, prompt hash, max_new_tokens).
+
+    The prompt embeds the retrieved chunk texts and the question, so a
+    change of LLM, corpus or retrieval settings yields a different key and
+    stale entries simply stop being hit. Least recently used entries are
+    evicted once the stored answers exceed max_bytes.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        max_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            " key TEXT PRIMARY KEY,"
+            " answer TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS answers_last_access"
+            " ON answers (last_access)"
+        )
+        self._conn.commit()
+
+        # Access times from hits are buffered and written with the next put
+        # so lookups stay read-only.
+        self._touched: dict[str, float] = {}
+
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM answers"
+        ).fetchone()[0]
+
+    def get(
+        self,
+        model_key: str,
+        prompt: str,
+        max_new_tokens: int,
+    ) -> str | None:
+        key = _cache_key(model_key, prompt, max_new_tokens)
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT answer FROM answers WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._touched[key] = time.time()
+
+        return row[0]
+
+    def put(
+        self,
+        model_key: str,
+        prompt: str,
+        max_new_tokens: int,
+        answer: str,
+    ) -> None:
+        key = _cache_key(model_key, prompt, max_new_tokens)
+        size = len(answer.encode("utf-8")) + len(key)
+
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT size FROM answers WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers (key, answer, size, last_access)"
+                " VALUES (?, ?, ?, ?)",
+                (key, answer, size, time.time()),
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            self._flush_touched()
+            self._evict()
+            self._conn.commit()
+
+    def _flush_touched(self) -> None:
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE answers SET last_access = ? WHERE key = ?",
+                [(ts, key) for key, ts in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _evict(self) -> None:
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM answers"
+                " ORDER BY last_access LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                return
+
+            for key, size in rows:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM answers WHERE key = ?", (key,))
+                self._total_bytes -= size
+
+        logger.debug("Answer cache size: %d bytes", self._total_bytes)
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,151 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+
+from rag.generation.llm import LocalLLM
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Request:
+    prompt: str
+    max_new_tokens: int
+    future: Future = field(default_factory=Future)
+
+
+class BatchingScheduler:
+    """
+    Dynamic batching in front of a shared LocalLLM.
+
+    Requests arriving within max_wait_ms of the first queued one (up to
+    max_batch_size) are generated together via LocalLLM.generate_batch,
+    which pads causal prompts on the left and seq2seq prompts on the right.
+    A request that ends up alone goes through LocalLLM.generate instead,
+    so it can reuse the prompt-prefix KV cache.
+    Each caller gets its own decoded answer through a Future.
+    """
+
+    def __init__(
+        self,
+        llm: LocalLLM,
+        *,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+    ) -> None:
+        self.llm = llm
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue: queue.Queue[_Request | None] = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._loop,
+            name="llm-batcher",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def submit(self, prompt: str, *, max_new_tokens: int = 256) -> Future:
+        if self._closed:
+            raise RuntimeError("BatchingScheduler is closed")
+
+        request = _Request(prompt=prompt, max_new_tokens=max_new_tokens)
+        self._queue.put(request)
+        return request.future
+
+    def generate(self, prompt: str, *, max_new_tokens: int = 256) -> str:
+        return self.submit(prompt, max_new_tokens=max_new_tokens).result()
+
+    def close(self) -> None:
+        """Stop accepting requests, finish queued ones and stop the worker."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self) -> list[_Request]:
+        first = self._queue.get()
+        if first is None:
+            return []
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Close requested; process what we have, then stop
+                self._queue.put(None)
+                break
+            batch.append(item)
+
+        return batch
+
+    def _loop(self) -> None:
+        while True:
+            batch = self._collect()
+            if not batch:
+                break
+
+            # A batch shares one generate() call, so group by token budget
+            groups: dict[int, list[_Request]] = {}
+            for request in batch:
+                if request.future.set_running_or_notify_cancel():
+                    groups.setdefault(request.max_new_tokens, []).append(
+                        request
+                    )
+
+            for max_new_tokens, group in groups.items():
+                self._run(group, max_new_tokens)
+
+    def _run(self, group: list[_Request], max_new_tokens: int) -> None:
+        logger.debug("Generating batch of %d", len(group))
+
+        try:
+            if len(group) == 1:
+                # Single prompts can use the prefix KV cache
+                answers = [
+                    self.llm.generate(
+                        group[0].prompt,
+                        max_new_tokens=max_new_tokens,
+                    )
+                ]
+            else:
+                answers = self.llm.generate_batch(
+                    [r.prompt for r in group],
+                    max_new_tokens=max_new_tokens,
+                )
+        except Exception as exc:
+            if len(group) == 1:
+                group[0].future.set_exception(exc)
+                return
+
+            # Isolate the failing request(s) by retrying one at a time
+            logger.error(
+                "Batch generation failed (%s); retrying one by one", exc
+            )
+            for request in group:
+                try:
+                    request.future.set_result(
+                        self.llm.generate(
+                            request.prompt,
+                            max_new_tokens=max_new_tokens,
+                        )
+                    )
+                except Exception as item_exc:
+                    request.future.set_exception(item_exc)
+            return
+
+        for request, answer in zip(group, answers):
+            request.future.set_result(answer)
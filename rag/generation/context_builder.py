@@ -1,27 +1,146 @@
-from typing import Any
+from collections.abc import Mapping
+from typing import Protocol
+
+from rag.generation.prompts import grounded_qa_prompt
+from rag.models import SearchResult
+
+CONTEXT_SEPARATOR = "\n\n---\n\n"
+
+# Below this many tokens a trimmed chunk is not worth including
+_MIN_TRIMMED_TOKENS = 32
+
+
+def apply_relevance_floor(
+    retrieved: list[SearchResult],
+    min_score: float | None,
+) -> list[SearchResult]:
+    """
+    Drop chunks whose dense score is below min_score. Chunks found only by
+    lexical search have no dense score and are kept, unless no chunk's
+    dense score reaches the floor: the question is then off-corpus and
+    nothing is kept.
+    """
+    if min_score is None:
+        return retrieved
+    if not any(
+        item.dense_score is not None and item.dense_score >= min_score
+        for item in retrieved
+    ):
+        return []
+    return [
+        item for item in retrieved
+        if item.dense_score is None or item.dense_score >= min_score
+    ]
+
+
+class TokenCounter(Protocol):
+    def count_tokens(self, text: str) -> int: ...
+
+    def truncate_tokens(self, text: str, max_tokens: int) -> str: ...
 
 
 def build_context(
-    retrieved: list[dict[str, Any]],
-    chunk_texts: dict[str, str],
+    retrieved: list[SearchResult],
+    chunk_texts: Mapping[str, str],
     *,
     context_k: int,
+    token_budget: int | None = None,
+    counter: TokenCounter | None = None,
+    min_score: float | None = None,
 ) -> tuple[str, list[str]]:
     """
     Select top context_k chunks (truncation) and assemble context text.
+    Text is taken from the retrieved record when the vector store serves it
+    (chunk store), otherwise looked up in chunk_texts.
+
+    With a token_budget, chunks are added in rank order while they fit
+    (counted with counter, separators included); the first chunk that does
+    not fit is trimmed to the remaining budget and lower-ranked ones are
+    dropped.
+
+    min_score is a relevance floor on the dense score, applied by
+    apply_relevance_floor; if nothing passes, the context is empty.
     Returns (context_text, source_chunk_ids).
     """
-    selected = retrieved[:context_k]
+    if token_budget is not None and counter is None:
+        raise ValueError("token_budget requires a token counter")
+
+    selected = apply_relevance_floor(retrieved, min_score)[:context_k]
 
     parts: list[str] = []
     sources: list[str] = []
 
+    remaining = token_budget
+    separator_tokens = (
+        counter.count_tokens(CONTEXT_SEPARATOR)
+        if counter is not None and token_budget is not None
+        else 0
+    )
+
     for item in selected:
-        cid = item["chunk_id"]
-        text = chunk_texts.get(cid, "")
-        if text:
-            parts.append(text)
-            sources.append(cid)
+        cid = item.chunk_id
+        text = item.text or chunk_texts.get(cid, "")
+        if not text:
+            continue
 
-    context_text = "\n\n---\n\n".join(parts)
+        if remaining is not None:
+            overhead = separator_tokens if parts else 0
+            cost = counter.count_tokens(text) + overhead
+
+            if cost > remaining:
+                room = remaining - overhead
+                if room >= _MIN_TRIMMED_TOKENS:
+                    parts.append(counter.truncate_tokens(text, room))
+                    sources.append(cid)
+                break
+
+            remaining -= cost
+
+        parts.append(text)
+        sources.append(cid)
+
+    context_text = CONTEXT_SEPARATOR.join(parts)
     return context_text, sources
+
+
+class PromptLLM(TokenCounter, Protocol):
+    def context_token_budget(
+        self,
+        prompt_without_context: str,
+        *,
+        max_new_tokens: int,
+        cap: int = 0,
+    ) -> int: ...
+
+
+def build_grounded_prompt(
+    question: str,
+    retrieved: list[SearchResult],
+    chunk_texts: Mapping[str, str],
+    *,
+    llm: PromptLLM,
+    context_k: int,
+    max_new_tokens: int,
+    token_cap: int = 0,
+    min_score: float | None = None,
+) -> tuple[str, list[str]]:
+    """
+    Grounded QA prompt whose context is sized to fit the LLM window.
+    Returns (prompt, source_chunk_ids); no sources means nothing passed
+    the relevance floor and the question can be answered with
+    NOT_FOUND_ANSWER without calling the LLM.
+    """
+    token_budget = llm.context_token_budget(
+        grounded_qa_prompt("", question),
+        max_new_tokens=max_new_tokens,
+        cap=token_cap,
+    )
+    context, sources = build_context(
+        retrieved,
+        chunk_texts,
+        context_k=context_k,
+        token_budget=token_budget,
+        counter=llm,
+        min_score=min_score,
+    )
+    return grounded_qa_prompt(context, question), sources
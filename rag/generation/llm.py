@@ -1,40 +1,68 @@
-from transformers import (
-    AutoTokenizer,
-    AutoConfig,
-    AutoModelForSeq2SeqLM,
-    AutoModelForCausalLM,
-)
-import torch
+import copy
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, Any
 import logging
+import threading
+
+if TYPE_CHECKING:
+    import torch
+
+from rag.backends import load_generation_model
 
 logger = logging.getLogger(__name__)
 
 
-class LocalLLM:
+def _stop_when_set(event: threading.Event) -> Any:
+    """StoppingCriteriaList that ends generation once event is set."""
+    import torch
+    from transformers import StoppingCriteria, StoppingCriteriaList
+
+    class _StopWhenSet(StoppingCriteria):
+        def __call__(
+            self,
+            input_ids: "torch.LongTensor",
+            scores: "torch.FloatTensor",
+            **kwargs: Any,
+        ) -> "torch.BoolTensor":
+            return torch.full(
+                (input_ids.shape[0],),
+                event.is_set(),
+                dtype=torch.bool,
+                device=input_ids.device,
+            )
+
+    return StoppingCriteriaList([_StopWhenSet()])
+
+
+def answer_cache_key(model_name: str, backend: str) -> str:
     """
-    Unified local LLM wrapper supporting:
-    - Seq2Seq models (T5 / FLAN-T5 / Long-T5)
-    - Causal models (Qwen / Phi / Mistral)
+    Model identity for answer caching. Quantized and reduced-precision
+    backends can produce different text, so they get their own key.
+    """
+    if backend == "torch":
+        return model_name
+    return f"{model_name}@{backend}"
 
-    Handles prompt slicing correctly for causal models.
+
+class PromptTokenizer:
+    """
+    Tokenizer half of LocalLLM: counts and truncates tokens and sizes the
+    context budget without loading model weights, so prompts can be built
+    in a process that does not generate.
     """
 
     def __init__(self, model_name: str) -> None:
         self.model_name = model_name
 
-        logger.info("Initializing LocalLLM with model: %s", model_name)
+        # Imported here so that importing this module does not load them
+        from transformers import AutoConfig, AutoTokenizer
 
         self.config = AutoConfig.from_pretrained(model_name)
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
 
-        if self.config.is_encoder_decoder:
-            self.model_type = "seq2seq"
-            self.model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
-        else:
-            self.model_type = "causal"
-            self.model = AutoModelForCausalLM.from_pretrained(model_name)
-
-        self.model.eval()
+        self.model_type = (
+            "seq2seq" if self.config.is_encoder_decoder else "causal"
+        )
 
         if (
             getattr(self.tokenizer, "model_max_length", None) is None
@@ -46,13 +74,167 @@ class LocalLLM:
                 self.tokenizer.model_max_length,
             )
 
+    def count_tokens(self, text: str) -> int:
+        return len(
+            self.tokenizer(text, add_special_tokens=False)["input_ids"]
+        )
+
+    def truncate_tokens(self, text: str, max_tokens: int) -> str:
+        input_ids = self.tokenizer(text, add_special_tokens=False)["input_ids"]
+        return self.tokenizer.decode(
+            input_ids[:max_tokens],
+            skip_special_tokens=True,
+        )
+
+    def context_token_budget(
+        self,
+        prompt_without_context: str,
+        *,
+        max_new_tokens: int,
+        cap: int = 0,
+        margin: int = 8,
+    ) -> int:
+        """
+        Tokens available for context so the full prompt is never truncated.
+
+        prompt_without_context is the prompt rendered with an empty context
+        (instructions + question). Causal models also reserve
+        max_new_tokens, since prompt and answer share one window. A
+        positive cap further limits the budget. margin absorbs tokenization
+        differences at concatenation boundaries.
+        """
+        overhead = len(self.tokenizer(prompt_without_context)["input_ids"])
+        budget = self.tokenizer.model_max_length - overhead - margin
+
+        if self.model_type == "causal":
+            budget -= max_new_tokens
+        if cap > 0:
+            budget = min(budget, cap)
+
+        return max(budget, 0)
+
+
+class LocalLLM(PromptTokenizer):
+    """
+    Unified local LLM wrapper supporting:
+    - Seq2Seq models (T5 / FLAN-T5 / Long-T5)
+    - Causal models (Qwen / Phi / Mistral)
+
+    Handles prompt slicing correctly for causal models.
+
+    If prompt_prefix is given (causal models only), its past-key-values are
+    computed once at load time and reused by every single-prompt
+    generation whose tokens start with it, skipping that part of prefill.
+
+    backend selects the CPU inference backend ("torch", "int8", "bf16" or
+    "onnx", see rag.backends); unsupported backends fall back to torch and
+    the one in use is exposed as `self.backend`.
+
+    Calls into the model are serialized by a lock, so generate,
+    generate_batch and stream can be used from several threads (e.g. the
+    batching scheduler and streaming requests) without running two
+    generations on the same model at once.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        *,
+        prompt_prefix: str | None = None,
+        backend: str = "torch",
+    ) -> None:
+        self._model_lock = threading.Lock()
+
+        logger.info("Initializing LocalLLM with model: %s", model_name)
+
+        super().__init__(model_name)
+        self.model, self.backend = load_generation_model(
+            model_name,
+            is_encoder_decoder=self.config.is_encoder_decoder,
+            backend=backend,
+        )
+
+        # Batched generation pads prompts to a common length. Causal models
+        # must be left-padded so every row ends at the same position and the
+        # generated tokens start at a shared offset.
+        self.tokenizer.padding_side = (
+            "left" if self.model_type == "causal" else "right"
+        )
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+
+        self._prefix_ids: "torch.Tensor | None" = None
+        self._prefix_cache: Any = None
+        # ONNX Runtime models manage their own KV buffers
+        if (
+            prompt_prefix
+            and self.model_type == "causal"
+            and self.backend != "onnx"
+        ):
+            self._build_prefix_cache(prompt_prefix)
+
         logger.info(
-            "LocalLLM ready | model=%s | type=%s",
+            "LocalLLM ready | model=%s | type=%s | backend=%s",
             model_name,
             self.model_type,
+            self.backend,
         )
 
+    @property
+    def cache_key(self) -> str:
+        """Answer-cache key for the backend actually loaded."""
+        return answer_cache_key(self.model_name, self.backend)
+
+    def _build_prefix_cache(self, prefix: str) -> None:
+        import torch
+
+        input_ids = self.tokenizer(prefix, return_tensors="pt")["input_ids"]
+
+        with torch.no_grad():
+            outputs = self.model(input_ids=input_ids, use_cache=True)
+
+        self._prefix_ids = input_ids[0]
+        self._prefix_cache = outputs.past_key_values
+
+        logger.info(
+            "Cached KV for %d prompt prefix tokens",
+            len(self._prefix_ids),
+        )
+
+    def _prefix_cache_kwargs(
+        self,
+        input_ids: "torch.Tensor",
+    ) -> dict[str, Any]:
+        """
+        Return generate() kwargs reusing the prefix KV cache, or {} when the
+        prompt does not start with the cached prefix tokens.
+        """
+        if self._prefix_cache is None or input_ids.shape[0] != 1:
+            return {}
+
+        n = len(self._prefix_ids)
+        if input_ids.shape[1] <= n:
+            return {}
+
+        # Tokens at the prefix boundary can merge with the text that follows;
+        # reuse only the part that matches.
+        matches = (input_ids[0, :n] == self._prefix_ids).int()
+        matched = int(matches.cumprod(0).sum())
+        if matched == 0:
+            return {}
+
+        # generate() extends the cache in place, so each call needs a copy
+        cache = copy.deepcopy(self._prefix_cache)
+        if matched < n:
+            if not hasattr(cache, "crop"):
+                return {}
+            cache.crop(matched)
+
+        return {"past_key_values": cache}
+
     def generate(self, prompt: str, *, max_new_tokens: int = 256) -> str:
+        import torch
+
         inputs = self.tokenizer(
             prompt,
             return_tensors="pt",
@@ -62,10 +244,11 @@ class LocalLLM:
 
         prompt_len = inputs["input_ids"].shape[1]
 
-        with torch.no_grad():
+        with self._model_lock, torch.no_grad():
             outputs = self.model.generate(
                 **inputs,
                 max_new_tokens=max_new_tokens,
+                **self._prefix_cache_kwargs(inputs["input_ids"]),
             )
 
         output_ids = outputs[0]
@@ -81,4 +264,121 @@ class LocalLLM:
             skip_special_tokens=True,
         ).strip()
 
-        return decoded
\ No newline at end of file
+        return decoded
+
+    def stream(
+        self,
+        prompt: str,
+        *,
+        max_new_tokens: int = 256,
+    ) -> Iterator[str]:
+        """
+        Yield decoded text pieces as tokens are generated.
+
+        Generation runs on a background thread feeding a
+        TextIteratorStreamer. skip_prompt drops the first tensor generate()
+        emits: the prompt for causal models, the decoder start token for
+        seq2seq, so only new text is yielded in both cases.
+
+        Closing the iterator early (e.g. the client disconnected) stops
+        generation at the next token, which frees the model for other
+        requests.
+        """
+        inputs = self.tokenizer(
+            prompt,
+            return_tensors="pt",
+            truncation=True,
+            max_length=self.tokenizer.model_max_length,
+        )
+
+        import torch
+        from transformers import TextIteratorStreamer
+
+        streamer = TextIteratorStreamer(
+            self.tokenizer,
+            skip_prompt=True,
+            skip_special_tokens=True,
+        )
+        stop = threading.Event()
+        errors: list[BaseException] = []
+
+        def _run() -> None:
+            try:
+                with self._model_lock, torch.no_grad():
+                    if stop.is_set():
+                        streamer.end()
+                        return
+                    self.model.generate(
+                        **inputs,
+                        max_new_tokens=max_new_tokens,
+                        streamer=streamer,
+                        stopping_criteria=_stop_when_set(stop),
+                        **self._prefix_cache_kwargs(inputs["input_ids"]),
+                    )
+            except BaseException as exc:
+                errors.append(exc)
+                streamer.end()
+
+        thread = threading.Thread(target=_run, name="llm-stream", daemon=True)
+        thread.start()
+
+        try:
+            for text in streamer:
+                if text:
+                    yield text
+        finally:
+            # Reached early when the consumer closes the iterator
+            stop.set()
+            thread.join()
+
+        if errors:
+            raise errors[0]
+
+    def generate_batch(
+        self,
+        prompts: list[str],
+        *,
+        max_new_tokens: int = 256,
+    ) -> list[str]:
+        """
+        Generate answers for several prompts in one padded forward pass.
+        Output order matches the input order.
+        """
+        if not prompts:
+            return []
+
+        import torch
+
+        inputs = self.tokenizer(
+            prompts,
+            return_tensors="pt",
+            padding=True,
+            truncation=True,
+            max_length=self.tokenizer.model_max_length,
+        )
+
+        # With left padding every row shares the same prompt length
+        prompt_len = inputs["input_ids"].shape[1]
+
+        with self._model_lock, torch.no_grad():
+            outputs = self.model.generate(
+                **inputs,
+                max_new_tokens=max_new_tokens,
+                pad_token_id=self.tokenizer.pad_token_id,
+            )
+
+        decoded: list[str] = []
+        for output_ids in outputs:
+            if self.model_type == "causal":
+                generated_ids = output_ids[prompt_len:]
+            else:
+                generated_ids = output_ids
+
+            decoded.append(
+                self.tokenizer.decode(
+                    generated_ids,
+                    skip_special_tokens=True,
+                ).strip()
+            )
+
+        return decoded
@@ -1,18 +1,27 @@
-from rag.logging_config import configure_logging
 import logging
 
-configure_logging()
 logger = logging.getLogger(__name__)
 
+# Constant instruction preamble shared by every grounded QA prompt. It must
+# stay first in the template so causal models can reuse its KV cache.
+QA_PROMPT_PREFIX = (
+    "You are a careful assistant.\n\n"
+    "Extract the exact sentence(s) from the context that answer the question.\n"
+    "If the answer is not present, say: \"Not found in the provided documents.\".\n\n"
+    "Context:\n"
+)
+
+# Returned without generation when no retrieved chunk is relevant enough;
+# matches what the prompt tells the model to say.
+NOT_FOUND_ANSWER = "Not found in the provided documents."
+
+
 def grounded_qa_prompt(context: str, question: str) -> str:
     #logger.info(f"Question : {question}")
     #logger.info(f"Context : {context}")
     return (
-        "You are a careful assistant.\n\n"
-        "Extract the exact sentence(s) from the context that answer the question.\n"
-        "If the answer is not present, say: \"Not found in the provided documents.\".\n\n"
-        "Context:\n"
-        f"{context}\n\n"
+        QA_PROMPT_PREFIX
+        + f"{context}\n\n"
         "Question:\n"
         f"{question}\n\n"
         "Answer:"
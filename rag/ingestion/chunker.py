@@ -1,6 +1,5 @@
 import hashlib
-from pathlib import Path
-from typing import Any
+from collections.abc import Iterable, Iterator
 
 from rag.models import Chunk, Document
 
@@ -78,20 +77,33 @@ def chunk_document(
     return chunks
 
 
-def chunk_documents(
-    documents: list[Document],
+def iter_chunks(
+    documents: Iterable[Document],
     *,
     max_chars: int = 1200,
     overlap_chars: int = 150,
-) -> list[Chunk]:
-    all_chunks: list[Chunk] = []
-
+) -> Iterator[Chunk]:
+    """
+    Lazily chunk a stream of documents, one document at a time.
+    """
     for doc in documents:
-        doc_chunks = chunk_document(
+        yield from chunk_document(
             doc,
             max_chars=max_chars,
             overlap_chars=overlap_chars,
         )
-        all_chunks.extend(doc_chunks)
 
-    return all_chunks
+
+def chunk_documents(
+    documents: list[Document],
+    *,
+    max_chars: int = 1200,
+    overlap_chars: int = 150,
+) -> list[Chunk]:
+    return list(
+        iter_chunks(
+            documents,
+            max_chars=max_chars,
+            overlap_chars=overlap_chars,
+        )
+    )
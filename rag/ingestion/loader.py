@@ -1,4 +1,7 @@
 import logging
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
 
 from pypdf import PdfReader
@@ -7,17 +10,27 @@ from rag.models import Document
 logger = logging.getLogger(__name__)
 
 
-def load_pdf(path: Path) -> Document:
+def _validate_pdf_path(path: Path) -> None:
     if not path.exists() or path.suffix.lower() != ".pdf":
         raise ValueError(f"Invalid PDF path: {path}")
 
+
+def _extract_page_range(path: Path, start: int, stop: int) -> list[str]:
+    """
+    Extract stripped text for pages [start, stop).
+    Top-level so it can run in a worker process.
+    """
     reader = PdfReader(path)
-    pages_text: list[str] = []
+    return [
+        (reader.pages[i].extract_text() or "").strip()
+        for i in range(start, stop)
+    ]
 
-    for page_number, page in enumerate(reader.pages):
-        text = page.extract_text() or ""
-        cleaned = text.strip()
 
+def _build_document(path: Path, pages: list[str]) -> Document:
+    pages_text: list[str] = []
+
+    for page_number, cleaned in enumerate(pages):
         if cleaned:
             pages_text.append(cleaned)
         else:
@@ -38,23 +51,142 @@ def load_pdf(path: Path) -> Document:
         source=path,
         metadata={
             "filename": path.name,
-            "num_pages": len(reader.pages),
+            "num_pages": len(pages),
         },
     )
 
 
-def load_pdfs_from_dir(directory: Path) -> list[Document]:
+def load_pdf(path: Path) -> Document:
+    _validate_pdf_path(path)
+
+    reader = PdfReader(path)
+    pages = [
+        (page.extract_text() or "").strip()
+        for page in reader.pages
+    ]
+
+    return _build_document(path, pages)
+
+
+def _submit_pdf(
+    executor: ProcessPoolExecutor,
+    path: Path,
+    pages_per_task: int,
+) -> list[Future]:
+    _validate_pdf_path(path)
+
+    num_pages = len(PdfReader(path).pages)
+    return [
+        executor.submit(
+            _extract_page_range,
+            path,
+            start,
+            min(start + pages_per_task, num_pages),
+        )
+        for start in range(0, num_pages, pages_per_task)
+    ]
+
+
+def _collect_pdf(
+    pdf_path: Path,
+    futures: list[Future] | Exception,
+) -> Iterator[Document]:
+    try:
+        if isinstance(futures, Exception):
+            raise futures
+
+        pages: list[str] = []
+        for future in futures:
+            pages.extend(future.result())
+
+        document = _build_document(pdf_path, pages)
+        logger.info("Loaded PDF: %s", pdf_path.name)
+    except Exception as exc:
+        logger.error("Failed to load %s: %s", pdf_path.name, exc)
+        return
+
+    yield document
+
+
+def _iter_pdfs_parallel(
+    pdf_paths: list[Path],
+    *,
+    workers: int,
+    pages_per_task: int,
+) -> Iterator[Document]:
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Keep a bounded window of files in flight so the pool stays busy
+        # (large files are split into page ranges) while results are
+        # yielded in sorted file order.
+        in_flight: deque[tuple[Path, list[Future] | Exception]] = deque()
+
+        for pdf_path in pdf_paths:
+            try:
+                futures: list[Future] | Exception = _submit_pdf(
+                    executor, pdf_path, pages_per_task
+                )
+            except Exception as exc:
+                futures = exc
+            in_flight.append((pdf_path, futures))
+
+            if len(in_flight) > workers:
+                yield from _collect_pdf(*in_flight.popleft())
+
+        while in_flight:
+            yield from _collect_pdf(*in_flight.popleft())
+
+
+def iter_pdfs_from_dir(
+    directory: Path,
+    *,
+    workers: int = 1,
+    pages_per_task: int = 32,
+) -> Iterator[Document]:
+    """
+    Yield every loadable PDF in directory as a Document, in sorted
+    filename order. Only the documents currently being extracted are held
+    in memory.
+
+    With workers > 1, text extraction runs on a process pool and large
+    files are split into page ranges of pages_per_task.
+    """
     if not directory.exists():
         raise FileNotFoundError(f"Directory not found: {directory}")
 
-    documents: list[Document] = []
+    pdf_paths = sorted(directory.glob("*.pdf"))
 
-    for pdf_path in sorted(directory.glob("*.pdf")):
+    if workers > 1:
+        yield from _iter_pdfs_parallel(
+            pdf_paths,
+            workers=workers,
+            pages_per_task=pages_per_task,
+        )
+        return
+
+    for pdf_path in pdf_paths:
         try:
-            documents.append(load_pdf(pdf_path))
+            document = load_pdf(pdf_path)
             logger.info("Loaded PDF: %s", pdf_path.name)
         except Exception as exc:
             logger.error("Failed to load %s: %s", pdf_path.name, exc)
+            continue
+
+        yield document
+
+
+def load_pdfs_from_dir(
+    directory: Path,
+    *,
+    workers: int = 1,
+    pages_per_task: int = 32,
+) -> list[Document]:
+    documents = list(
+        iter_pdfs_from_dir(
+            directory,
+            workers=workers,
+            pages_per_task=pages_per_task,
+        )
+    )
 
     if not documents:
         raise RuntimeError("No valid PDF documents loaded")
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def file_hash(path: Path, *, block_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    document_id: str
+    size: int
+    mtime: float
+    sha256: str
+
+
+@dataclass
+class ManifestDiff:
+    added: list[Path] = field(default_factory=list)
+    changed: list[Path] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.changed or self.removed)
+
+
+class Manifest:
+    """
+    Records size, mtime and content hash of every ingested raw PDF,
+    keyed by filename. Used to work out which files need reprocessing.
+    """
+
+    def __init__(self, entries: dict[str, ManifestEntry] | None = None) -> None:
+        self.entries: dict[str, ManifestEntry] = entries or {}
+
+    @classmethod
+    def load(cls, path: Path) -> "Manifest":
+        if not path.exists():
+            return cls()
+
+        with path.open("r", encoding="utf-8") as f:
+            raw = json.load(f)
+
+        return cls(
+            {name: ManifestEntry(**entry) for name, entry in raw.items()}
+        )
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    name: asdict(entry)
+                    for name, entry in sorted(self.entries.items())
+                },
+                f,
+                indent=2,
+            )
+        tmp_path.replace(path)
+
+    def diff(self, directory: Path) -> ManifestDiff:
+        """
+        Compare the manifest against the PDFs currently in directory.
+        Files whose size and mtime are unchanged are not re-hashed.
+        """
+        result = ManifestDiff()
+        current = {p.name: p for p in sorted(directory.glob("*.pdf"))}
+
+        for name, path in current.items():
+            entry = self.entries.get(name)
+            if entry is None:
+                result.added.append(path)
+                continue
+
+            stat = path.stat()
+            if stat.st_size == entry.size and stat.st_mtime == entry.mtime:
+                result.unchanged.append(name)
+            elif file_hash(path) == entry.sha256:
+                # Touched but identical content; refresh the stat fields only
+                self.record(path)
+                result.unchanged.append(name)
+            else:
+                result.changed.append(path)
+
+        result.removed = sorted(set(self.entries) - set(current))
+        return result
+
+    def record(self, path: Path, *, document_id: str | None = None) -> None:
+        stat = path.stat()
+        self.entries[path.name] = ManifestEntry(
+            document_id=document_id or path.stem,
+            size=stat.st_size,
+            mtime=stat.st_mtime,
+            sha256=file_hash(path),
+        )
+
+    def forget(self, name: str) -> ManifestEntry | None:
+        return self.entries.pop(name, None)
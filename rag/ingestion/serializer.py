@@ -1,17 +1,20 @@
 import json
 from pathlib import Path
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
 
-from rag.models import Document
+from rag.models import Chunk, Document
 
 
 def save_documents(
     documents: Iterable[Document],
     output_path: Path,
-) -> None:
+    *,
+    append: bool = False,
+) -> int:
     output_path.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
 
-    with output_path.open("w", encoding="utf-8") as f:
+    with output_path.open("a" if append else "w", encoding="utf-8") as f:
         for doc in documents:
             record = {
                 "id": doc.id,
@@ -20,3 +23,82 @@ def save_documents(
                 "metadata": doc.metadata,
             }
             f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+
+    return count
+
+
+def save_chunks(
+    chunks: Iterable[Chunk],
+    output_path: Path,
+    *,
+    append: bool = False,
+) -> int:
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+
+    with output_path.open("a" if append else "w", encoding="utf-8") as f:
+        for chunk in chunks:
+            record = {
+                "id": chunk.id,
+                "document_id": chunk.document_id,
+                "text": chunk.text,
+                "metadata": chunk.metadata,
+            }
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+
+    return count
+
+
+def iter_documents(path: Path) -> Iterator[Document]:
+    """
+    Stream Documents back from a documents.jsonl file, one line at a time.
+    """
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            yield Document(
+                id=record["id"],
+                text=record["text"],
+                source=Path(record["source"]),
+                metadata=record["metadata"],
+            )
+
+
+def load_chunk_texts(path: Path) -> dict[str, str]:
+    chunk_map: dict[str, str] = {}
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            chunk_map[record["id"]] = record["text"]
+    return chunk_map
+
+
+def drop_records(
+    path: Path,
+    document_ids: set[str],
+    *,
+    key: str,
+) -> int:
+    """
+    Rewrite a JSONL file without the records whose `key` field is in
+    document_ids. Lines are streamed, so memory stays flat.
+    Returns the number of records dropped.
+    """
+    if not path.exists() or not document_ids:
+        return 0
+
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    dropped = 0
+
+    with path.open("r", encoding="utf-8") as src, \
+            tmp_path.open("w", encoding="utf-8") as dst:
+        for line in src:
+            if json.loads(line)[key] in document_ids:
+                dropped += 1
+            else:
+                dst.write(line)
+
+    tmp_path.replace(path)
+    return dropped
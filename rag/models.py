@@ -2,6 +2,8 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+
 
 @dataclass(frozen=True)
 class Document:
@@ -22,5 +24,52 @@ class Chunk:
 @dataclass(frozen=True)
 class EmbeddingRecord:
     chunk_id: str
-    vector: list[float]
+    vector: np.ndarray
+    metadata: dict[str, Any]
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    """
+    One retrieved chunk, higher scores are better.
+
+    - row          : row id in the vector store; None for chunks found only
+                     by lexical search
+    - score        : ranking score of the retriever that produced the list
+                     (cosine for dense search, BM25, or the RRF score of
+                     hybrid search)
+    - dense_score  : cosine similarity from dense search, None for chunks
+                     found only by lexical search; relevance floors apply
+                     to this score
+    - rerank_score : set by the reranker
+    """
+    row: int | None
+    score: float
     metadata: dict[str, Any]
+    dense_score: float | None = None
+    rerank_score: float | None = None
+
+    @property
+    def chunk_id(self) -> str:
+        return self.metadata["chunk_id"]
+
+    @property
+    def document_id(self) -> str:
+        return self.metadata["document_id"]
+
+    @property
+    def source(self) -> str:
+        return self.metadata.get("source", "")
+
+    @property
+    def text(self) -> str:
+        """Chunk text if the store serves it, else empty."""
+        return self.metadata.get("text", "")
+
+    def to_dict(self) -> dict[str, Any]:
+        result = {"row": self.row, "score": self.score, **self.metadata}
+        if self.dense_score is not None:
+            result["dense_score"] = self.dense_score
+        if self.rerank_score is not None:
+            result["rerank_score"] = self.rerank_score
+        return result
@@ -0,0 +1,247 @@
+import shutil
+from array import array
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+import numpy as np
+
+COLUMNS = ("chunk_id", "document_id", "source", "text")
+
+# Suffix of column files holding changes not yet committed
+PENDING_SUFFIX = ".pending"
+
+
+class _StringColumn:
+    """
+    Read-only column of UTF-8 strings: an int64 offsets table (n + 1
+    entries) plus a byte blob, both memory-mapped.
+    """
+
+    def __init__(self, idx_path: Path, bin_path: Path) -> None:
+        self.offsets = _memmap(idx_path, "int64")
+        self.blob = _memmap(bin_path, "uint8")
+
+    def __len__(self) -> int:
+        return max(len(self.offsets) - 1, 0)
+
+    def __getitem__(self, row: int) -> str:
+        start, end = self.offsets[row], self.offsets[row + 1]
+        return self.blob[start:end].tobytes().decode("utf-8")
+
+
+def _memmap(path: Path, dtype: str) -> np.ndarray:
+    # mmap cannot map an empty file
+    if path.stat().st_size == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r")
+
+
+class ChunkStore:
+    """
+    Columnar, memory-mapped chunk metadata and text indexed by FAISS row id.
+
+    Opening the store maps the files without reading them, so startup cost
+    and resident memory do not grow with the corpus; rows are decoded only
+    when accessed.
+
+    append / remove_rows stage their changes in *.pending files, which
+    this instance reads from, and commit() swaps them in. Until then the
+    committed files still describe the same rows as the index saved next
+    to them (appends only add unreferenced bytes past the end of a blob),
+    so an interrupted update leaves a loadable store.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        # Column file names ("text.bin", ...) with a pending version
+        self._staged: set[str] = set()
+        self._open()
+
+    def _file(self, filename: str) -> Path:
+        if filename in self._staged:
+            filename += PENDING_SUFFIX
+        return self.path / filename
+
+    def _open(self) -> None:
+        self._columns = {
+            name: _StringColumn(
+                self._file(f"{name}.idx"),
+                self._file(f"{name}.bin"),
+            )
+            for name in COLUMNS
+        }
+
+    @staticmethod
+    def exists(path: Path) -> bool:
+        return all(
+            (path / f"{name}.idx").exists() and (path / f"{name}.bin").exists()
+            for name in COLUMNS
+        )
+
+    @staticmethod
+    def files(path: Path) -> list[Path]:
+        return [
+            path / f"{name}.{ext}"
+            for name in COLUMNS
+            for ext in ("idx", "bin")
+        ]
+
+    @classmethod
+    def write(cls, path: Path, records: Iterable[dict[str, str]]) -> int:
+        """
+        Write records (with chunk_id, document_id, source and text) in row
+        order. Files are written next to the targets and swapped in at the
+        end. Returns the number of rows written.
+        """
+        path.mkdir(parents=True, exist_ok=True)
+
+        offsets = {name: array("q", [0]) for name in COLUMNS}
+        blobs = {
+            name: (path / f"{name}.bin.tmp").open("wb")
+            for name in COLUMNS
+        }
+        count = 0
+
+        try:
+            for record in records:
+                for name in COLUMNS:
+                    data = str(record.get(name, "")).encode("utf-8")
+                    blobs[name].write(data)
+                    offsets[name].append(offsets[name][-1] + len(data))
+                count += 1
+        finally:
+            for f in blobs.values():
+                f.close()
+
+        for name in COLUMNS:
+            idx_tmp = path / f"{name}.idx.tmp"
+            with idx_tmp.open("wb") as f:
+                offsets[name].tofile(f)
+            idx_tmp.replace(path / f"{name}.idx")
+            (path / f"{name}.bin.tmp").replace(path / f"{name}.bin")
+
+        return count
+
+    @property
+    def dirty(self) -> bool:
+        """True if there are staged changes not yet committed."""
+        return bool(self._staged)
+
+    def append(self, records: Iterable[dict[str, str]]) -> int:
+        """
+        Append records. Text goes to the end of each blob, past the bytes
+        the committed offsets reference (a pending blob if rows were
+        removed); the new offsets go to a pending offsets table. Returns
+        the rows added.
+        """
+        records = list(records)
+        if not records:
+            return 0
+
+        self.close()
+        for name in COLUMNS:
+            idx_name = f"{name}.idx"
+            if idx_name not in self._staged:
+                shutil.copyfile(
+                    self.path / idx_name,
+                    self.path / (idx_name + PENDING_SUFFIX),
+                )
+                self._staged.add(idx_name)
+
+            idx_path = self._file(idx_name)
+            end = int(_memmap(idx_path, "int64")[-1])
+
+            offsets = array("q")
+            with self._file(f"{name}.bin").open("r+b") as f:
+                # Drop bytes left by an interrupted append
+                f.truncate(end)
+                f.seek(end)
+                for record in records:
+                    data = str(record.get(name, "")).encode("utf-8")
+                    f.write(data)
+                    end += len(data)
+                    offsets.append(end)
+
+            with idx_path.open("ab") as f:
+                offsets.tofile(f)
+
+        self._open()
+        return len(records)
+
+    def remove_rows(self, rows: np.ndarray) -> None:
+        """
+        Delete rows into pending files. Each column is rewritten by
+        copying the byte ranges of the kept rows (one slice per run of
+        consecutive rows) and shifting their offsets; nothing is decoded.
+        """
+        keep = np.ones(len(self), dtype=bool)
+        keep[rows] = False
+
+        # Runs of kept rows as half-open [start, end) row ranges
+        edges = np.diff(np.concatenate(([0], keep.astype("int8"), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+
+        pending = PENDING_SUFFIX + ".tmp"
+        for name, col in self._columns.items():
+            offsets = np.asarray(col.offsets)
+            with (self.path / f"{name}.bin{pending}").open("wb") as f:
+                for start, end in zip(starts, ends):
+                    f.write(col.blob[offsets[start]:offsets[end]])
+
+            new_offsets = np.zeros(int(keep.sum()) + 1, dtype="int64")
+            np.cumsum(np.diff(offsets)[keep], out=new_offsets[1:])
+            new_offsets.tofile(self.path / f"{name}.idx{pending}")
+
+        self.close()
+        for name in COLUMNS:
+            for ext in ("idx", "bin"):
+                filename = f"{name}.{ext}"
+                (self.path / (filename + pending)).replace(
+                    self.path / (filename + PENDING_SUFFIX)
+                )
+                self._staged.add(filename)
+        self._open()
+
+    def commit(self) -> None:
+        """Swap staged changes in over the committed files."""
+        if not self._staged:
+            return
+
+        self.close()
+        for filename in sorted(self._staged):
+            (self.path / (filename + PENDING_SUFFIX)).replace(
+                self.path / filename
+            )
+        self._staged.clear()
+        self._open()
+
+    def discard(self) -> None:
+        """Drop staged changes; the committed rows are served again."""
+        self.close()
+        for filename in self._staged:
+            (self.path / (filename + PENDING_SUFFIX)).unlink(missing_ok=True)
+        self._staged.clear()
+        self._open()
+
+    def close(self) -> None:
+        # Drop the maps so the files can be replaced (required on Windows)
+        self._columns = {}
+
+    def __len__(self) -> int:
+        return len(self._columns["chunk_id"])
+
+    def __getitem__(self, row: int) -> dict[str, str]:
+        return {name: col[row] for name, col in self._columns.items()}
+
+    def __iter__(self) -> Iterator[dict[str, str]]:
+        for row in range(len(self)):
+            yield self[row]
+
+    def column(self, name: str) -> Iterator[str]:
+        col = self._columns[name]
+        for row in range(len(col)):
+            yield col[row]
+
+    def text(self, row: int) -> str:
+        return self._columns["text"][row]
@@ -0,0 +1,88 @@
+import threading
+from collections.abc import Callable, Collection, Iterable
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import faiss
+
+
+class RowGroups:
+    """
+    Lazily built value -> row ids maps for the filterable metadata columns
+    of one index, used to turn document_id / source filters into row masks.
+
+    column(name) must yield the column's values in row order. Call
+    invalidate() whenever rows are added or removed.
+    """
+
+    def __init__(self, column: Callable[[str], Iterable[str]]) -> None:
+        self._column = column
+        self._groups: dict[str, dict[str, np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._groups = {}
+
+    def _rows_by(self, name: str) -> dict[str, np.ndarray]:
+        with self._lock:
+            groups = self._groups.get(name)
+            if groups is None:
+                rows: dict[str, list[int]] = {}
+                for row, value in enumerate(self._column(name)):
+                    rows.setdefault(value, []).append(row)
+                groups = {
+                    value: np.array(ids, dtype="int64")
+                    for value, ids in rows.items()
+                }
+                self._groups[name] = groups
+            return groups
+
+    def mask(
+        self,
+        num_rows: int,
+        *,
+        document_ids: Collection[str] | None = None,
+        sources: Collection[str] | None = None,
+    ) -> np.ndarray | None:
+        """
+        Boolean mask of rows matching every given filter (any of the listed
+        values per column), or None when no filter is given.
+        """
+        mask: np.ndarray | None = None
+
+        for name, values in (
+            ("document_id", document_ids),
+            ("source", sources),
+        ):
+            if values is None:
+                continue
+
+            groups = self._rows_by(name)
+            column_mask = np.zeros(num_rows, dtype=bool)
+            for value in values:
+                rows = groups.get(value)
+                if rows is not None:
+                    column_mask[rows] = True
+
+            mask = column_mask if mask is None else mask & column_mask
+
+        return mask
+
+
+def bitmap_selector(
+    mask: np.ndarray,
+) -> tuple["faiss.IDSelector", np.ndarray]:
+    """
+    FAISS IDSelectorBitmap for a boolean row mask. The bitmap array is
+    returned too: FAISS only keeps a pointer, so the caller must hold on to
+    it for as long as the selector is used.
+    """
+    import faiss
+
+    # IDSelectorBitmap tests bit (i & 7) of byte i >> 3
+    bitmap = np.packbits(mask, bitorder="little")
+    selector = faiss.IDSelectorBitmap(len(mask), faiss.swig_ptr(bitmap))
+    return selector, bitmap
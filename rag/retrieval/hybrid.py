@@ -0,0 +1,185 @@
+import logging
+from collections.abc import Collection
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+
+from rag.models import SearchResult
+from rag.retrieval.lexical import BM25Index
+from rag.retrieval.sharded import ShardedVectorStore
+from rag.retrieval.store import FaissVectorStore, select_results
+
+logger = logging.getLogger(__name__)
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: list[list[SearchResult]],
+    *,
+    rrf_k: int = 60,
+) -> list[SearchResult]:
+    """
+    Merge ranked result lists by reciprocal rank fusion: each chunk scores
+    sum(1 / (rrf_k + rank)) over the lists it appears in, and that is its
+    score in the result. Only ranks are used, so BM25 and cosine scores
+    need no calibration. A chunk found by several lists keeps the record
+    (row, dense_score) of the first list that found it densely, else of
+    the first list.
+    """
+    fused: dict[str, float] = {}
+    items: dict[str, SearchResult] = {}
+
+    for results in ranked_lists:
+        for rank, item in enumerate(results, start=1):
+            chunk_id = item.chunk_id
+            fused[chunk_id] = fused.get(chunk_id, 0.0) + 1.0 / (rrf_k + rank)
+
+            first = items.get(chunk_id)
+            if first is None or (
+                first.dense_score is None and item.dense_score is not None
+            ):
+                items[chunk_id] = item
+
+    ranked = sorted(fused, key=fused.__getitem__, reverse=True)
+    return [
+        replace(items[chunk_id], score=fused[chunk_id])
+        for chunk_id in ranked
+    ]
+
+
+class HybridSearcher:
+    """
+    Dense vector search, optionally fused with BM25 lexical search.
+
+    Without a lexical index this is a plain pass-through to the vector
+    store. With one, each retriever contributes its top
+    `candidates_per_retriever` (default 2k) and the lists are fused by RRF,
+    so exact term and name matches surface even when the embedding misses
+    them.
+    """
+
+    def __init__(
+        self,
+        store: FaissVectorStore | ShardedVectorStore,
+        lexical: BM25Index | None = None,
+        *,
+        rrf_k: int = 60,
+        candidates_per_retriever: int = 0,
+    ) -> None:
+        self.store = store
+        self.lexical = lexical
+        self.rrf_k = rrf_k
+        self.candidates_per_retriever = candidates_per_retriever
+
+    @classmethod
+    def from_settings(
+        cls,
+        store: FaissVectorStore | ShardedVectorStore,
+    ) -> "HybridSearcher":
+        from rag.config import settings
+
+        return cls(
+            store,
+            load_lexical_index(settings.lexical_index_dir),
+            rrf_k=settings.rrf_k,
+            candidates_per_retriever=settings.hybrid_candidates,
+        )
+
+    def _candidates(self, k: int) -> int:
+        return self.candidates_per_retriever or 2 * k
+
+    def search(
+        self,
+        question: str,
+        query_vector: np.ndarray,
+        k: int = 5,
+        *,
+        min_score: float | None = None,
+        dedup_documents: bool = False,
+        document_ids: Collection[str] | None = None,
+        sources: Collection[str] | None = None,
+    ) -> list[SearchResult]:
+        return self.search_batch(
+            [question],
+            np.asarray(query_vector, dtype="float32").reshape(1, -1),
+            k=k,
+            min_score=min_score,
+            dedup_documents=dedup_documents,
+            document_ids=document_ids,
+            sources=sources,
+        )[0]
+
+    def search_batch(
+        self,
+        questions: list[str],
+        query_vectors: np.ndarray,
+        k: int = 5,
+        *,
+        min_score: float | None = None,
+        dedup_documents: bool = False,
+        document_ids: Collection[str] | None = None,
+        sources: Collection[str] | None = None,
+    ) -> list[list[SearchResult]]:
+        """
+        Search several questions (with their embeddings, in the same order)
+        in one vector-store call. Returns one result list per question.
+
+        Fused results are scored by RRF and keep their dense_score; hits
+        found only by BM25 have none. min_score is a floor on the dense
+        score: dense candidates below it are dropped before fusion, and a
+        question with no dense candidate above it is off-corpus and gets
+        nothing, however many words BM25 matched.
+
+        document_ids / sources restrict both retrievers to those documents
+        / source files.
+        """
+        filters = {"document_ids": document_ids, "sources": sources}
+
+        if self.lexical is None:
+            return self.store.search_batch(
+                query_vectors,
+                k=k,
+                min_score=min_score,
+                dedup_documents=dedup_documents,
+                **filters,
+            )
+
+        n = self._candidates(k)
+        dense = self.store.search_batch(
+            query_vectors,
+            k=n,
+            min_score=min_score,
+            **filters,
+        )
+
+        results: list[list[SearchResult]] = []
+        for question, dense_hits in zip(questions, dense):
+            if not dense_hits and min_score is not None:
+                results.append([])
+                continue
+
+            fused = reciprocal_rank_fusion(
+                [dense_hits, self.lexical.search(question, k=n, **filters)],
+                rrf_k=self.rrf_k,
+            )
+            results.append(
+                select_results(
+                    fused,
+                    k=k,
+                    dedup_documents=dedup_documents,
+                )
+            )
+
+        return results
+
+
+def load_lexical_index(path: Path) -> BM25Index | None:
+    """Open the BM25 index if hybrid search is enabled and it was built."""
+    from rag.config import settings
+
+    if not settings.hybrid_search:
+        return None
+    if not BM25Index.exists(path):
+        logger.info("No lexical index at %s; using dense search only", path)
+        return None
+    return BM25Index(path)
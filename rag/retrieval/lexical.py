@@ -0,0 +1,219 @@
+import json
+import logging
+import re
+from array import array
+from collections import Counter
+from collections.abc import Collection, Iterable
+from pathlib import Path
+
+import numpy as np
+
+from rag.models import SearchResult
+from rag.retrieval.chunk_store import ChunkStore
+from rag.retrieval.filters import RowGroups
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Arrays stored as .npy and memory-mapped on load
+_ARRAYS = ("offsets", "postings", "term_freqs", "doc_lengths")
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.casefold())
+
+
+class BM25Index:
+    """
+    Okapi BM25 over chunk texts, backed by a compact inverted index.
+
+    Layout (one directory):
+    - vocab.json         : term -> term id
+    - offsets.npy        : int64, term id -> start of its posting list
+    - postings.npy       : int32 chunk rows, grouped by term, ascending
+    - term_freqs.npy     : uint16 term frequency for each posting
+    - doc_lengths.npy    : int32 tokens per chunk
+    - meta.json          : k1, b, average chunk length
+    - ChunkStore columns : chunk metadata and text by row
+
+    Arrays are memory-mapped, so a query touches only the posting lists of
+    its own terms. Results carry the same metadata (with text) as dense
+    search results; their row is None since BM25 rows are not vector
+    store rows.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+        with (path / "meta.json").open("r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.k1 = float(meta["k1"])
+        self.b = float(meta["b"])
+        self.avg_length = float(meta["avg_length"])
+
+        with (path / "vocab.json").open("r", encoding="utf-8") as f:
+            self.vocab: dict[str, int] = json.load(f)
+
+        self.offsets = np.load(path / "offsets.npy", mmap_mode="r")
+        self.postings = np.load(path / "postings.npy", mmap_mode="r")
+        self.term_freqs = np.load(path / "term_freqs.npy", mmap_mode="r")
+        self.doc_lengths = np.load(path / "doc_lengths.npy", mmap_mode="r")
+        self.chunks = ChunkStore(path)
+        self._row_groups = RowGroups(self.chunks.column)
+
+        # Per-document length normalisation, reused by every query
+        relative_length = self.doc_lengths / max(self.avg_length, 1.0)
+        self._norm = (
+            self.k1 * (1 - self.b + self.b * relative_length)
+        ).astype("float32")
+
+    @staticmethod
+    def exists(path: Path) -> bool:
+        return (path / "meta.json").exists() and ChunkStore.exists(path)
+
+    @classmethod
+    def build(
+        cls,
+        path: Path,
+        records: Iterable[dict[str, str]],
+        *,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> int:
+        """
+        Index records (chunk_id, document_id, source, text) in row order
+        and write the index to path. Returns the number of chunks indexed.
+        """
+        vocab: dict[str, int] = {}
+        term_rows: list[array] = []
+        term_tfs: list[array] = []
+        doc_lengths = array("i")
+
+        def _rows(records: Iterable[dict[str, str]]):
+            for row, record in enumerate(records):
+                tokens = tokenize(record["text"])
+                doc_lengths.append(len(tokens))
+                for term, tf in Counter(tokens).items():
+                    term_id = vocab.get(term)
+                    if term_id is None:
+                        term_id = vocab[term] = len(vocab)
+                        term_rows.append(array("i"))
+                        term_tfs.append(array("H"))
+                    term_rows[term_id].append(row)
+                    term_tfs[term_id].append(min(tf, 0xFFFF))
+                yield record
+
+        # Chunk metadata is written while the postings are collected
+        count = ChunkStore.write(path, _rows(records))
+
+        offsets = np.zeros(len(vocab) + 1, dtype="int64")
+        offsets[1:] = np.cumsum([len(rows) for rows in term_rows])
+        postings = np.empty(offsets[-1], dtype="int32")
+        term_freqs = np.empty(offsets[-1], dtype="uint16")
+        for term_id, (rows, tfs) in enumerate(zip(term_rows, term_tfs)):
+            start, end = offsets[term_id], offsets[term_id + 1]
+            postings[start:end] = np.frombuffer(rows, dtype="int32")
+            term_freqs[start:end] = np.frombuffer(tfs, dtype="uint16")
+
+        lengths = np.frombuffer(doc_lengths, dtype="int32")
+        arrays = {
+            "offsets": offsets,
+            "postings": postings,
+            "term_freqs": term_freqs,
+            "doc_lengths": lengths,
+        }
+        for name in _ARRAYS:
+            np.save(path / f"{name}.npy", arrays[name])
+
+        with (path / "vocab.json").open("w", encoding="utf-8") as f:
+            json.dump(vocab, f, ensure_ascii=False)
+        with (path / "meta.json").open("w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "k1": k1,
+                    "b": b,
+                    "avg_length": float(lengths.mean()) if count else 0.0,
+                    "num_chunks": count,
+                },
+                f,
+            )
+
+        logger.info(
+            "BM25 index: %d chunks, %d terms, %d postings",
+            count,
+            len(vocab),
+            len(postings),
+        )
+        return count
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        *,
+        document_ids: Collection[str] | None = None,
+        sources: Collection[str] | None = None,
+    ) -> list[SearchResult]:
+        """
+        Top-k chunks by BM25 score, best first, optionally restricted to
+        the given documents / source files.
+        """
+        n = len(self)
+        term_ids = {
+            self.vocab[term] for term in tokenize(query) if term in self.vocab
+        }
+        if n == 0 or not term_ids:
+            return []
+
+        mask = self._row_groups.mask(
+            n,
+            document_ids=document_ids,
+            sources=sources,
+        )
+        if mask is not None and not mask.any():
+            return []
+
+        scores = np.zeros(n, dtype="float32")
+        for term_id in term_ids:
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            rows = self.postings[start:end]
+            tfs = self.term_freqs[start:end].astype("float32")
+
+            df = end - start
+            idf = np.log1p((n - df + 0.5) / (df + 0.5))
+            scores[rows] += (
+                idf * tfs * (self.k1 + 1) / (tfs + self._norm[rows])
+            )
+        if mask is not None:
+            scores[~mask] = 0.0
+
+        k = min(k, n)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            SearchResult(
+                row=None,
+                score=float(scores[row]),
+                metadata=self.chunks[int(row)],
+            )
+            for row in top
+            if scores[row] > 0
+        ]
+
+
+def iter_chunk_records(chunks_path: Path) -> Iterable[dict[str, str]]:
+    """Stream chunks.jsonl as flat records for BM25Index.build."""
+    with chunks_path.open("r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            yield {
+                "chunk_id": record["id"],
+                "document_id": record["document_id"],
+                "source": record["metadata"]["source"],
+                "text": record["text"],
+            }
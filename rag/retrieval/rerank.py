@@ -0,0 +1,191 @@
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import replace
+
+from rag.embeddings.embedder import normalize_question
+from rag.models import SearchResult
+
+logger = logging.getLogger(__name__)
+
+# (normalized question, chunk_id)
+_Key = tuple[str, str]
+
+
+class CrossEncoderReranker:
+    """
+    Reorders retrieved chunks by a local cross-encoder's (question, chunk)
+    relevance score and keeps the best top_k for the prompt.
+
+    Pairs are scored in as few predict() calls as possible: every uncached
+    pair of every question goes into one call. Scores are kept in an LRU
+    (cache_size entries) keyed by normalized question and chunk id.
+
+    With early_exit_score set, candidates are scored in retrieval order,
+    batch_size at a time, and scoring stops once top_k of them reach that
+    score; unscored candidates are not considered. Scores are raw model
+    outputs (logits for the ms-marco models).
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        *,
+        cache_size: int = 4096,
+        batch_size: int = 32,
+        early_exit_score: float | None = None,
+    ) -> None:
+        from sentence_transformers import CrossEncoder
+
+        self.model_name = model_name
+        self.model = CrossEncoder(model_name)
+        self.batch_size = batch_size
+        self.early_exit_score = early_exit_score
+
+        self.cache_size = cache_size
+        self._cache: OrderedDict[_Key, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+        logger.info("Reranker ready | model=%s", model_name)
+
+    @classmethod
+    def from_settings(cls) -> "CrossEncoderReranker":
+        from rag.config import settings
+
+        return cls(
+            settings.reranker_model_name,
+            cache_size=settings.rerank_cache_size,
+            batch_size=settings.rerank_batch_size,
+            early_exit_score=settings.rerank_early_exit_score,
+        )
+
+    def _cached(self, keys: list[_Key]) -> dict[_Key, float]:
+        found: dict[_Key, float] = {}
+        with self._lock:
+            for key in keys:
+                score = self._cache.get(key)
+                if score is not None:
+                    self._cache.move_to_end(key)
+                    found[key] = score
+        return found
+
+    def _score(
+        self,
+        keys: list[_Key],
+        pairs: list[tuple[str, str]],
+    ) -> dict[_Key, float]:
+        if not pairs:
+            return {}
+
+        scores = self.model.predict(
+            pairs,
+            batch_size=self.batch_size,
+            show_progress_bar=False,
+        )
+        scored = {key: float(score) for key, score in zip(keys, scores)}
+
+        with self._lock:
+            for key, score in scored.items():
+                self._cache[key] = score
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return scored
+
+    def rerank(
+        self,
+        question: str,
+        retrieved: list[SearchResult],
+        *,
+        top_k: int,
+        chunk_texts: Mapping[str, str] | None = None,
+    ) -> list[SearchResult]:
+        return self.rerank_batch(
+            [question],
+            [retrieved],
+            top_k=top_k,
+            chunk_texts=chunk_texts,
+        )[0]
+
+    def rerank_batch(
+        self,
+        questions: list[str],
+        retrieved: list[list[SearchResult]],
+        *,
+        top_k: int,
+        chunk_texts: Mapping[str, str] | None = None,
+    ) -> list[list[SearchResult]]:
+        """
+        Rerank each question's retrieved chunks and return the top_k per
+        question, best first, with rerank_score set. Chunk text comes
+        from the result record or, failing that, chunk_texts.
+        """
+        chunk_texts = chunk_texts or {}
+
+        def _text(item: SearchResult) -> str:
+            return item.text or chunk_texts.get(item.chunk_id, "")
+
+        def _keys(question: str, items: list[SearchResult]) -> list[_Key]:
+            q = normalize_question(question)
+            return [(q, item.chunk_id) for item in items]
+
+        scores: dict[_Key, float] = {}
+
+        if self.early_exit_score is None:
+            # All uncached pairs of all questions in one predict() call
+            misses: dict[_Key, tuple[str, str]] = {}
+            for question, items in zip(questions, retrieved):
+                keys = _keys(question, items)
+                scores.update(self._cached(keys))
+                for key, item in zip(keys, items):
+                    if key not in scores and key not in misses:
+                        misses[key] = (question, _text(item))
+            scores.update(self._score(list(misses), list(misses.values())))
+        else:
+            threshold = self.early_exit_score
+            for question, items in zip(questions, retrieved):
+                keys = _keys(question, items)
+                scores.update(self._cached(keys))
+
+                for start in range(0, len(items), self.batch_size):
+                    todo = [
+                        row
+                        for row in range(start, start + self.batch_size)
+                        if row < len(items) and keys[row] not in scores
+                    ]
+                    scores.update(
+                        self._score(
+                            [keys[row] for row in todo],
+                            [(question, _text(items[row])) for row in todo],
+                        )
+                    )
+
+                    confident = sum(
+                        scores.get(key, threshold - 1) >= threshold
+                        for key in keys
+                    )
+                    if confident >= top_k:
+                        break
+
+        reranked: list[list[SearchResult]] = []
+        for question, items in zip(questions, retrieved):
+            scored = [
+                replace(item, rerank_score=scores[key])
+                for key, item in zip(_keys(question, items), items)
+                if key in scores
+            ]
+            scored.sort(key=lambda item: item.rerank_score, reverse=True)
+            reranked.append(scored[:top_k])
+
+        return reranked
+
+
+def load_reranker() -> CrossEncoderReranker | None:
+    """The configured reranker, or None when reranking is disabled."""
+    from rag.config import settings
+
+    if not settings.rerank_enabled:
+        return None
+    return CrossEncoderReranker.from_settings()
@@ -0,0 +1,446 @@
+import heapq
+import json
+import logging
+import os
+import shutil
+import threading
+from collections.abc import Collection
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from rag.models import SearchResult
+from rag.retrieval.chunk_store import ChunkStore
+from rag.retrieval.store import FaissVectorStore
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "shards.json"
+SHARDS_DIR = "shards"
+
+
+@dataclass
+class _Shard:
+    name: str
+    count: int = 0
+    document_ids: set[str] = field(default_factory=set)
+    store: FaissVectorStore | None = None
+    dirty: bool = False
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class ShardedVectorStore:
+    """
+    Vector store split into independent FaissVectorStore shards of about
+    shard_size chunks.
+
+    All chunks of a document live in the same shard, so adding or removing
+    a document only rebuilds and re-saves that shard. shards.json records
+    each shard's size and documents; shards are opened on first use unless
+    loaded eagerly. A query fans out to every shard on a thread pool (FAISS
+    releases the GIL while searching) and the per-shard top-k lists are
+    merged by score.
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        *,
+        shard_size: int,
+        search_threads: int = 0,
+        index_params: dict[str, Any] | None = None,
+    ) -> None:
+        if shard_size <= 0:
+            raise ValueError("shard_size must be positive")
+
+        self.dimension = dimension
+        self.shard_size = shard_size
+        self.index_params = dict(index_params or {})
+        self.path: Path | None = None
+        self._shards: list[_Shard] = []
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=search_threads or os.cpu_count() or 1,
+            thread_name_prefix="shard-search",
+        )
+
+    @classmethod
+    def from_settings(cls, dimension: int) -> "ShardedVectorStore":
+        from rag.config import settings
+
+        return cls(
+            dimension,
+            shard_size=settings.vector_shard_size,
+            search_threads=settings.vector_search_threads,
+            index_params={
+                "index_type": settings.vector_index_type,
+                "nlist": settings.ivf_nlist,
+                "pq_m": settings.pq_m,
+                "pq_nbits": settings.pq_nbits,
+                "hnsw_m": settings.hnsw_m,
+                "hnsw_ef_construction": settings.hnsw_ef_construction,
+                "nprobe": settings.ivf_nprobe,
+                "ef_search": settings.hnsw_ef_search,
+                "train_sample": settings.index_train_sample,
+            },
+        )
+
+    @staticmethod
+    def exists(path: Path) -> bool:
+        return (path / MANIFEST_NAME).exists()
+
+    def close(self) -> None:
+        """Stop the shard search threads. The store cannot search after."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "ShardedVectorStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _shard_path(self, shard: _Shard) -> Path:
+        return self.path / SHARDS_DIR / shard.name
+
+    def _store(self, shard: _Shard) -> FaissVectorStore:
+        """Return the shard's store, loading it on first use."""
+        with shard.lock:
+            if shard.store is None:
+                if self.path is not None and self._shard_path(shard).exists():
+                    logger.debug("Loading shard %s", shard.name)
+                    shard.store = FaissVectorStore.load(
+                        self._shard_path(shard),
+                        nprobe=self.index_params.get("nprobe"),
+                        ef_search=self.index_params.get("ef_search"),
+                    )
+                else:
+                    shard.store = FaissVectorStore(
+                        self.dimension,
+                        **self.index_params,
+                    )
+            return shard.store
+
+    def _new_shard(self) -> _Shard:
+        taken = {shard.name for shard in self._shards}
+        number = len(self._shards)
+        while f"shard-{number:05d}" in taken:
+            number += 1
+
+        shard = _Shard(name=f"shard-{number:05d}")
+        self._shards.append(shard)
+        return shard
+
+    @property
+    def ntotal(self) -> int:
+        return sum(shard.count for shard in self._shards)
+
+    @property
+    def num_shards(self) -> int:
+        return len(self._shards)
+
+    @property
+    def has_texts(self) -> bool:
+        """True if search results carry chunk text (no chunks.jsonl needed)."""
+        for shard in self._shards:
+            if shard.count:
+                return self._store(shard).has_texts
+        return False
+
+    def add(
+        self,
+        vectors: np.ndarray,
+        metadatas: list[dict[str, str]],
+    ) -> None:
+        """
+        Add vectors, keeping each document in a single shard: documents
+        already stored go to their shard, new ones fill the last shard
+        until it reaches shard_size.
+        """
+        array = np.ascontiguousarray(vectors, dtype="float32")
+
+        shard_of = {
+            document_id: shard
+            for shard in self._shards
+            for document_id in shard.document_ids
+        }
+
+        # Rows grouped by document, in first-seen order
+        documents: dict[str, list[int]] = {}
+        for row, meta in enumerate(metadatas):
+            documents.setdefault(meta["document_id"], []).append(row)
+
+        assigned: dict[str, list[int]] = {}
+        for document_id, rows in documents.items():
+            shard = shard_of.get(document_id)
+            if shard is None:
+                shard = self._shards[-1] if self._shards else None
+                if shard is None or shard.count >= self.shard_size:
+                    shard = self._new_shard()
+                shard_of[document_id] = shard
+                shard.document_ids.add(document_id)
+
+            shard.count += len(rows)
+            assigned.setdefault(shard.name, []).extend(rows)
+
+        for shard in self._shards:
+            rows = assigned.get(shard.name)
+            if not rows:
+                continue
+            self._store(shard).add(
+                array[rows],
+                [metadatas[row] for row in rows],
+            )
+            shard.dirty = True
+
+    def remove_documents(self, document_ids: set[str]) -> int:
+        """
+        Drop every vector belonging to the given documents. Only the shards
+        holding them are loaded and rebuilt. Returns the number removed.
+        """
+        removed = 0
+        for shard in self._shards:
+            hit = shard.document_ids & document_ids
+            if not hit:
+                continue
+
+            count = self._store(shard).remove_documents(hit)
+            shard.document_ids -= hit
+            shard.count -= count
+            shard.dirty = True
+            removed += count
+
+        return removed
+
+    def save(self, path: Path) -> None:
+        """
+        Save dirty shards and the manifest. Shards that did not change
+        since load are left untouched (or copied when saving elsewhere).
+        """
+        path.mkdir(parents=True, exist_ok=True)
+        shards_dir = path / SHARDS_DIR
+        shards_dir.mkdir(exist_ok=True)
+        same_place = (
+            self.path is not None and self.path.resolve() == path.resolve()
+        )
+
+        # Emptied shards are dropped
+        kept = [shard for shard in self._shards if shard.count]
+
+        for shard in kept:
+            target = shards_dir / shard.name
+            if shard.dirty or (shard.store is not None and not same_place):
+                self._store(shard).save(target)
+            elif not same_place:
+                shutil.copytree(
+                    self._shard_path(shard),
+                    target,
+                    dirs_exist_ok=True,
+                )
+
+        manifest = {
+            "dimension": self.dimension,
+            "shard_size": self.shard_size,
+            "index_params": self.index_params,
+            "shards": [
+                {
+                    "name": shard.name,
+                    "count": shard.count,
+                    "document_ids": sorted(shard.document_ids),
+                }
+                for shard in kept
+            ],
+        }
+        tmp = path / f"{MANIFEST_NAME}.tmp"
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        tmp.replace(path / MANIFEST_NAME)
+
+        names = {shard.name for shard in kept}
+        for stale in shards_dir.iterdir():
+            if stale.name not in names:
+                shutil.rmtree(stale, ignore_errors=True)
+
+        # Replace a single-index store previously saved here
+        for stale in [
+            path / "index.faiss",
+            path / "metadata.json",
+            *ChunkStore.files(path),
+        ]:
+            stale.unlink(missing_ok=True)
+
+        self._shards = kept
+        self.path = path
+        for shard in kept:
+            shard.dirty = False
+
+    @classmethod
+    def load(
+        cls,
+        path: Path,
+        *,
+        lazy: bool = True,
+        search_threads: int = 0,
+        nprobe: int | None = None,
+        ef_search: int | None = None,
+    ) -> "ShardedVectorStore":
+        """
+        Open a saved sharded store. nprobe / ef_search override the search
+        parameters the shards were saved with.
+        """
+        with (path / MANIFEST_NAME).open("r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        index_params = dict(manifest["index_params"])
+        if nprobe is not None:
+            index_params["nprobe"] = nprobe
+        if ef_search is not None:
+            index_params["ef_search"] = ef_search
+
+        store = cls(
+            manifest["dimension"],
+            shard_size=manifest["shard_size"],
+            search_threads=search_threads,
+            index_params=index_params,
+        )
+        store.path = path
+        store._shards = [
+            _Shard(
+                name=entry["name"],
+                count=entry["count"],
+                document_ids=set(entry["document_ids"]),
+            )
+            for entry in manifest["shards"]
+        ]
+
+        if not lazy:
+            list(store._executor.map(store._store, store._shards))
+
+        logger.info(
+            "Opened sharded vector store | shards=%d | vectors=%d | lazy=%s",
+            len(store._shards),
+            store.ntotal,
+            lazy,
+        )
+        return store
+
+    def search(
+        self,
+        query_vector: np.ndarray,
+        k: int = 5,
+        *,
+        min_score: float | None = None,
+        dedup_documents: bool = False,
+        document_ids: Collection[str] | None = None,
+        sources: Collection[str] | None = None,
+    ) -> list[SearchResult]:
+        return self.search_batch(
+            np.asarray(query_vector, dtype="float32").reshape(1, -1),
+            k=k,
+            min_score=min_score,
+            dedup_documents=dedup_documents,
+            document_ids=document_ids,
+            sources=sources,
+        )[0]
+
+    def search_batch(
+        self,
+        query_vectors: np.ndarray,
+        k: int = 5,
+        *,
+        min_score: float | None = None,
+        dedup_documents: bool = False,
+        document_ids: Collection[str] | None = None,
+        sources: Collection[str] | None = None,
+    ) -> list[list[SearchResult]]:
+        """
+        Search every non-empty shard in parallel and keep the k best hits
+        per query across shards. Rows are numbered across shards in shard
+        order. A document lives in one shard, so per-shard dedup is global.
+
+        With document_ids, shards holding none of those documents are
+        skipped without being loaded.
+        """
+        array = np.ascontiguousarray(query_vectors, dtype="float32")
+        if array.ndim == 1:
+            array = array.reshape(1, -1)
+        if len(array) == 0:
+            return []
+
+        shards: list[_Shard] = []
+        bases: list[int] = []
+        base = 0
+        wanted = None if document_ids is None else set(document_ids)
+        for shard in self._shards:
+            if shard.count and (
+                wanted is None or not wanted.isdisjoint(shard.document_ids)
+            ):
+                shards.append(shard)
+                bases.append(base)
+            base += shard.count
+        if not shards:
+            return [[] for _ in range(len(array))]
+
+        def _search(shard: _Shard) -> list[list[SearchResult]]:
+            return self._store(shard).search_batch(
+                array,
+                k=k,
+                min_score=min_score,
+                dedup_documents=dedup_documents,
+                document_ids=wanted,
+                sources=sources,
+            )
+
+        per_shard = list(self._executor.map(_search, shards))
+
+        return [
+            heapq.nlargest(
+                k,
+                (
+                    replace(hit, row=shard_base + hit.row)
+                    for shard_base, hits in zip(bases, per_query)
+                    for hit in hits
+                ),
+                key=lambda hit: hit.score,
+            )
+            for per_query in zip(*per_shard)
+        ]
+
+
+def new_vector_store(
+    dimension: int,
+) -> FaissVectorStore | ShardedVectorStore:
+    """Empty store configured from settings (sharded if vector_shard_size > 0)."""
+    from rag.config import settings
+
+    if settings.vector_shard_size > 0:
+        return ShardedVectorStore.from_settings(dimension)
+    return FaissVectorStore.from_settings(dimension)
+
+
+def vector_store_exists(path: Path) -> bool:
+    return (path / "index.faiss").exists() or ShardedVectorStore.exists(path)
+
+
+def load_vector_store(path: Path) -> FaissVectorStore | ShardedVectorStore:
+    """
+    Open whichever store layout was saved at path, searching with the
+    configured IVF nprobe / HNSW efSearch.
+    """
+    from rag.config import settings
+
+    if ShardedVectorStore.exists(path):
+        return ShardedVectorStore.load(
+            path,
+            lazy=settings.vector_shard_lazy,
+            search_threads=settings.vector_search_threads,
+            nprobe=settings.ivf_nprobe,
+            ef_search=settings.hnsw_ef_search,
+        )
+    return FaissVectorStore.load(
+        path,
+        nprobe=settings.ivf_nprobe,
+        ef_search=settings.hnsw_ef_search,
+    )
@@ -1,52 +1,592 @@
 import json
+import logging
+import shutil
+from collections.abc import Collection, Iterable, Iterator
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
-import faiss
 import numpy as np
 
+from rag.models import SearchResult
+from rag.retrieval.chunk_store import ChunkStore
+from rag.retrieval.filters import RowGroups, bitmap_selector
+
+if TYPE_CHECKING:
+    import faiss
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = (
+    "flat",
+    "sq8",
+    "fp16",
+    "ivf_flat",
+    "ivf_sq8",
+    "ivf_pq",
+    "hnsw",
+)
+
+# Candidates fetched per requested result when deduplicating by document
+_DEDUP_OVERFETCH = 4
+
+# Filtered searches selecting less than this fraction of the rows score the
+# subset directly (non-IVF indexes): the cost then scales with the subset,
+# and an HNSW graph walk would find too few allowed neighbours
+_EXACT_FILTER_FRACTION = 0.1
+
+# FAISS wants roughly this many training points per IVF centroid
+_MIN_POINTS_PER_CENTROID = 39
+
+
+def _factory_string(
+    index_type: str,
+    *,
+    nlist: int,
+    pq_m: int,
+    pq_nbits: int,
+    hnsw_m: int,
+) -> str:
+    if index_type == "flat":
+        return "Flat"
+    if index_type == "sq8":
+        return "SQ8"
+    if index_type == "fp16":
+        return "SQfp16"
+    if index_type == "ivf_flat":
+        return f"IVF{nlist},Flat"
+    if index_type == "ivf_sq8":
+        return f"IVF{nlist},SQ8"
+    if index_type == "ivf_pq":
+        return f"IVF{nlist},PQ{pq_m}x{pq_nbits}"
+    if index_type == "hnsw":
+        return f"HNSW{hnsw_m},Flat"
+    raise ValueError(
+        f"Unknown index type: {index_type} (expected one of {INDEX_TYPES})"
+    )
+
+
+def select_results(
+    candidates: Iterable[SearchResult],
+    *,
+    k: int,
+    min_score: float | None = None,
+    dedup_documents: bool = False,
+) -> list[SearchResult]:
+    """
+    Take up to k results from best-first candidates, stopping at the first
+    one whose dense score is below min_score and skipping further chunks
+    of a document already taken when dedup_documents is set.
+    """
+    selected: list[SearchResult] = []
+    seen: set[str] = set()
+
+    for result in candidates:
+        if len(selected) >= k:
+            break
+        if (
+            min_score is not None
+            and result.dense_score is not None
+            and result.dense_score < min_score
+        ):
+            break
+        if dedup_documents:
+            if result.document_id in seen:
+                continue
+            seen.add(result.document_id)
+        selected.append(result)
+
+    return selected
+
+
+def _index_type_of(index: "faiss.Index") -> str:
+    import faiss
+
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivf_pq"
+    if isinstance(index, faiss.IndexIVFScalarQuantizer):
+        return "ivf_sq8"
+    if isinstance(index, faiss.IndexIVF):
+        return "ivf_flat"
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexScalarQuantizer):
+        qtype = index.sq.qtype
+        return "fp16" if qtype == faiss.ScalarQuantizer.QT_fp16 else "sq8"
+    return "flat"
+
+
+def _renumber_ivf_ids(index: "faiss.IndexIVF", removed: np.ndarray) -> None:
+    """
+    After IVF remove_ids, rewrite each list's ids as old id minus the
+    number of removed ids below it, so ids match row positions again.
+    Codes are copied back byte for byte.
+    """
+    import faiss
+
+    invlists = index.invlists
+    for list_no in range(index.nlist):
+        n = invlists.list_size(list_no)
+        if n == 0:
+            continue
+
+        ids = faiss.rev_swig_ptr(invlists.get_ids(list_no), n).copy()
+        new_ids = ids - np.searchsorted(removed, ids)
+        if np.array_equal(ids, new_ids):
+            continue
+
+        codes = faiss.rev_swig_ptr(
+            invlists.get_codes(list_no),
+            n * invlists.code_size,
+        ).copy()
+        invlists.update_entries(
+            list_no,
+            0,
+            n,
+            faiss.swig_ptr(new_ids),
+            faiss.swig_ptr(codes),
+        )
+
 
 class FaissVectorStore:
-    def __init__(self, dimension: int) -> None:
-        self.index = faiss.IndexFlatIP(dimension)
-        self.metadata: list[dict[str, str]] = []
+    """
+    FAISS index plus row-aligned chunk metadata.
+
+    Metadata that carries chunk text is saved as a memory-mapped
+    ChunkStore and served from it after load; otherwise it falls back to
+    metadata.json. Rows added to or removed from a loaded ChunkStore are
+    staged next to it without reading it into memory, and save() commits
+    them together with the matching index, so the files on disk always
+    describe the same rows.
+
+    All index types use inner product, so normalized embeddings give
+    cosine similarity. IVF variants (and the SQ8 value ranges) are trained
+    on a sample of the first batch added; nprobe / ef_search trade recall
+    for latency at query time. sq8 / fp16 store each dimension in 1 / 2
+    bytes instead of 4 through FAISS's scalar quantizer.
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        *,
+        index_type: str = "flat",
+        nlist: int = 1024,
+        pq_m: int = 16,
+        pq_nbits: int = 8,
+        hnsw_m: int = 32,
+        hnsw_ef_construction: int = 200,
+        nprobe: int = 16,
+        ef_search: int = 64,
+        train_sample: int = 100_000,
+    ) -> None:
+        if index_type == "ivf_pq" and dimension % pq_m != 0:
+            raise ValueError(
+                f"pq_m={pq_m} must divide the embedding dimension {dimension}"
+            )
+
+        self.index_type = index_type
+        self.nlist = nlist
+        self.pq_m = pq_m
+        self.pq_nbits = pq_nbits
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construction = hnsw_ef_construction
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.train_sample = train_sample
+
+        self.index = self._build_index(dimension, nlist)
+        self.metadata: list[dict[str, str]] | ChunkStore = []
+        self._row_groups = RowGroups(self._column)
+        self.set_search_params()
+
+    @classmethod
+    def from_settings(
+        cls,
+        dimension: int,
+        *,
+        index_type: str | None = None,
+    ) -> "FaissVectorStore":
+        from rag.config import settings
+
+        return cls(
+            dimension,
+            index_type=index_type or settings.vector_index_type,
+            nlist=settings.ivf_nlist,
+            pq_m=settings.pq_m,
+            pq_nbits=settings.pq_nbits,
+            hnsw_m=settings.hnsw_m,
+            hnsw_ef_construction=settings.hnsw_ef_construction,
+            nprobe=settings.ivf_nprobe,
+            ef_search=settings.hnsw_ef_search,
+            train_sample=settings.index_train_sample,
+        )
+
+    def _build_index(self, dimension: int, nlist: int) -> "faiss.Index":
+        # faiss is imported on first use so importing rag modules is cheap
+        import faiss
+
+        index = faiss.index_factory(
+            dimension,
+            _factory_string(
+                self.index_type,
+                nlist=nlist,
+                pq_m=self.pq_m,
+                pq_nbits=self.pq_nbits,
+                hnsw_m=self.hnsw_m,
+            ),
+            faiss.METRIC_INNER_PRODUCT,
+        )
+        if self.index_type == "hnsw":
+            index.hnsw.efConstruction = self.hnsw_ef_construction
+        return index
+
+    def set_search_params(
+        self,
+        *,
+        nprobe: int | None = None,
+        ef_search: int | None = None,
+    ) -> None:
+        """
+        Tune query-time recall/latency. Ignored for index types that do
+        not have the parameter.
+        """
+        if nprobe is not None:
+            self.nprobe = nprobe
+        if ef_search is not None:
+            self.ef_search = ef_search
+
+        import faiss
+
+        if isinstance(self.index, faiss.IndexIVF):
+            self.index.nprobe = self.nprobe
+        elif isinstance(self.index, faiss.IndexHNSW):
+            self.index.hnsw.efSearch = self.ef_search
+
+    def _train(self, array: np.ndarray) -> None:
+        import faiss
+
+        n = len(array)
+        nlist = min(self.nlist, max(1, n // _MIN_POINTS_PER_CENTROID))
+        if isinstance(self.index, faiss.IndexIVF) and nlist != self.nlist:
+            logger.warning(
+                "Only %d training vectors; reducing nlist from %d to %d",
+                n,
+                self.nlist,
+                nlist,
+            )
+            self.index = self._build_index(array.shape[1], nlist)
+
+        if n > self.train_sample:
+            rng = np.random.default_rng(0)
+            sample = array[rng.choice(n, self.train_sample, replace=False)]
+        else:
+            sample = array
+
+        logger.info(
+            "Training %s index on %d vectors",
+            self.index_type,
+            len(sample),
+        )
+        self.index.train(sample)
+        self.set_search_params()
+
+    @property
+    def has_texts(self) -> bool:
+        """True if search results carry chunk text (no chunks.jsonl needed)."""
+        if isinstance(self.metadata, ChunkStore):
+            return True
+        return bool(self.metadata) and "text" in self.metadata[0]
+
+    def _column(self, name: str) -> Iterator[str]:
+        if isinstance(self.metadata, ChunkStore):
+            return self.metadata.column(name)
+        return (meta.get(name, "") for meta in self.metadata)
 
     def add(
         self,
-        vectors: list[list[float]],
+        vectors: np.ndarray,
         metadatas: list[dict[str, str]],
     ) -> None:
-        array = np.array(vectors).astype("float32")
+        # No copy when the embedder already produced C-contiguous float32
+        array = np.ascontiguousarray(vectors, dtype="float32")
+        if not self.index.is_trained:
+            self._train(array)
         self.index.add(array)
-        self.metadata.extend(metadatas)
+        if isinstance(self.metadata, ChunkStore):
+            self.metadata.append(metadatas)
+        else:
+            self.metadata.extend(metadatas)
+        self._row_groups.invalidate()
+
+    def remove_documents(self, document_ids: set[str]) -> int:
+        """
+        Drop every vector belonging to the given documents.
+        Remaining rows keep their relative order, so metadata stays aligned.
+        Returns the number of vectors removed.
+        """
+        rows = np.fromiter(
+            (
+                row
+                for row, document_id in enumerate(self._column("document_id"))
+                if document_id in document_ids
+            ),
+            dtype="int64",
+        )
+        if not len(rows):
+            return 0
+
+        self._remove_rows(rows)
+
+        if isinstance(self.metadata, ChunkStore):
+            self.metadata.remove_rows(rows)
+        else:
+            drop = set(rows.tolist())
+            self.metadata = [
+                meta for row, meta in enumerate(self.metadata)
+                if row not in drop
+            ]
+        self._row_groups.invalidate()
+        return len(rows)
+
+    def _remove_rows(self, rows: np.ndarray) -> None:
+        """Remove sorted row ids from the index, keeping row ids dense."""
+        import faiss
+
+        if isinstance(self.index, faiss.IndexFlatCodes):
+            # flat / sq8 / fp16 compact their codes on removal
+            self.index.remove_ids(rows)
+        elif isinstance(self.index, faiss.IndexIVF):
+            # Removal keeps the stored codes untouched (no re-quantization)
+            # but leaves the old ids behind; shift them down afterwards
+            self.index.make_direct_map(False)
+            self.index.remove_ids(rows)
+            _renumber_ivf_ids(self.index, rows)
+        else:
+            # HNSW cannot remove; rebuild the graph from its exact storage
+            keep = np.setdiff1d(
+                np.arange(self.index.ntotal, dtype="int64"),
+                rows,
+                assume_unique=True,
+            )
+            vectors = self.index.reconstruct_batch(keep)
+            self.index.reset()
+            if len(vectors):
+                self.index.add(vectors)
+
+    @property
+    def ntotal(self) -> int:
+        return self.index.ntotal
+
+    def close(self) -> None:
+        """
+        Nothing to release; present so callers can close any vector store
+        (see ShardedVectorStore.close).
+        """
+
+    def __enter__(self) -> "FaissVectorStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
 
     def save(self, path: Path) -> None:
+        """
+        Write the index and metadata to path. The index is written to a
+        temporary file first and renamed once the metadata is in place.
+        A ChunkStore loaded from path gets its staged changes committed;
+        saving it elsewhere copies its rows and serves them from there,
+        leaving the original files untouched.
+        """
+        import faiss
+
         path.mkdir(parents=True, exist_ok=True)
-        faiss.write_index(self.index, str(path / "index.faiss"))
-        with (path / "metadata.json").open("w", encoding="utf-8") as f:
-            json.dump(self.metadata, f)
+        index_tmp = path / "index.faiss.tmp"
+        faiss.write_index(self.index, str(index_tmp))
+
+        # Replace a sharded store previously saved here
+        (path / "shards.json").unlink(missing_ok=True)
+        shutil.rmtree(path / "shards", ignore_errors=True)
+
+        metadata_path = path / "metadata.json"
+
+        if isinstance(self.metadata, ChunkStore):
+            if self.metadata.path.resolve() == path.resolve():
+                self.metadata.commit()
+            else:
+                ChunkStore.write(path, self.metadata)
+                metadata_path.unlink(missing_ok=True)
+                self.metadata.discard()
+                self.metadata = ChunkStore(path)
+        elif self.has_texts:
+            ChunkStore.write(path, self.metadata)
+            metadata_path.unlink(missing_ok=True)
+        else:
+            with metadata_path.open("w", encoding="utf-8") as f:
+                json.dump(self.metadata, f)
+            for stale in ChunkStore.files(path):
+                stale.unlink(missing_ok=True)
+
+        index_tmp.replace(path / "index.faiss")
 
     @classmethod
-    def load(cls, path: Path) -> "FaissVectorStore":
+    def load(
+        cls,
+        path: Path,
+        *,
+        nprobe: int | None = None,
+        ef_search: int | None = None,
+    ) -> "FaissVectorStore":
+        import faiss
+
         index = faiss.read_index(str(path / "index.faiss"))
-        with (path / "metadata.json").open("r", encoding="utf-8") as f:
-            metadata = json.load(f)
+
+        metadata: list[dict[str, str]] | ChunkStore
+        if ChunkStore.exists(path):
+            metadata = ChunkStore(path)
+        else:
+            with (path / "metadata.json").open("r", encoding="utf-8") as f:
+                metadata = json.load(f)
+
+        if index.ntotal != len(metadata):
+            raise ValueError(
+                f"Vector store at {path} is inconsistent: {index.ntotal} "
+                f"vectors but {len(metadata)} metadata rows (an update was "
+                "interrupted before save); rebuild it with scripts/embed.py"
+            )
 
         store = cls(index.d)
         store.index = index
         store.metadata = metadata
+
+        # Search parameters are persisted with the index; override on request
+        store.index_type = _index_type_of(index)
+        if isinstance(index, faiss.IndexIVF):
+            store.nprobe = index.nprobe
+        elif isinstance(index, faiss.IndexHNSW):
+            store.ef_search = index.hnsw.efSearch
+        store.set_search_params(nprobe=nprobe, ef_search=ef_search)
         return store
 
     def search(
         self,
-        query_vector: list[float],
+        query_vector: np.ndarray,
+        k: int = 5,
+        *,
+        min_score: float | None = None,
+        dedup_documents: bool = False,
+        document_ids: Collection[str] | None = None,
+        sources: Collection[str] | None = None,
+    ) -> list[SearchResult]:
+        return self.search_batch(
+            np.asarray(query_vector, dtype="float32").reshape(1, -1),
+            k=k,
+            min_score=min_score,
+            dedup_documents=dedup_documents,
+            document_ids=document_ids,
+            sources=sources,
+        )[0]
+
+    def search_batch(
+        self,
+        query_vectors: np.ndarray,
         k: int = 5,
-    ) -> list[dict[str, str]]:
-        array = np.array([query_vector]).astype("float32")
-        scores, indices = self.index.search(array, k)
+        *,
+        min_score: float | None = None,
+        dedup_documents: bool = False,
+        document_ids: Collection[str] | None = None,
+        sources: Collection[str] | None = None,
+    ) -> list[list[SearchResult]]:
+        """
+        Search a (num_queries, dimension) matrix in a single FAISS call.
+        Returns one best-first result list per query, in input order.
+
+        Hits scoring below min_score are dropped, so a query may get fewer
+        than k (or no) results. With dedup_documents only the best chunk of
+        each document is kept; extra candidates are fetched to make up for
+        the duplicates.
+
+        document_ids / sources restrict the search to chunks of those
+        documents / source files inside FAISS (IDSelector bitmap), so k
+        results come from the subset rather than being filtered out of
+        the global top k.
+        """
+        array = np.ascontiguousarray(query_vectors, dtype="float32")
+        if array.ndim == 1:
+            array = array.reshape(1, -1)
+        if len(array) == 0:
+            return []
+
+        fetch = k * _DEDUP_OVERFETCH if dedup_documents else k
+
+        mask = self._row_groups.mask(
+            self.index.ntotal,
+            document_ids=document_ids,
+            sources=sources,
+        )
+        if mask is None:
+            scores, indices = self.index.search(array, fetch)
+        elif not mask.any():
+            return [[] for _ in range(len(array))]
+        else:
+            scores, indices = self._search_subset(array, fetch, mask)
+
+        return [
+            select_results(
+                (
+                    SearchResult(
+                        row=int(idx),
+                        score=float(score),
+                        metadata=self.metadata[idx],
+                        dense_score=float(score),
+                    )
+                    for score, idx in zip(row_scores, row_indices)
+                    if idx != -1
+                ),
+                k=k,
+                min_score=min_score,
+                dedup_documents=dedup_documents,
+            )
+            for row_scores, row_indices in zip(scores, indices)
+        ]
+
+    def _search_subset(
+        self,
+        array: np.ndarray,
+        k: int,
+        mask: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """FAISS search restricted to the rows set in mask."""
+        import faiss
+
+        if (
+            not isinstance(self.index, faiss.IndexIVF)
+            and mask.sum() < _EXACT_FILTER_FRACTION * len(mask)
+        ):
+            rows = np.flatnonzero(mask)
+            vectors = self.index.reconstruct_batch(rows)
+            similarities = array @ vectors.T
+
+            k = min(k, len(rows))
+            top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(similarities, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            return (
+                np.take_along_axis(top_scores, order, axis=1),
+                rows[np.take_along_axis(top, order, axis=1)],
+            )
 
-        results: list[dict[str, str]] = []
-        for idx in indices[0]:
-            if idx != -1:
-                results.append(self.metadata[idx])
+        # bitmap must stay alive while FAISS searches
+        selector, bitmap = bitmap_selector(mask)
+        if isinstance(self.index, faiss.IndexIVF):
+            params = faiss.SearchParametersIVF(sel=selector, nprobe=self.nprobe)
+        elif isinstance(self.index, faiss.IndexHNSW):
+            params = faiss.SearchParametersHNSW(
+                sel=selector,
+                efSearch=self.ef_search,
+            )
+        else:
+            params = faiss.SearchParameters(sel=selector)
 
-        return results
\ No newline at end of file
+        scores, indices = self.index.search(array, k, params=params)
+        del bitmap
+        return scores, indices
@@ -0,0 +1,249 @@
+import asyncio
+import functools
+import logging
+from collections.abc import Awaitable, Callable, Collection
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from rag.generation.prompts import NOT_FOUND_ANSWER
+from rag.models import SearchResult
+from rag.serving.service import RAGService
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class AsyncRAGPipeline:
+    """
+    asyncio facade over RAGService for async front ends.
+
+    Each request goes through three stages, each with its own bound:
+    - embed    : query embedding on a dedicated thread pool
+    - retrieve : FAISS / BM25 search, reranking, context selection and the
+                 answer-cache lookup on another thread pool
+    - generate : the shared BatchingScheduler, at most max_generating
+                 prompts queued or running
+
+    Stages of different requests run concurrently, so retrieval for the
+    next request overlaps generation of the previous one and concurrent
+    prompts are batched on the model. At most max_pending requests are
+    admitted at once; the rest wait for a slot (backpressure).
+
+    Every call takes an optional timeout (seconds, covering the wait for
+    admission). Cancelling a call, or hitting its timeout, drops its
+    queued stage work and withdraws its prompt from the batcher if
+    generation has not started; work already running in a thread
+    finishes and is discarded.
+    """
+
+    def __init__(
+        self,
+        service: RAGService,
+        *,
+        embed_workers: int = 2,
+        search_workers: int = 4,
+        max_pending: int = 64,
+        max_generating: int = 16,
+        timeout: float | None = None,
+        owns_service: bool = False,
+    ) -> None:
+        self.service = service
+        self.timeout = timeout
+        self._owns_service = owns_service
+
+        self._embed_executor = ThreadPoolExecutor(
+            max_workers=embed_workers,
+            thread_name_prefix="rag-embed",
+        )
+        self._search_executor = ThreadPoolExecutor(
+            max_workers=search_workers,
+            thread_name_prefix="rag-retrieve",
+        )
+        self._pending = asyncio.Semaphore(max_pending)
+        self._generating = asyncio.Semaphore(max_generating)
+        self._closed = False
+
+        logger.info(
+            "AsyncRAGPipeline ready | embed_workers=%d | search_workers=%d"
+            " | max_pending=%d | max_generating=%d",
+            embed_workers,
+            search_workers,
+            max_pending,
+            max_generating,
+        )
+
+    @classmethod
+    def from_settings(
+        cls,
+        service: RAGService | None = None,
+        *,
+        load_llm: bool = True,
+    ) -> "AsyncRAGPipeline":
+        from rag.config import settings
+
+        return cls(
+            service or RAGService(load_llm=load_llm),
+            owns_service=service is None,
+            embed_workers=settings.async_embed_workers,
+            search_workers=settings.async_search_workers,
+            max_pending=settings.async_max_pending,
+            max_generating=(
+                settings.async_max_generating
+                or 2 * settings.llm_max_batch_size
+            ),
+            timeout=settings.async_request_timeout_s,
+        )
+
+    async def __aenter__(self) -> "AsyncRAGPipeline":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def _run(
+        self,
+        executor: ThreadPoolExecutor,
+        fn: Callable[..., T],
+        *args: Any,
+        **kwargs: Any,
+    ) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor,
+            functools.partial(fn, *args, **kwargs),
+        )
+
+    async def _admitted(
+        self,
+        coro_fn: Callable[[], Awaitable[T]],
+        timeout: float | None,
+    ) -> T:
+        if self._closed:
+            raise RuntimeError("AsyncRAGPipeline is closed")
+
+        async def _request() -> T:
+            async with self._pending:
+                return await coro_fn()
+
+        timeout = self.timeout if timeout is None else timeout
+        return await asyncio.wait_for(_request(), timeout)
+
+    async def search(
+        self,
+        question: str,
+        *,
+        k: int = 5,
+        min_score: float | None = None,
+        dedup_documents: bool = False,
+        document_ids: Collection[str] | None = None,
+        sources: Collection[str] | None = None,
+        timeout: float | None = None,
+    ) -> list[SearchResult]:
+        async def _search() -> list[SearchResult]:
+            qvec = await self._run(
+                self._embed_executor,
+                self.service.embedder.embed_query,
+                question,
+            )
+            return await self._run(
+                self._search_executor,
+                self.service.searcher.search,
+                question,
+                qvec,
+                k=k,
+                min_score=min_score,
+                dedup_documents=dedup_documents,
+                document_ids=document_ids,
+                sources=sources,
+            )
+
+        return await self._admitted(_search, timeout)
+
+    async def answer(
+        self,
+        question: str,
+        *,
+        retrieval_k: int = 8,
+        context_k: int = 4,
+        max_new_tokens: int = 256,
+        document_ids: Collection[str] | None = None,
+        sources: Collection[str] | None = None,
+        timeout: float | None = None,
+    ) -> dict[str, Any]:
+        """Same result as RAGService.answer, without blocking the loop."""
+        service = self.service
+        if service.scheduler is None:
+            raise RuntimeError("Service was started without an LLM")
+
+        def _prepare(qvec: Any) -> tuple[str, list[str], str | None]:
+            prompt, cited = service.build_prompt(
+                question,
+                qvec,
+                retrieval_k=retrieval_k,
+                context_k=context_k,
+                max_new_tokens=max_new_tokens,
+                document_ids=document_ids,
+                sources=sources,
+            )
+            cached = (
+                service.cached_answer(prompt, max_new_tokens)
+                if cited
+                else None
+            )
+            return prompt, cited, cached
+
+        async def _answer() -> dict[str, Any]:
+            qvec = await self._run(
+                self._embed_executor,
+                service.embedder.embed_query,
+                question,
+            )
+            prompt, cited, answer = await self._run(
+                self._search_executor,
+                _prepare,
+                qvec,
+            )
+            if not cited:
+                # Nothing relevant enough: skip generation
+                return {"answer": NOT_FOUND_ANSWER, "sources": []}
+
+            if answer is None:
+                async with self._generating:
+                    # Cancelling the wrapper cancels the scheduler's
+                    # Future, which the batcher skips if not yet started
+                    answer = await asyncio.wrap_future(
+                        service.scheduler.submit(
+                            prompt,
+                            max_new_tokens=max_new_tokens,
+                        )
+                    )
+                await self._run(
+                    self._search_executor,
+                    service.cache_answer,
+                    prompt,
+                    max_new_tokens,
+                    answer,
+                )
+
+            return {"answer": answer, "sources": cited}
+
+        return await self._admitted(_answer, timeout)
+
+    async def aclose(self) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.close)
+
+    def close(self) -> None:
+        """
+        Stop accepting requests and shut down the stage executors (and
+        the service, if this pipeline created it).
+        """
+        if self._closed:
+            return
+        self._closed = True
+
+        self._embed_executor.shutdown(wait=True, cancel_futures=True)
+        self._search_executor.shutdown(wait=True, cancel_futures=True)
+        if self._owns_service:
+            self.service.close()
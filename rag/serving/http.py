@@ -0,0 +1,178 @@
+import json
+import logging
+from collections.abc import Iterator
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from rag.serving.service import RAGService
+
+logger = logging.getLogger(__name__)
+
+
+class _RAGRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON endpoints:
+    - GET  /health
+    - POST /search  {"question": str, "k": int}
+    - POST /answer  {"question": str, "retrieval_k": int,
+                     "context_k": int, "max_new_tokens": int}
+    - /search and /answer also take optional "document_ids" and "sources"
+      lists restricting retrieval to those documents / source files
+    - POST /answer/stream  same body as /answer; plain-text answer written
+      as it is generated, source chunk ids in the X-RAG-Sources header
+    """
+
+    server: "RAGHTTPServer"
+
+    def _send_json(self, status: HTTPStatus, payload: Any) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream_text(self, sources: list[str], pieces: Iterator[str]) -> None:
+        # HTTP/1.0 response without Content-Length: the body ends when the
+        # connection closes, so each piece can be flushed as it arrives.
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("X-RAG-Sources", ",".join(sources))
+        self.end_headers()
+        self.close_connection = True
+        try:
+            for piece in pieces:
+                self.wfile.write(piece.encode("utf-8"))
+                self.wfile.flush()
+        except Exception:
+            # Headers are already sent; all we can do is cut the stream
+            logger.exception("Streaming response failed")
+        finally:
+            # Stops generation when the client went away mid-stream
+            close = getattr(pieces, "close", None)
+            if close is not None:
+                close()
+
+    @staticmethod
+    def _number(
+        payload: dict[str, Any],
+        name: str,
+        default: Any,
+        kind: type = int,
+        *,
+        positive: bool = False,
+    ) -> Any:
+        """Numeric field of a request body; bad values are a client error."""
+        value = payload.get(name)
+        if value is None:
+            return default
+        try:
+            number = kind(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"'{name}' must be a number") from None
+        if positive and number <= 0:
+            raise ValueError(f"'{name}' must be positive")
+        return number
+
+    @staticmethod
+    def _filters(payload: dict[str, Any]) -> dict[str, list[str] | None]:
+        """document_ids / sources search filters from a request body."""
+        filters: dict[str, list[str] | None] = {}
+        for name in ("document_ids", "sources"):
+            values = payload.get(name)
+            if values is not None and not isinstance(values, list):
+                raise ValueError(f"'{name}' must be a list of strings")
+            filters[name] = (
+                [str(value) for value in values]
+                if values is not None
+                else None
+            )
+        return filters
+
+    def _read_json(self) -> dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if not isinstance(payload, dict):
+            raise ValueError("Request body must be a JSON object")
+        return payload
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._send_json(HTTPStatus.OK, {"status": "ok"})
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+
+    def do_POST(self) -> None:
+        service = self.server.service
+
+        try:
+            payload = self._read_json()
+            question = str(payload.get("question", "")).strip()
+            if not question:
+                raise ValueError("Missing 'question'")
+
+            if self.path == "/search":
+                results = service.search(
+                    question,
+                    k=self._number(payload, "k", 5, positive=True),
+                    min_score=self._number(payload, "min_score", None, float),
+                    dedup_documents=bool(
+                        payload.get("dedup_documents", False)
+                    ),
+                    **self._filters(payload),
+                )
+                self._send_json(
+                    HTTPStatus.OK,
+                    {"results": [result.to_dict() for result in results]},
+                )
+            elif self.path == "/answer":
+                result = service.answer(
+                    question,
+                    retrieval_k=self._number(
+                        payload, "retrieval_k", 8, positive=True
+                    ),
+                    context_k=self._number(
+                        payload, "context_k", 4, positive=True
+                    ),
+                    max_new_tokens=self._number(
+                        payload, "max_new_tokens", 256, positive=True
+                    ),
+                    **self._filters(payload),
+                )
+                self._send_json(HTTPStatus.OK, result)
+            elif self.path == "/answer/stream":
+                sources, pieces = service.answer_stream(
+                    question,
+                    retrieval_k=self._number(
+                        payload, "retrieval_k", 8, positive=True
+                    ),
+                    context_k=self._number(
+                        payload, "context_k", 4, positive=True
+                    ),
+                    max_new_tokens=self._number(
+                        payload, "max_new_tokens", 256, positive=True
+                    ),
+                    **self._filters(payload),
+                )
+                self._stream_text(sources, pieces)
+            else:
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+        except ValueError as exc:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(exc)})
+        except Exception as exc:
+            logger.exception("Request to %s failed", self.path)
+            self._send_json(
+                HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(exc)}
+            )
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.info("%s - %s", self.address_string(), format % args)
+
+
+class RAGHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], service: RAGService) -> None:
+        super().__init__(address, _RAGRequestHandler)
+        self.service = service
@@ -0,0 +1,285 @@
+import logging
+from collections.abc import Collection, Iterator
+from typing import Any
+
+import numpy as np
+
+from rag.config import settings
+from rag.embeddings.embedder import Embedder
+from rag.generation.answer_cache import AnswerCache
+from rag.generation.batching import BatchingScheduler
+from rag.generation.context_builder import build_grounded_prompt
+from rag.generation.llm import LocalLLM
+from rag.generation.prompts import NOT_FOUND_ANSWER, QA_PROMPT_PREFIX
+from rag.ingestion.serializer import load_chunk_texts
+from rag.models import SearchResult
+from rag.retrieval.hybrid import HybridSearcher
+from rag.retrieval.rerank import load_reranker
+from rag.retrieval.sharded import load_vector_store
+
+logger = logging.getLogger(__name__)
+
+
+class RAGService:
+    """
+    Long-lived RAG backend: loads the embedder, vector store, chunk texts
+    and LLM once, then serves any number of (concurrent) requests.
+
+    Embedding and FAISS search run concurrently; generation requests that
+    arrive together are batched on the shared model.
+    """
+
+    def __init__(self, *, load_llm: bool = True) -> None:
+        store_path = settings.data_processed_dir / "vector_store"
+        chunks_path = settings.data_processed_dir / "chunks.jsonl"
+
+        if not store_path.exists():
+            raise FileNotFoundError(
+                "Vector store not found. Run `python scripts/embed.py` first."
+            )
+
+        self.embedder = Embedder(
+            model_name=settings.embedding_model_name,
+            backend=settings.embedding_backend,
+            query_cache_size=settings.query_cache_size,
+        )
+        self.store = load_vector_store(store_path)
+        self.searcher = HybridSearcher.from_settings(self.store)
+        self.reranker = load_reranker()
+
+        self.chunk_texts: dict[str, str] = {}
+        if not self.store.has_texts:
+            if not chunks_path.exists():
+                raise FileNotFoundError(
+                    "chunks.jsonl not found. Run `python scripts/chunk.py` first."
+                )
+            self.chunk_texts = load_chunk_texts(chunks_path)
+
+        self.llm: LocalLLM | None = None
+        self.scheduler: BatchingScheduler | None = None
+        if load_llm:
+            self.llm = LocalLLM(
+                model_name=settings.llm_model_name,
+                backend=settings.llm_backend,
+                prompt_prefix=(
+                    QA_PROMPT_PREFIX if settings.llm_prefix_cache else None
+                ),
+            )
+            self.scheduler = BatchingScheduler(
+                self.llm,
+                max_batch_size=settings.llm_max_batch_size,
+                max_wait_ms=settings.llm_batch_wait_ms,
+            )
+
+        self.answer_cache = (
+            AnswerCache(
+                settings.answer_cache_path,
+                max_bytes=settings.answer_cache_max_mb * 1024 * 1024,
+            )
+            if settings.answer_cache_enabled
+            else None
+        )
+
+        logger.info(
+            "RAGService ready | vectors=%d | llm=%s",
+            self.store.ntotal,
+            settings.llm_model_name if self.llm else "disabled",
+        )
+
+    def search(
+        self,
+        question: str,
+        *,
+        k: int = 5,
+        min_score: float | None = None,
+        dedup_documents: bool = False,
+        document_ids: Collection[str] | None = None,
+        sources: Collection[str] | None = None,
+    ) -> list[SearchResult]:
+        """
+        Top-k chunks for the question, optionally restricted to the given
+        documents / source files (a chunk must match both when both are
+        given).
+        """
+        qvec = self.embedder.embed_query(question)
+        return self.searcher.search(
+            question,
+            qvec,
+            k=k,
+            min_score=min_score,
+            dedup_documents=dedup_documents,
+            document_ids=document_ids,
+            sources=sources,
+        )
+
+    def build_prompt(
+        self,
+        question: str,
+        query_vector: np.ndarray,
+        *,
+        retrieval_k: int,
+        context_k: int,
+        max_new_tokens: int,
+        document_ids: Collection[str] | None = None,
+        sources: Collection[str] | None = None,
+    ) -> tuple[str, list[str]]:
+        """
+        Retrieve, rerank and select context for an already embedded
+        question. Returns (prompt, source chunk ids); no sources means
+        nothing passed the relevance floor.
+        """
+        # Retrieval (breadth)
+        retrieved = self.searcher.search(
+            question,
+            query_vector,
+            k=retrieval_k,
+            document_ids=document_ids,
+            sources=sources,
+        )
+        if self.reranker is not None:
+            retrieved = self.reranker.rerank(
+                question,
+                retrieved,
+                top_k=context_k,
+                chunk_texts=self.chunk_texts,
+            )
+
+        # Context selection (precision), sized to fit the LLM window
+        return build_grounded_prompt(
+            question,
+            retrieved,
+            self.chunk_texts,
+            llm=self.llm,
+            context_k=context_k,
+            max_new_tokens=max_new_tokens,
+            token_cap=settings.context_token_budget,
+            min_score=settings.min_relevance_score,
+        )
+
+    def _build_prompt(
+        self,
+        question: str,
+        **kwargs: Any,
+    ) -> tuple[str, list[str]]:
+        return self.build_prompt(
+            question,
+            self.embedder.embed_query(question),
+            **kwargs,
+        )
+
+    def cached_answer(
+        self,
+        prompt: str,
+        max_new_tokens: int,
+    ) -> str | None:
+        if self.answer_cache is None:
+            return None
+        return self.answer_cache.get(
+            self.llm.cache_key, prompt, max_new_tokens
+        )
+
+    def cache_answer(
+        self,
+        prompt: str,
+        max_new_tokens: int,
+        answer: str,
+    ) -> None:
+        if self.answer_cache is not None:
+            self.answer_cache.put(
+                self.llm.cache_key, prompt, max_new_tokens, answer
+            )
+
+    def answer(
+        self,
+        question: str,
+        *,
+        retrieval_k: int = 8,
+        context_k: int = 4,
+        max_new_tokens: int = 256,
+        document_ids: Collection[str] | None = None,
+        sources: Collection[str] | None = None,
+    ) -> dict[str, Any]:
+        if self.scheduler is None:
+            raise RuntimeError("Service was started without an LLM")
+
+        prompt, cited = self._build_prompt(
+            question,
+            retrieval_k=retrieval_k,
+            context_k=context_k,
+            max_new_tokens=max_new_tokens,
+            document_ids=document_ids,
+            sources=sources,
+        )
+        if not cited:
+            # Nothing relevant enough: skip generation
+            return {"answer": NOT_FOUND_ANSWER, "sources": []}
+
+        answer = self.cached_answer(prompt, max_new_tokens)
+        if answer is None:
+            answer = self.scheduler.generate(
+                prompt,
+                max_new_tokens=max_new_tokens,
+            )
+            self.cache_answer(prompt, max_new_tokens, answer)
+
+        return {"answer": answer, "sources": cited}
+
+    def answer_stream(
+        self,
+        question: str,
+        *,
+        retrieval_k: int = 8,
+        context_k: int = 4,
+        max_new_tokens: int = 256,
+        document_ids: Collection[str] | None = None,
+        sources: Collection[str] | None = None,
+    ) -> tuple[list[str], Iterator[str]]:
+        """
+        Retrieve synchronously, then return (sources, text pieces) where
+        the pieces are yielded as the LLM produces them. Streams are not
+        batched: each takes the model's lock for itself, between the
+        scheduler's batches. Close the iterator to stop generation early.
+        """
+        if self.llm is None:
+            raise RuntimeError("Service was started without an LLM")
+
+        prompt, cited = self._build_prompt(
+            question,
+            retrieval_k=retrieval_k,
+            context_k=context_k,
+            max_new_tokens=max_new_tokens,
+            document_ids=document_ids,
+            sources=sources,
+        )
+        if not cited:
+            return [], iter([NOT_FOUND_ANSWER])
+
+        cached = self.cached_answer(prompt, max_new_tokens)
+        if cached is not None:
+            return cited, iter([cached])
+
+        return cited, self._stream_and_cache(prompt, max_new_tokens)
+
+    def _stream_and_cache(
+        self,
+        prompt: str,
+        max_new_tokens: int,
+    ) -> Iterator[str]:
+        pieces: list[str] = []
+        stream = self.llm.stream(prompt, max_new_tokens=max_new_tokens)
+        try:
+            for piece in stream:
+                pieces.append(piece)
+                yield piece
+        finally:
+            # Closing this generator early stops generation too
+            stream.close()
+
+        self.cache_answer(prompt, max_new_tokens, "".join(pieces).strip())
+
+    def close(self) -> None:
+        if self.scheduler is not None:
+            self.scheduler.close()
+        if self.answer_cache is not None:
+            self.answer_cache.close()
+        self.store.close()
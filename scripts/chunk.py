@@ -1,29 +1,10 @@
-import json
 import logging
-from pathlib import Path
 
 from rag.config import settings
-from rag.ingestion.chunker import chunk_documents
+from rag.ingestion.chunker import iter_chunks
+from rag.ingestion.serializer import iter_documents, save_chunks
 from rag.logging_config import configure_logging
-from rag.models import Document
-
-
-def _load_documents(path: Path) -> list[Document]:
-    documents: list[Document] = []
-
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            record = json.loads(line)
-            documents.append(
-                Document(
-                    id=record["id"],
-                    text=record["text"],
-                    source=Path(record["source"]),
-                    metadata=record["metadata"],
-                )
-            )
-
-    return documents
+from rag.retrieval.lexical import BM25Index, iter_chunk_records
 
 
 def main() -> None:
@@ -33,31 +14,19 @@ def main() -> None:
     input_path = settings.data_processed_dir / "documents.jsonl"
     output_path = settings.data_processed_dir / "chunks.jsonl"
 
-    documents = _load_documents(input_path)
-    chunks = chunk_documents(documents)
-
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-
-    with output_path.open("w", encoding="utf-8") as f:
-        for chunk in chunks:
-            f.write(
-                json.dumps(
-                    {
-                        "id": chunk.id,
-                        "document_id": chunk.document_id,
-                        "text": chunk.text,
-                        "metadata": chunk.metadata,
-                    },
-                    ensure_ascii=False,
-                )
-                + "\n"
-            )
+    # Documents are read and chunked one at a time: peak memory is
+    # bounded by the largest document, not the corpus.
+    num_chunks = save_chunks(
+        iter_chunks(iter_documents(input_path)),
+        output_path,
+    )
+    logger.info("Chunking complete: %d chunks → %s", num_chunks, output_path)
 
-    logger.info(
-        "Chunking complete: %d documents → %d chunks",
-        len(documents),
-        len(chunks),
+    BM25Index.build(
+        settings.lexical_index_dir,
+        iter_chunk_records(output_path),
     )
+    logger.info("Lexical index saved to %s", settings.lexical_index_dir)
 
 
 if __name__ == "__main__":
@@ -5,7 +5,7 @@ from pathlib import Path
 from rag.config import settings
 from rag.embeddings.embedder import Embedder
 from rag.logging_config import configure_logging
-from rag.retrieval.store import FaissVectorStore
+from rag.retrieval.sharded import new_vector_store
 
 
 def main() -> None:
@@ -27,19 +27,27 @@ def main() -> None:
                     "chunk_id": record["id"],
                     "document_id": record["document_id"],
                     "source": record["metadata"]["source"],
+                    "text": record["text"],
                 }
             )
 
     logger.info("Embedding %d chunks", len(texts))
 
     embedder = Embedder(
-        model_name=settings.embedding_model_name
+        model_name=settings.embedding_model_name,
+        backend=settings.embedding_backend,
+        cache_dir=settings.embedding_cache_dir,
+    )
+    logger.info(
+        "Embedding cache: %d vectors at %s",
+        len(embedder.cache),
+        embedder.cache.path,
     )
     vectors = embedder.embed_texts(texts)
 
-    store = FaissVectorStore(dimension=len(vectors[0]))
-    store.add(vectors, metadatas)
-    store.save(store_path)
+    with new_vector_store(dimension=vectors.shape[1]) as store:
+        store.add(vectors, metadatas)
+        store.save(store_path)
 
     logger.info("Vector store saved to %s", store_path)
 
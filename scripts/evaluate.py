@@ -2,30 +2,18 @@ import argparse
 import logging
 from pathlib import Path
 
-
-import pandas as pd
-
 from rag.config import settings
+from rag.evaluation.checkpoint import EvaluationCheckpoint, answer_settings
 from rag.evaluation.runner import EvaluationRunner
+from rag.evaluation.sheets import (
+    read_table,
+    result_column,
+    short_model_name,
+    write_table,
+)
 from rag.logging_config import configure_logging
 
 
-def short_model_name(model_name: str) -> str:
-    """
-    Convert HF model names into short, filesystem-safe tokens.
-    Example:
-        sentence-transformers/all-MiniLM-L6-v2 -> allminimll6v2
-        google/flan-t5-base -> flant5base
-    """
-    return (
-        model_name
-        .split("/")[-1]
-        .replace("-", "")
-        .replace("_", "")
-        .lower()
-    )
-
-
 def main() -> None:
     configure_logging()
     logger = logging.getLogger(__name__)
@@ -61,11 +49,33 @@ def main() -> None:
         default=256,
         help="Maximum tokens generated by the LLM",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help="Questions generated per padded batch (1 = sequential run)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.eval_workers,
+        help="Generation worker processes, each with its own model copy",
+    )
     parser.add_argument(
         "--output",
         default=None,
         help="Optional output path (default: auto-generated per model pair)",
     )
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="Checkpoint path (default: <output>.checkpoint.jsonl)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip rows already answered in the checkpoint",
+    )
 
     args = parser.parse_args()
 
@@ -74,10 +84,7 @@ def main() -> None:
         raise FileNotFoundError(f"Input file not found: {input_path}")
 
     # Load input table (read-only)
-    if input_path.suffix.lower() in {".xlsx", ".xls"}:
-        df = pd.read_excel(input_path)
-    else:
-        df = pd.read_csv(input_path)
+    df = read_table(input_path)
 
     if df.empty:
         raise ValueError("Input file contains no rows")
@@ -101,9 +108,9 @@ def main() -> None:
         )
     )
 
-    # Column name is explicit and self-documenting
-    result_col = (
-        f"{settings.embedding_model_name} + {settings.llm_model_name}"
+    result_col = result_column(
+        settings.embedding_model_name,
+        settings.llm_model_name,
     )
 
     logger.info("Evaluation run")
@@ -112,22 +119,83 @@ def main() -> None:
     logger.info("Questions: %d", len(questions))
     logger.info("Output file: %s", output_path)
 
+    checkpoint_path = (
+        Path(args.checkpoint)
+        if args.checkpoint
+        else output_path.with_name(f"{output_path.name}.checkpoint.jsonl")
+    )
+    checkpoint = EvaluationCheckpoint(
+        checkpoint_path,
+        run_config={
+            "input": str(input_path),
+            "question_col": str(question_col),
+            "num_questions": len(questions),
+            "embedding_model": settings.embedding_model_name,
+            "llm_model": settings.llm_model_name,
+            "retrieval_k": args.retrieval_k,
+            "context_k": args.context_k,
+            "max_new_tokens": args.max_new_tokens,
+            **answer_settings(),
+        },
+    )
+
+    done: dict[int, str] = {}
+    if args.resume:
+        done = {
+            row: record["answer"]
+            for row, record in checkpoint.load().items()
+        }
+        logger.info(
+            "Resuming from %s: %d/%d rows already answered",
+            checkpoint_path,
+            len(done),
+            len(questions),
+        )
+    logger.info("Checkpoint file: %s", checkpoint_path)
+
+    # With worker processes the models live in the workers only
     runner = EvaluationRunner(
         retrieval_k=args.retrieval_k,
         context_k=args.context_k,
         max_new_tokens=args.max_new_tokens,
+        load_llm=args.workers <= 1,
     )
 
-    answers = runner.run(questions)
+    checkpoint.open(resume=args.resume)
+    try:
+        if args.workers > 1:
+            runner.run_parallel(
+                questions,
+                workers=args.workers,
+                threads_per_worker=settings.eval_threads_per_worker,
+                done=done,
+                on_answer=checkpoint.append,
+            )
+        elif args.batch_size > 1:
+            runner.run_batched(
+                questions,
+                batch_size=args.batch_size,
+                done=done,
+                on_answer=checkpoint.append,
+            )
+        else:
+            runner.run(questions, done=done, on_answer=checkpoint.append)
+    finally:
+        checkpoint.close()
+        runner.close()
+
+    # Assemble the sheet from the checkpoint (the source of truth)
+    answered = checkpoint.load()
+    answers = [
+        answered[row]["answer"] if row in answered else ""
+        for row in range(len(questions))
+    ]
 
     # Write results to NEW file (input remains untouched)
     result_df = df.copy()
     result_df[result_col] = answers
 
-    if output_path.suffix.lower() in {".xlsx", ".xls"}:
-        result_df.to_excel(output_path, index=False)
-    else:
-        result_df.to_csv(output_path, index=False)
+    write_table(result_df, output_path)
 
     logger.info("Evaluation complete. Results written to %s", output_path)
 
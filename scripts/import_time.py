@@ -0,0 +1,163 @@
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+
+from rag.config import settings
+from rag.logging_config import configure_logging
+
+# Loaded only once a model, index or spreadsheet is actually used
+HEAVY_MODULES = (
+    "torch",
+    "transformers",
+    "sentence_transformers",
+    "faiss",
+    "pandas",
+    "optimum",
+)
+
+MODULES = (
+    "rag.embeddings.embedder",
+    "rag.generation.llm",
+    "rag.retrieval.hybrid",
+    "rag.retrieval.rerank",
+    "rag.serving.service",
+    "rag.serving.async_pipeline",
+    "rag.evaluation.runner",
+)
+
+SCRIPTS = (
+    "chunk",
+    "embed",
+    "evaluate",
+    "index_recall",
+    "ingest",
+    "query",
+    "search",
+    "serve",
+    "sweep",
+    "update",
+)
+
+# Run in a fresh interpreter: import the target (module name or script
+# path, without running main) and report time and heavy modules loaded
+_PROBE = """
+import importlib, importlib.util, json, sys, time
+
+target = sys.argv[1]
+start = time.perf_counter()
+if target.endswith(".py"):
+    spec = importlib.util.spec_from_file_location("_import_probe", target)
+    spec.loader.exec_module(importlib.util.module_from_spec(spec))
+else:
+    importlib.import_module(target)
+seconds = time.perf_counter() - start
+
+loaded = {name.split(".")[0] for name in sys.modules}
+print(json.dumps({
+    "seconds": seconds,
+    "heavy": sorted(loaded.intersection(sys.argv[2:])),
+}))
+"""
+
+
+def _probe(target: str) -> dict:
+    """Probe result, or {"error": stderr} if the import itself failed."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(settings.project_root), env.get("PYTHONPATH")])
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE, target, *HEAVY_MODULES],
+        cwd=settings.project_root,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        return {
+            "error": completed.stderr.strip()
+            or f"exit status {completed.returncode}"
+        }
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    configure_logging()
+    logger = logging.getLogger(__name__)
+
+    parser = argparse.ArgumentParser(
+        description=(
+            "Guard CLI startup time: import rag modules and scripts in "
+            "fresh interpreters and fail if one loads torch, transformers, "
+            "sentence-transformers, faiss or pandas at import time, or is "
+            "slower than --max-seconds."
+        )
+    )
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        default=0.5,
+        help="Import time budget per module or script",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Imports per target; the fastest one is reported",
+    )
+    args = parser.parse_args()
+
+    targets = [*MODULES] + [
+        str(settings.project_root / "scripts" / f"{name}.py")
+        for name in SCRIPTS
+    ]
+
+    failures = 0
+    for target in targets:
+        name = (
+            os.path.relpath(target, settings.project_root)
+            if target.endswith(".py")
+            else target
+        )
+        runs: list[dict] = []
+        error: str | None = None
+        for _ in range(max(1, args.repeat)):
+            run = _probe(target)
+            if "error" in run:
+                error = run["error"]
+                break
+            runs.append(run)
+
+        if error is not None:
+            # The import raised: report its traceback and move on
+            failures += 1
+            logger.error("FAIL  import error  %s\n%s", name, error)
+            continue
+
+        seconds = min(run["seconds"] for run in runs)
+        heavy = runs[0]["heavy"]
+
+        ok = not heavy and seconds <= args.max_seconds
+        failures += not ok
+        logger.info(
+            "%-4s %6.3fs  %s%s",
+            "ok" if ok else "FAIL",
+            seconds,
+            name,
+            f"  (loads {', '.join(heavy)})" if heavy else "",
+        )
+
+    if failures:
+        logger.error(
+            "%d of %d imports failed or over budget", failures, len(targets)
+        )
+        raise SystemExit(1)
+
+    logger.info("All %d imports within %.2fs", len(targets), args.max_seconds)
+
+
+if __name__ == "__main__":
+    main()
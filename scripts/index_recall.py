@@ -0,0 +1,139 @@
+import argparse
+import json
+import logging
+import time
+
+import numpy as np
+
+from rag.config import settings
+from rag.embeddings.embedder import Embedder
+from rag.logging_config import configure_logging
+from rag.retrieval.store import INDEX_TYPES, FaissVectorStore
+
+
+def _search_ids(
+    store: FaissVectorStore,
+    queries: np.ndarray,
+    k: int,
+) -> tuple[np.ndarray, float]:
+    started = time.perf_counter()
+    _scores, ids = store.index.search(queries, k)
+    ms_per_query = (time.perf_counter() - started) * 1000 / len(queries)
+    return ids, ms_per_query
+
+
+def main() -> None:
+    configure_logging()
+    logger = logging.getLogger(__name__)
+
+    parser = argparse.ArgumentParser(
+        description=(
+            "Measure recall@k, index size and search latency of compact "
+            "index types against the exact flat index."
+        )
+    )
+    parser.add_argument(
+        "--types",
+        nargs="+",
+        choices=INDEX_TYPES,
+        default=["fp16", "sq8"],
+        help="Index types to compare with flat",
+    )
+    parser.add_argument(
+        "--k",
+        type=int,
+        default=10,
+        help="Neighbours per query",
+    )
+    parser.add_argument(
+        "--queries",
+        type=int,
+        default=1000,
+        help="Number of chunk vectors sampled as queries",
+    )
+    args = parser.parse_args()
+
+    import faiss
+
+    chunks_path = settings.data_processed_dir / "chunks.jsonl"
+    if not chunks_path.exists():
+        raise FileNotFoundError(
+            "chunks.jsonl not found. Run `python scripts/chunk.py` first."
+        )
+
+    texts: list[str] = []
+    with chunks_path.open("r", encoding="utf-8") as f:
+        for line in f:
+            texts.append(json.loads(line)["text"])
+
+    # Served from the embedding cache after scripts/embed.py
+    embedder = Embedder(
+        model_name=settings.embedding_model_name,
+        cache_dir=settings.embedding_cache_dir,
+        backend=settings.embedding_backend,
+    )
+    vectors = embedder.embed_texts(texts)
+    del texts
+
+    rng = np.random.default_rng(0)
+    sample = rng.choice(
+        len(vectors),
+        min(args.queries, len(vectors)),
+        replace=False,
+    )
+    queries = vectors[sample]
+    no_metadata = [{}] * len(vectors)
+
+    reference = FaissVectorStore.from_settings(
+        vectors.shape[1],
+        index_type="flat",
+    )
+    reference.add(vectors, no_metadata)
+    truth, flat_ms = _search_ids(reference, queries, args.k)
+    flat_bytes = len(faiss.serialize_index(reference.index))
+    del reference
+
+    logger.info(
+        "%d vectors x %d dims | %d queries | k=%d",
+        len(vectors),
+        vectors.shape[1],
+        len(queries),
+        args.k,
+    )
+    logger.info(
+        "%-8s recall@%d=1.0000 | %8.1f MB | %.3f ms/query",
+        "flat",
+        args.k,
+        flat_bytes / 1e6,
+        flat_ms,
+    )
+
+    for index_type in args.types:
+        store = FaissVectorStore.from_settings(
+            vectors.shape[1],
+            index_type=index_type,
+        )
+        store.add(vectors, no_metadata)
+        ids, ms = _search_ids(store, queries, args.k)
+        size = len(faiss.serialize_index(store.index))
+
+        hits = sum(
+            len(set(found[found != -1]) & set(expected))
+            for found, expected in zip(ids, truth)
+        )
+        recall = hits / truth.size
+
+        logger.info(
+            "%-8s recall@%d=%.4f | %8.1f MB (%.1fx smaller) | "
+            "%.3f ms/query",
+            index_type,
+            args.k,
+            recall,
+            size / 1e6,
+            flat_bytes / size,
+            ms,
+        )
+
+
+if __name__ == "__main__":
+    main()
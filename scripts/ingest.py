@@ -1,8 +1,9 @@
+import argparse
 import logging
 from pathlib import Path
 
 from rag.config import settings
-from rag.ingestion.loader import load_pdfs_from_dir
+from rag.ingestion.loader import iter_pdfs_from_dir
 from rag.ingestion.serializer import save_documents
 from rag.logging_config import configure_logging
 
@@ -11,14 +12,47 @@ def main() -> None:
     configure_logging()
     logger = logging.getLogger(__name__)
 
+    parser = argparse.ArgumentParser(
+        description="Extract text from raw PDFs into documents.jsonl"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.ingest_workers,
+        help="Worker processes for PDF text extraction (1 = sequential)",
+    )
+    parser.add_argument(
+        "--pages-per-task",
+        type=int,
+        default=settings.ingest_pages_per_task,
+        help="Pages per extraction task when running in parallel",
+    )
+    args = parser.parse_args()
+
     raw_dir: Path = settings.data_raw_dir
     output_file: Path = settings.data_processed_dir / "documents.jsonl"
 
     logger.info("Loading PDFs from %s", raw_dir)
-    documents = load_pdfs_from_dir(raw_dir)
-
-    logger.info("Saving %d documents to %s", len(documents), output_file)
-    save_documents(documents, output_file)
+    documents = iter_pdfs_from_dir(
+        raw_dir,
+        workers=args.workers,
+        pages_per_task=args.pages_per_task,
+    )
+
+    # Documents are written as they are extracted, never all held at once.
+    # The previous documents.jsonl is only replaced once a run produced
+    # documents.
+    tmp_file = output_file.with_suffix(output_file.suffix + ".tmp")
+    try:
+        num_documents = save_documents(documents, tmp_file)
+        if not num_documents:
+            raise RuntimeError("No valid PDF documents loaded")
+    except BaseException:
+        tmp_file.unlink(missing_ok=True)
+        raise
+    tmp_file.replace(output_file)
+
+    logger.info("Saved %d documents to %s", num_documents, output_file)
 
     logger.info("Ingestion completed successfully")
 
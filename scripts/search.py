@@ -1,26 +1,15 @@
 import argparse
-import json
-import logging
-from pathlib import Path
 
 from rag.config import settings
 from rag.embeddings.embedder import Embedder
+from rag.ingestion.serializer import load_chunk_texts
 from rag.logging_config import configure_logging
-from rag.retrieval.store import FaissVectorStore
-
-
-def _load_chunk_texts(chunks_path: Path) -> dict[str, str]:
-    chunk_map: dict[str, str] = {}
-    with chunks_path.open("r", encoding="utf-8") as f:
-        for line in f:
-            record = json.loads(line)
-            chunk_map[record["id"]] = record["text"]
-    return chunk_map
+from rag.retrieval.hybrid import HybridSearcher
+from rag.retrieval.sharded import load_vector_store
 
 
 def main() -> None:
     configure_logging()
-    logger = logging.getLogger(__name__)
 
     parser = argparse.ArgumentParser(
         description="Semantic search over indexed document chunks"
@@ -31,6 +20,29 @@ def main() -> None:
         default=5,
         help="Number of top results to return",
     )
+    parser.add_argument(
+        "--min-score",
+        type=float,
+        default=None,
+        help="Drop results scoring below this similarity",
+    )
+    parser.add_argument(
+        "--dedup-documents",
+        action="store_true",
+        help="Show only the best chunk of each document",
+    )
+    parser.add_argument(
+        "--document",
+        nargs="+",
+        default=None,
+        help="Only search chunks of these document ids",
+    )
+    parser.add_argument(
+        "--source",
+        nargs="+",
+        default=None,
+        help="Only search chunks of these source files",
+    )
     parser.add_argument(
         "--inspect",
         action="store_true",
@@ -48,38 +60,56 @@ def main() -> None:
         )
 
     embedder = Embedder(
-        model_name=settings.embedding_model_name
+        model_name=settings.embedding_model_name,
+        backend=settings.embedding_backend,
     )
-    store = FaissVectorStore.load(store_path)
+    store = load_vector_store(store_path)
+    searcher = HybridSearcher.from_settings(store)
 
     chunk_texts: dict[str, str] = {}
-    if args.inspect:
+    if args.inspect and not store.has_texts:
         if not chunks_path.exists():
             raise FileNotFoundError(
                 "chunks.jsonl not found. Run `python scripts/chunk.py` first."
             )
-        chunk_texts = _load_chunk_texts(chunks_path)
-
-    query = input("Enter query: ").strip()
-    if not query:
-        logger.warning("Empty query provided")
-        return
-
-    query_vector = embedder.embed_query(query)
-    results = store.search(query_vector, k=args.k)
-
-    print("\n=== Top Results ===")
-    for rank, result in enumerate(results, start=1):
-        print(f"\n[{rank}]")
-        print(f"Chunk ID   : {result['chunk_id']}")
-        print(f"Document  : {result['document_id']}")
-        print(f"Source    : {result['source']}")
-
-        if args.inspect:
-            text = chunk_texts.get(result["chunk_id"], "")
-            print("\n--- Chunk Text (truncated) ---")
-            print(text[:800].strip())
-            print("--- End ---")
+        chunk_texts = load_chunk_texts(chunks_path)
+
+    while True:
+        try:
+            query = input("Enter query: ").strip()
+        except EOFError:
+            break
+        if not query:
+            break
+
+        query_vector = embedder.embed_query(query)
+        results = searcher.search(
+            query,
+            query_vector,
+            k=args.k,
+            min_score=args.min_score,
+            dedup_documents=args.dedup_documents,
+            document_ids=args.document,
+            sources=args.source,
+        )
+
+        print("\n=== Top Results ===")
+        for rank, result in enumerate(results, start=1):
+            print(f"\n[{rank}]")
+            print(f"Score      : {result.score:.4f}")
+            if result.dense_score not in (None, result.score):
+                print(f"Dense score: {result.dense_score:.4f}")
+            print(f"Chunk ID   : {result.chunk_id}")
+            print(f"Document  : {result.document_id}")
+            print(f"Source    : {result.source}")
+
+            if args.inspect:
+                text = result.text or chunk_texts.get(result.chunk_id, "")
+                print("\n--- Chunk Text (truncated) ---")
+                print(text[:800].strip())
+                print("--- End ---")
+
+    store.close()
 
 
 if __name__ == "__main__":
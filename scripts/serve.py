@@ -0,0 +1,39 @@
+import argparse
+import logging
+
+from rag.logging_config import configure_logging
+from rag.serving.http import RAGHTTPServer
+from rag.serving.service import RAGService
+
+
+def main() -> None:
+    configure_logging()
+    logger = logging.getLogger(__name__)
+
+    parser = argparse.ArgumentParser(
+        description="Serve /search and /answer over HTTP with models kept warm"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--no-llm",
+        action="store_true",
+        help="Skip loading the LLM (serve /search only)",
+    )
+    args = parser.parse_args()
+
+    service = RAGService(load_llm=not args.no_llm)
+    server = RAGHTTPServer((args.host, args.port), service)
+
+    logger.info("Listening on http://%s:%d", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down")
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import argparse
+import logging
+from pathlib import Path
+
+from rag.config import settings
+from rag.evaluation.checkpoint import EvaluationCheckpoint, answer_settings
+from rag.evaluation.runner import EvaluationRunner
+from rag.evaluation.sheets import (
+    read_table,
+    result_column,
+    short_model_name,
+    write_table,
+)
+from rag.logging_config import configure_logging
+
+
+def main() -> None:
+    configure_logging()
+    logger = logging.getLogger(__name__)
+
+    parser = argparse.ArgumentParser(
+        description=(
+            "Evaluate several LLMs over the same questions, sharing one "
+            "retrieval pass (read-only input)."
+        )
+    )
+    parser.add_argument(
+        "--input",
+        required=True,
+        help="Path to input CSV or Excel file containing questions",
+    )
+    parser.add_argument(
+        "--question-col",
+        default=None,
+        help="Column name containing questions (default: first column)",
+    )
+    parser.add_argument(
+        "--llm",
+        nargs="+",
+        required=True,
+        help="LLM model names to evaluate, in order",
+    )
+    parser.add_argument("--retrieval-k", type=int, default=8)
+    parser.add_argument("--context-k", type=int, default=4)
+    parser.add_argument("--max-new-tokens", type=int, default=256)
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help="Questions generated per padded batch",
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="Optional output path (default: auto-generated per embedding)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip rows already answered in each model's checkpoint",
+    )
+    args = parser.parse_args()
+
+    input_path = Path(args.input)
+    if not input_path.exists():
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+
+    df = read_table(input_path)
+    if df.empty:
+        raise ValueError("Input file contains no rows")
+
+    question_col = args.question_col or df.columns[0]
+    if question_col not in df.columns:
+        raise ValueError(f"Question column not found: {question_col}")
+
+    questions = df[question_col].astype(str).tolist()
+
+    embed_tag = short_model_name(settings.embedding_model_name)
+    output_path = (
+        Path(args.output)
+        if args.output
+        else input_path.with_name(
+            f"{input_path.stem}__{embed_tag}__sweep{input_path.suffix}"
+        )
+    )
+
+    logger.info("Sweep run")
+    logger.info("Embedding model: %s", settings.embedding_model_name)
+    logger.info("LLM models: %s", ", ".join(args.llm))
+    logger.info("Questions: %d", len(questions))
+    logger.info("Output file: %s", output_path)
+
+    runner = EvaluationRunner(
+        retrieval_k=args.retrieval_k,
+        context_k=args.context_k,
+        max_new_tokens=args.max_new_tokens,
+        load_llm=False,
+    )
+
+    # Retrieval depends only on the embedding model: do it once
+    retrieved = runner.retrieve(questions)
+    logger.info("Retrieved contexts for %d questions", len(retrieved))
+
+    result_df = df.copy()
+
+    for llm_name in args.llm:
+        checkpoint = EvaluationCheckpoint(
+            output_path.with_name(
+                f"{output_path.name}.{short_model_name(llm_name)}"
+                ".checkpoint.jsonl"
+            ),
+            run_config={
+                "input": str(input_path),
+                "question_col": str(question_col),
+                "num_questions": len(questions),
+                "embedding_model": settings.embedding_model_name,
+                "llm_model": llm_name,
+                "retrieval_k": args.retrieval_k,
+                "context_k": args.context_k,
+                "max_new_tokens": args.max_new_tokens,
+                **answer_settings(),
+            },
+        )
+
+        done: dict[int, str] = {}
+        if args.resume:
+            done = {
+                row: record["answer"]
+                for row, record in checkpoint.load().items()
+            }
+
+        if len(done) < len(questions):
+            logger.info(
+                "Answering with %s (%d/%d rows already done)",
+                llm_name,
+                len(done),
+                len(questions),
+            )
+            # Frees the previous model before loading the next
+            runner.load_llm(llm_name)
+
+            checkpoint.open(resume=args.resume)
+            try:
+                runner.run_batched(
+                    questions,
+                    batch_size=args.batch_size,
+                    done=done,
+                    on_answer=checkpoint.append,
+                    retrieved=retrieved,
+                )
+            finally:
+                checkpoint.close()
+        else:
+            logger.info("Skipping %s: all rows already answered", llm_name)
+
+        answered = checkpoint.load()
+        result_df[result_column(settings.embedding_model_name, llm_name)] = [
+            answered[row]["answer"] if row in answered else ""
+            for row in range(len(questions))
+        ]
+
+        # Rewrite after every model so finished columns are never lost
+        write_table(result_df, output_path)
+
+    runner.close()
+    logger.info("Sweep complete. Results written to %s", output_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import logging
+from pathlib import Path
+
+import numpy as np
+
+from rag.config import settings
+from rag.embeddings.embedder import Embedder
+from rag.ingestion.chunker import chunk_document
+from rag.ingestion.loader import load_pdf
+from rag.ingestion.manifest import Manifest
+from rag.ingestion.serializer import drop_records, save_chunks, save_documents
+from rag.logging_config import configure_logging
+from rag.retrieval.lexical import BM25Index, iter_chunk_records
+from rag.retrieval.store import FaissVectorStore
+from rag.retrieval.sharded import (
+    ShardedVectorStore,
+    load_vector_store,
+    new_vector_store,
+    vector_store_exists,
+)
+
+
+def _flush(
+    store: FaissVectorStore | ShardedVectorStore | None,
+    vectors: list[np.ndarray],
+    metadatas: list[dict[str, str]],
+) -> FaissVectorStore | ShardedVectorStore | None:
+    """Add the pending vectors, creating the store on first use."""
+    if not vectors:
+        return store
+
+    array = np.concatenate(vectors)
+    if store is None:
+        store = new_vector_store(dimension=array.shape[1])
+    store.add(array, metadatas)
+
+    vectors.clear()
+    metadatas.clear()
+    return store
+
+
+def main() -> None:
+    """
+    Incremental ingest -> chunk -> embed.
+
+    Only PDFs that are new or changed since the last run (per the manifest)
+    are parsed, chunked and embedded. Records and vectors of changed or
+    deleted PDFs are dropped from documents.jsonl, chunks.jsonl and the
+    vector store.
+    """
+    configure_logging()
+    logger = logging.getLogger(__name__)
+
+    raw_dir: Path = settings.data_raw_dir
+    documents_path = settings.data_processed_dir / "documents.jsonl"
+    chunks_path = settings.data_processed_dir / "chunks.jsonl"
+    store_path = settings.data_processed_dir / "vector_store"
+    manifest_path = settings.data_processed_dir / "manifest.json"
+
+    if not raw_dir.exists():
+        raise FileNotFoundError(f"Directory not found: {raw_dir}")
+
+    manifest = Manifest.load(manifest_path)
+    diff = manifest.diff(raw_dir)
+
+    logger.info(
+        "Manifest diff: %d added, %d changed, %d removed, %d unchanged",
+        len(diff.added),
+        len(diff.changed),
+        len(diff.removed),
+        len(diff.unchanged),
+    )
+
+    if diff.is_empty:
+        manifest.save(manifest_path)
+        logger.info("Corpus is up to date")
+        return
+
+    store = (
+        load_vector_store(store_path)
+        if vector_store_exists(store_path)
+        else None
+    )
+
+    # Drop everything belonging to documents that will be (re)built or are
+    # gone. New files are included so a pre-manifest full build is not
+    # duplicated on the first incremental run.
+    stale_ids = {p.stem for p in diff.added + diff.changed}
+    for name in diff.removed:
+        entry = manifest.forget(name)
+        if entry is not None:
+            stale_ids.add(entry.document_id)
+
+    drop_records(documents_path, stale_ids, key="id")
+    dropped_chunks = drop_records(chunks_path, stale_ids, key="document_id")
+    dropped_vectors = store.remove_documents(stale_ids) if store else 0
+    logger.info(
+        "Dropped %d chunks and %d vectors from %d stale documents",
+        dropped_chunks,
+        dropped_vectors,
+        len(stale_ids),
+    )
+
+    embedder: Embedder | None = None
+
+    # Vectors are added in batches of index_train_sample rather than per
+    # PDF, so a new IVF / SQ index (or shard) trains on a representative
+    # sample instead of the first document's chunks
+    pending_vectors: list[np.ndarray] = []
+    pending_metadatas: list[dict[str, str]] = []
+    pending_rows = 0
+
+    for pdf_path in diff.added + diff.changed:
+        try:
+            document = load_pdf(pdf_path)
+        except Exception as exc:
+            logger.error("Failed to load %s: %s", pdf_path.name, exc)
+            continue
+
+        chunks = chunk_document(document)
+        save_documents([document], documents_path, append=True)
+        save_chunks(chunks, chunks_path, append=True)
+
+        if chunks:
+            if embedder is None:
+                embedder = Embedder(
+                    model_name=settings.embedding_model_name,
+                    backend=settings.embedding_backend,
+                    cache_dir=settings.embedding_cache_dir,
+                )
+
+            pending_vectors.append(
+                embedder.embed_texts([c.text for c in chunks])
+            )
+            pending_metadatas.extend(
+                {
+                    "chunk_id": c.id,
+                    "document_id": c.document_id,
+                    "source": c.metadata["source"],
+                    "text": c.text,
+                }
+                for c in chunks
+            )
+            pending_rows += len(chunks)
+
+            if pending_rows >= settings.index_train_sample:
+                store = _flush(store, pending_vectors, pending_metadatas)
+                pending_rows = 0
+
+        manifest.record(pdf_path, document_id=document.id)
+        logger.info(
+            "Indexed %s: %d chunks",
+            pdf_path.name,
+            len(chunks),
+        )
+
+    store = _flush(store, pending_vectors, pending_metadatas)
+    if store is not None:
+        store.save(store_path)
+        store.close()
+
+    # Rebuilt in full: tokenizing chunks.jsonl is cheap next to embedding,
+    # and BM25 statistics (document frequencies, average length) are
+    # corpus-wide anyway
+    BM25Index.build(settings.lexical_index_dir, iter_chunk_records(chunks_path))
+    manifest.save(manifest_path)
+
+    logger.info("Incremental update complete. Vector store at %s", store_path)
+
+
+if __name__ == "__main__":
+    main()
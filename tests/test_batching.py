@@ -0,0 +1,142 @@
+import threading
+
+import pytest
+
+from rag.generation.batching import BatchingScheduler
+
+
+class FakeLLM:
+    """Echoes prompts; prompts containing "boom" fail."""
+
+    def __init__(self) -> None:
+        self.batches: list[tuple[list[str], int]] = []
+        self.singles: list[str] = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def _answer(self, prompt: str, max_new_tokens: int) -> str:
+        if "boom" in prompt:
+            raise RuntimeError(f"cannot answer {prompt}")
+        return f"{prompt}:{max_new_tokens}"
+
+    def generate_batch(
+        self,
+        prompts: list[str],
+        *,
+        max_new_tokens: int,
+    ) -> list[str]:
+        self.release.wait()
+        self.batches.append((list(prompts), max_new_tokens))
+        if len(prompts) > 1 and any("boom" in p for p in prompts):
+            raise RuntimeError("batch failed")
+        return [self._answer(p, max_new_tokens) for p in prompts]
+
+    def generate(self, prompt: str, *, max_new_tokens: int) -> str:
+        self.release.wait()
+        self.singles.append(prompt)
+        return self._answer(prompt, max_new_tokens)
+
+
+@pytest.fixture
+def llm():
+    return FakeLLM()
+
+
+def _scheduler(llm: FakeLLM, **kwargs) -> BatchingScheduler:
+    kwargs.setdefault("max_wait_ms", 200.0)
+    return BatchingScheduler(llm, **kwargs)
+
+
+def test_concurrent_requests_share_a_batch(llm):
+    scheduler = _scheduler(llm, max_batch_size=8)
+    futures = [scheduler.submit(f"q{i}", max_new_tokens=16) for i in range(3)]
+
+    assert [f.result(timeout=5) for f in futures] == [
+        "q0:16", "q1:16", "q2:16",
+    ]
+    scheduler.close()
+    assert llm.batches == [(["q0", "q1", "q2"], 16)]
+
+
+def test_batch_is_grouped_by_max_new_tokens(llm):
+    scheduler = _scheduler(llm)
+    futures = [
+        scheduler.submit("a", max_new_tokens=16),
+        scheduler.submit("b", max_new_tokens=32),
+        scheduler.submit("c", max_new_tokens=16),
+    ]
+
+    assert [f.result(timeout=5) for f in futures] == [
+        "a:16", "b:32", "c:16",
+    ]
+    scheduler.close()
+    assert llm.batches == [(["a", "c"], 16)]
+    assert llm.singles == ["b"]
+
+
+def test_max_batch_size_splits_batches(llm):
+    scheduler = _scheduler(llm, max_batch_size=2)
+    futures = [scheduler.submit(f"q{i}") for i in range(5)]
+
+    for f in futures:
+        f.result(timeout=5)
+    scheduler.close()
+    assert [len(prompts) for prompts, _ in llm.batches] == [2, 2]
+    assert llm.singles == ["q4"]
+
+
+def test_failed_batch_is_retried_one_by_one(llm):
+    scheduler = _scheduler(llm)
+    futures = [
+        scheduler.submit("ok1", max_new_tokens=8),
+        scheduler.submit("boom", max_new_tokens=8),
+        scheduler.submit("ok2", max_new_tokens=8),
+    ]
+
+    assert futures[0].result(timeout=5) == "ok1:8"
+    assert futures[2].result(timeout=5) == "ok2:8"
+    with pytest.raises(RuntimeError, match="cannot answer boom"):
+        futures[1].result(timeout=5)
+    scheduler.close()
+    assert llm.singles == ["ok1", "boom", "ok2"]
+
+
+def test_lone_request_uses_generate(llm):
+    scheduler = _scheduler(llm, max_wait_ms=0.0)
+
+    assert scheduler.generate("q", max_new_tokens=4) == "q:4"
+    scheduler.close()
+    assert llm.singles == ["q"]
+    assert llm.batches == []
+
+
+def test_single_request_failure_is_not_retried(llm):
+    scheduler = _scheduler(llm, max_wait_ms=0.0)
+
+    with pytest.raises(RuntimeError):
+        scheduler.generate("boom")
+    scheduler.close()
+    assert llm.singles == ["boom"]
+
+
+def test_cancelled_request_is_skipped(llm):
+    llm.release.clear()
+    scheduler = _scheduler(llm, max_batch_size=1, max_wait_ms=0.0)
+    first = scheduler.submit("first")
+    second = scheduler.submit("second")
+
+    assert second.cancel()
+    llm.release.set()
+    assert first.result(timeout=5) == "first:256"
+    scheduler.close()
+    assert llm.singles == ["first"]
+
+
+def test_close_finishes_queued_requests_then_rejects(llm):
+    scheduler = _scheduler(llm, max_batch_size=1, max_wait_ms=0.0)
+    futures = [scheduler.submit(f"q{i}") for i in range(3)]
+    scheduler.close()
+
+    assert all(f.done() for f in futures)
+    with pytest.raises(RuntimeError):
+        scheduler.submit("late")
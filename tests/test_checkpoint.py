@@ -0,0 +1,105 @@
+import json
+
+import pytest
+
+from rag.evaluation.checkpoint import EvaluationCheckpoint
+
+RUN = {"llm_model_name": "llm", "retrieval_k": 8, "context_k": 4}
+
+
+def _write_run(path, answers: dict[int, str]) -> None:
+    checkpoint = EvaluationCheckpoint(path, RUN)
+    checkpoint.open(resume=False)
+    for row, answer in answers.items():
+        checkpoint.append(row, answer, 0.5)
+    checkpoint.close()
+
+
+def test_load_returns_answered_rows(tmp_path):
+    path = tmp_path / "run.jsonl"
+    _write_run(path, {0: "first", 2: "third"})
+
+    records = EvaluationCheckpoint(path, RUN).load()
+
+    assert sorted(records) == [0, 2]
+    assert records[2]["answer"] == "third"
+    assert records[2]["seconds"] == 0.5
+
+
+def test_missing_checkpoint_loads_empty(tmp_path):
+    assert EvaluationCheckpoint(tmp_path / "none.jsonl", RUN).load() == {}
+
+
+def test_other_run_config_is_rejected(tmp_path):
+    path = tmp_path / "run.jsonl"
+    _write_run(path, {0: "first"})
+
+    with pytest.raises(ValueError):
+        EvaluationCheckpoint(path, {**RUN, "context_k": 2}).load()
+
+
+def test_resume_after_torn_tail(tmp_path):
+    path = tmp_path / "run.jsonl"
+    _write_run(path, {0: "first", 1: "second"})
+    # Crash in the middle of writing row 2
+    with path.open("a", encoding="utf-8") as f:
+        f.write('{"row": 2, "ans')
+
+    checkpoint = EvaluationCheckpoint(path, RUN)
+    assert sorted(checkpoint.load()) == [0, 1]
+
+    checkpoint.open(resume=True)
+    checkpoint.append(2, "third", 1.0)
+    checkpoint.close()
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert json.loads(lines[0]) == {"run": RUN}
+    assert [json.loads(line)["row"] for line in lines[1:]] == [0, 1, 2]
+    assert EvaluationCheckpoint(path, RUN).load()[2]["answer"] == "third"
+
+
+def test_torn_line_before_the_end_is_an_error(tmp_path):
+    path = tmp_path / "run.jsonl"
+    _write_run(path, {0: "first"})
+    with path.open("a", encoding="utf-8") as f:
+        f.write('{"row": 1\n{"row": 2, "answer": "x", "seconds": 0}\n')
+
+    with pytest.raises(json.JSONDecodeError):
+        EvaluationCheckpoint(path, RUN).load()
+
+
+def test_open_without_resume_starts_over(tmp_path):
+    path = tmp_path / "run.jsonl"
+    _write_run(path, {0: "first"})
+
+    checkpoint = EvaluationCheckpoint(path, RUN)
+    checkpoint.open(resume=False)
+    checkpoint.close()
+
+    assert checkpoint.load() == {}
+
+
+def test_append_requires_open(tmp_path):
+    with pytest.raises(RuntimeError):
+        EvaluationCheckpoint(tmp_path / "run.jsonl", RUN).append(0, "x", 0)
+
+
+def test_answer_settings_are_part_of_the_run(tmp_path, monkeypatch):
+    from rag.config import settings
+    from rag.evaluation.checkpoint import ANSWER_SETTINGS, answer_settings
+
+    path = tmp_path / "run.jsonl"
+    run = {**RUN, **answer_settings()}
+    assert set(ANSWER_SETTINGS) <= set(run)
+
+    checkpoint = EvaluationCheckpoint(path, run)
+    checkpoint.open(resume=False)
+    checkpoint.append(0, "first", 0.5)
+    checkpoint.close()
+    assert sorted(EvaluationCheckpoint(path, run).load()) == [0]
+
+    monkeypatch.setattr(
+        settings, "rerank_enabled", not settings.rerank_enabled
+    )
+    with pytest.raises(ValueError):
+        EvaluationCheckpoint(path, {**RUN, **answer_settings()}).load()
@@ -0,0 +1,115 @@
+import numpy as np
+
+from rag.retrieval.chunk_store import COLUMNS, ChunkStore
+
+
+def _records(*ids: str) -> list[dict[str, str]]:
+    return [
+        {
+            "chunk_id": chunk_id,
+            "document_id": f"doc-{chunk_id[0]}",
+            "source": f"{chunk_id[0]}.pdf",
+            "text": f"text of {chunk_id} – ünïcode ✓",
+        }
+        for chunk_id in ids
+    ]
+
+
+def test_write_and_read_round_trip(tmp_path):
+    records = _records("a1", "a2", "b1")
+
+    assert ChunkStore.write(tmp_path, records) == 3
+    assert ChunkStore.exists(tmp_path)
+    assert not any(tmp_path.glob("*.tmp"))
+
+    store = ChunkStore(tmp_path)
+    assert len(store) == 3
+    assert list(store) == records
+    assert store[1] == records[1]
+    assert store.text(2) == records[2]["text"]
+    assert list(store.column("document_id")) == ["doc-a", "doc-a", "doc-b"]
+
+
+def test_missing_fields_and_empty_store(tmp_path):
+    ChunkStore.write(tmp_path / "partial", [{"chunk_id": "x"}])
+    assert ChunkStore(tmp_path / "partial")[0] == {
+        "chunk_id": "x",
+        "document_id": "",
+        "source": "",
+        "text": "",
+    }
+
+    ChunkStore.write(tmp_path / "empty", [])
+    empty = ChunkStore(tmp_path / "empty")
+    assert len(empty) == 0
+    assert list(empty) == []
+
+
+def test_append_is_staged_until_commit(tmp_path):
+    ChunkStore.write(tmp_path, _records("a1", "a2"))
+    store = ChunkStore(tmp_path)
+
+    assert store.append(_records("b1", "b2")) == 2
+    assert store.append([]) == 0
+
+    expected = _records("a1", "a2", "b1", "b2")
+    assert store.dirty
+    assert list(store) == expected
+    assert list(ChunkStore(tmp_path)) == _records("a1", "a2")
+
+    store.commit()
+    assert not store.dirty
+    assert list(store) == expected
+    assert list(ChunkStore(tmp_path)) == expected
+    assert not list(tmp_path.glob("*.pending"))
+
+
+def test_append_overwrites_unreferenced_tail(tmp_path):
+    ChunkStore.write(tmp_path, _records("a1"))
+    # An interrupted append: bytes written, offsets not
+    with (tmp_path / "text.bin").open("ab") as f:
+        f.write(b"garbage")
+
+    store = ChunkStore(tmp_path)
+    store.append(_records("b1"))
+    store.commit()
+
+    assert list(ChunkStore(tmp_path)) == _records("a1", "b1")
+
+
+def test_remove_rows_keeps_order_of_remaining_rows(tmp_path):
+    ChunkStore.write(tmp_path, _records("a1", "a2", "b1", "b2", "c1"))
+    store = ChunkStore(tmp_path)
+
+    store.remove_rows(np.array([0, 2, 3]))
+
+    expected = _records("a2", "c1")
+    assert list(store) == expected
+    assert len(ChunkStore(tmp_path)) == 5
+
+    store.commit()
+    assert list(ChunkStore(tmp_path)) == expected
+    assert not any(tmp_path.glob("*.tmp"))
+
+
+def test_remove_then_append_then_discard(tmp_path):
+    original = _records("a1", "a2", "b1")
+    ChunkStore.write(tmp_path, original)
+    store = ChunkStore(tmp_path)
+
+    store.remove_rows(np.array([1]))
+    store.append(_records("c1"))
+    assert list(store) == _records("a1", "b1", "c1")
+
+    store.discard()
+    assert list(store) == original
+    assert list(ChunkStore(tmp_path)) == original
+    assert not list(tmp_path.glob("*.pending"))
+
+
+def test_files_lists_every_column(tmp_path):
+    names = {path.name for path in ChunkStore.files(tmp_path)}
+
+    assert names == {
+        f"{name}.{ext}" for name in COLUMNS for ext in ("idx", "bin")
+    }
@@ -0,0 +1,149 @@
+import pytest
+
+from rag.generation.context_builder import (
+    CONTEXT_SEPARATOR,
+    apply_relevance_floor,
+    build_context,
+    build_grounded_prompt,
+)
+from rag.models import SearchResult
+
+
+class WordCounter:
+    """One token per whitespace-separated word."""
+
+    def count_tokens(self, text: str) -> int:
+        return len(text.split())
+
+    def truncate_tokens(self, text: str, max_tokens: int) -> str:
+        return " ".join(text.split()[:max_tokens])
+
+    def context_token_budget(
+        self,
+        prompt_without_context: str,
+        *,
+        max_new_tokens: int,
+        cap: int = 0,
+    ) -> int:
+        return cap
+
+
+def _words(n: int, word: str) -> str:
+    return " ".join([word] * n)
+
+
+def _hit(
+    chunk_id: str,
+    text: str = "",
+    dense_score: float | None = 0.9,
+) -> SearchResult:
+    return SearchResult(
+        row=None if dense_score is None else 0,
+        score=dense_score or 0.0,
+        metadata={"chunk_id": chunk_id, "text": text},
+        dense_score=dense_score,
+    )
+
+
+def test_context_k_truncates_and_texts_fall_back_to_lookup():
+    retrieved = [_hit("a", "alpha"), _hit("b"), _hit("c", "gamma")]
+
+    context, sources = build_context(
+        retrieved,
+        {"b": "beta"},
+        context_k=2,
+    )
+
+    assert context == f"alpha{CONTEXT_SEPARATOR}beta"
+    assert sources == ["a", "b"]
+
+
+def test_chunks_without_text_are_skipped():
+    context, sources = build_context(
+        [_hit("a"), _hit("b", "beta")],
+        {},
+        context_k=2,
+    )
+
+    assert (context, sources) == ("beta", ["b"])
+
+
+def test_budget_keeps_chunks_that_fit_and_trims_the_next():
+    retrieved = [
+        _hit("a", _words(40, "a")),
+        _hit("b", _words(100, "b")),
+        _hit("c", _words(5, "c")),
+    ]
+
+    # 40 for a, 1 for the separator, 39 left for b
+    context, sources = build_context(
+        retrieved,
+        {},
+        context_k=3,
+        token_budget=80,
+        counter=WordCounter(),
+    )
+
+    assert sources == ["a", "b"]
+    first, second = context.split(CONTEXT_SEPARATOR)
+    assert first == _words(40, "a")
+    assert second == _words(39, "b")
+
+
+def test_budget_drops_a_trimmed_chunk_that_would_be_too_short():
+    retrieved = [_hit("a", _words(60, "a")), _hit("b", _words(100, "b"))]
+
+    context, sources = build_context(
+        retrieved,
+        {},
+        context_k=2,
+        token_budget=80,
+        counter=WordCounter(),
+    )
+
+    assert sources == ["a"]
+    assert context == _words(60, "a")
+
+
+def test_budget_requires_counter():
+    with pytest.raises(ValueError):
+        build_context([_hit("a", "x")], {}, context_k=1, token_budget=10)
+
+
+def test_relevance_floor_applies_to_dense_scores_only():
+    dense_high = _hit("a", "alpha", dense_score=0.8)
+    dense_low = _hit("b", "beta", dense_score=0.2)
+    lexical = _hit("c", "gamma", dense_score=None)
+
+    kept = apply_relevance_floor([dense_high, dense_low, lexical], 0.5)
+    assert [item.chunk_id for item in kept] == ["a", "c"]
+
+    # No dense hit clears the floor: off-corpus, lexical hits go too
+    assert apply_relevance_floor([dense_low, lexical], 0.5) == []
+    assert apply_relevance_floor([dense_low], None) == [dense_low]
+
+    assert build_context(
+        [dense_low, lexical],
+        {},
+        context_k=2,
+        min_score=0.5,
+    ) == ("", [])
+
+
+def test_grounded_prompt_uses_llm_budget():
+    retrieved = [_hit("a", _words(50, "a")), _hit("b", _words(50, "b"))]
+
+    prompt, sources = build_grounded_prompt(
+        "what?",
+        retrieved,
+        {},
+        llm=WordCounter(),
+        context_k=2,
+        max_new_tokens=16,
+        token_cap=60,
+    )
+
+    assert sources == ["a"]
+    assert "what?" in prompt
+    assert _words(50, "a") in prompt
+    assert "b b" not in prompt
@@ -0,0 +1,99 @@
+import json
+
+import numpy as np
+import pytest
+
+from rag.embeddings.cache import EmbeddingCache, text_hash
+
+MODEL = "org/model"
+
+
+def _vectors(n: int, dimension: int = 4, start: int = 0) -> np.ndarray:
+    return (
+        np.arange(start * dimension, (start + n) * dimension, dtype="float32")
+        .reshape(n, dimension)
+    )
+
+
+def test_fill_copies_found_rows_and_reports_misses(tmp_path):
+    cache = EmbeddingCache(tmp_path, MODEL)
+    keys = [text_hash(text) for text in ("a", "b", "c")]
+    vectors = _vectors(3)
+    cache.put(keys[:2], vectors[:2])
+
+    out = np.zeros((3, 4), dtype="float32")
+    found = cache.fill(keys, out)
+
+    assert found.tolist() == [True, True, False]
+    np.testing.assert_array_equal(out[:2], vectors[:2])
+    np.testing.assert_array_equal(out[2], 0)
+
+
+def test_put_skips_known_keys_and_persists(tmp_path):
+    cache = EmbeddingCache(tmp_path, MODEL)
+    cache.put(["k1", "k2"], _vectors(2))
+    cache.put(["k2", "k3"], _vectors(2, start=5))
+
+    reopened = EmbeddingCache(tmp_path, MODEL)
+    assert len(reopened) == 3
+    assert "k3" in reopened
+
+    out = np.zeros((3, 4), dtype="float32")
+    reopened.fill(["k1", "k2", "k3"], out)
+    np.testing.assert_array_equal(out[:2], _vectors(2))
+    np.testing.assert_array_equal(out[2], _vectors(1, start=6)[0])
+
+
+def test_put_rejects_mismatched_input(tmp_path):
+    cache = EmbeddingCache(tmp_path, MODEL)
+    cache.put(["k1"], _vectors(1))
+
+    with pytest.raises(ValueError):
+        cache.put(["k2", "k3"], _vectors(1))
+    with pytest.raises(ValueError):
+        cache.put(["k2"], _vectors(1, dimension=8))
+
+
+def test_torn_append_is_truncated_to_complete_rows(tmp_path):
+    cache = EmbeddingCache(tmp_path, MODEL)
+    cache.put(["k1", "k2"], _vectors(2))
+
+    # Crash mid-append: a key without its vector, half a vector
+    with cache.keys_path.open("a", encoding="utf-8") as f:
+        f.write("k3\n")
+    with cache.vectors_path.open("ab") as f:
+        f.write(b"\0" * 6)
+
+    repaired = EmbeddingCache(tmp_path, MODEL)
+    assert len(repaired) == 2
+    assert "k3" not in repaired
+    assert repaired.vectors_path.stat().st_size == 2 * 4 * 4
+    assert repaired.keys_path.read_text().split() == ["k1", "k2"]
+
+    repaired.put(["k3"], _vectors(1, start=9))
+    out = np.zeros((3, 4), dtype="float32")
+    assert EmbeddingCache(tmp_path, MODEL).fill(["k1", "k2", "k3"], out).all()
+    np.testing.assert_array_equal(out[2], _vectors(1, start=9)[0])
+
+
+def test_backends_use_separate_directories(tmp_path):
+    torch_cache = EmbeddingCache(tmp_path, MODEL)
+    int8_cache = EmbeddingCache(tmp_path, MODEL, backend="int8")
+    torch_cache.put(["k1"], _vectors(1))
+
+    assert torch_cache.path != int8_cache.path
+    assert len(EmbeddingCache(tmp_path, MODEL, backend="int8")) == 0
+
+
+def test_cache_owned_by_another_model_is_reset(tmp_path):
+    cache = EmbeddingCache(tmp_path, MODEL)
+    cache.put(["k1"], _vectors(1))
+    meta = json.loads(cache.meta_path.read_text())
+    cache.meta_path.write_text(json.dumps({**meta, "model_name": "other"}))
+
+    reset = EmbeddingCache(tmp_path, MODEL)
+    assert len(reset) == 0
+    assert not reset.vectors_path.exists()
+
+    reset.put(["k2"], _vectors(1, dimension=8))
+    assert EmbeddingCache(tmp_path, MODEL).dimension == 8
@@ -0,0 +1,136 @@
+import numpy as np
+import pytest
+
+from rag.retrieval.filters import RowGroups
+from rag.retrieval.store import FaissVectorStore
+
+pytest.importorskip("faiss")
+
+DIMENSION = 16
+
+
+def _corpus(num_documents: int = 20, chunks: int = 5):
+    metadatas = [
+        {
+            "chunk_id": f"d{d}-{i}",
+            "document_id": f"d{d}",
+            "source": "a.pdf" if d % 2 else "b.pdf",
+            "text": "",
+        }
+        for d in range(num_documents)
+        for i in range(chunks)
+    ]
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((len(metadatas), DIMENSION))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype("float32"), metadatas
+
+
+def _store(index_type: str, **params) -> FaissVectorStore:
+    vectors, metadatas = _corpus()
+    store = FaissVectorStore(DIMENSION, index_type=index_type, **params)
+    store.add(vectors, metadatas)
+    return store
+
+
+def test_row_groups_mask_combines_columns():
+    columns = {
+        "document_id": ["d1", "d1", "d2", "d3"],
+        "source": ["a", "a", "b", "a"],
+    }
+    groups = RowGroups(lambda name: iter(columns[name]))
+
+    assert groups.mask(4) is None
+    assert groups.mask(4, document_ids=["d1", "d3"]).tolist() == [
+        True, True, False, True,
+    ]
+    assert groups.mask(
+        4, document_ids=["d1", "d2"], sources=["b"]
+    ).tolist() == [False, False, True, False]
+    assert not groups.mask(4, document_ids=["missing"]).any()
+
+
+def test_row_groups_invalidate_rereads_columns():
+    values = ["d1"]
+    groups = RowGroups(lambda name: iter(values))
+    assert groups.mask(1, document_ids=["d1"]).tolist() == [True]
+
+    values[:] = ["d1", "d2"]
+    assert groups.mask(2, document_ids=["d2"]).tolist() == [False, False]
+    groups.invalidate()
+    assert groups.mask(2, document_ids=["d2"]).tolist() == [False, True]
+
+
+@pytest.mark.parametrize(
+    ("index_type", "params"),
+    [
+        ("flat", {}),
+        ("hnsw", {"hnsw_m": 8}),
+        ("ivf_flat", {"nlist": 4, "nprobe": 4}),
+    ],
+)
+@pytest.mark.parametrize(
+    "document_ids",
+    [
+        # Few rows: exact search over the subset (non-IVF)
+        ["d3"],
+        # Many rows: IDSelector bitmap inside FAISS
+        [f"d{d}" for d in range(0, 20, 2)],
+    ],
+)
+def test_filtered_search_returns_k_hits_from_subset(
+    index_type,
+    params,
+    document_ids,
+):
+    store = _store(index_type, **params)
+    vectors, _ = _corpus()
+    query = vectors[7]
+
+    hits = store.search(query, k=5, document_ids=document_ids)
+
+    assert len(hits) == 5
+    assert {hit.document_id for hit in hits} <= set(document_ids)
+    assert [hit.score for hit in hits] == sorted(
+        (hit.score for hit in hits), reverse=True
+    )
+    for hit in hits:
+        assert hit.metadata is store.metadata[hit.row]
+        assert hit.dense_score == hit.score
+
+
+def test_exact_subset_search_matches_brute_force():
+    store = _store("flat")
+    vectors, metadatas = _corpus()
+    query = vectors[0]
+
+    hits = store.search(query, k=3, document_ids=["d4", "d9"])
+
+    rows = [
+        row for row, meta in enumerate(metadatas)
+        if meta["document_id"] in ("d4", "d9")
+    ]
+    expected = sorted(rows, key=lambda row: -float(vectors[row] @ query))[:3]
+    assert [hit.row for hit in hits] == expected
+
+
+def test_filters_intersect_and_follow_removals():
+    store = _store("flat")
+    vectors, _ = _corpus()
+
+    hits = store.search(
+        vectors[0],
+        k=10,
+        document_ids=["d1", "d2"],
+        sources=["a.pdf"],
+    )
+    assert {hit.document_id for hit in hits} == {"d1"}
+    assert store.search(vectors[0], k=5, document_ids=["nope"]) == []
+
+    store.remove_documents({"d1"})
+    assert store.search(vectors[0], k=5, document_ids=["d1"]) == []
+    hits = store.search(vectors[0], k=5, document_ids=["d2"])
+    assert {hit.document_id for hit in hits} == {"d2"}
+    assert all(
+        store.metadata[hit.row]["document_id"] == "d2" for hit in hits
+    )
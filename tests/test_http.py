@@ -0,0 +1,69 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from rag.serving.http import RAGHTTPServer
+
+
+class FakeService:
+    def __init__(self) -> None:
+        self.calls: list[dict] = []
+
+    def search(self, question: str, **kwargs) -> list:
+        self.calls.append({"question": question, **kwargs})
+        return []
+
+
+@pytest.fixture
+def server():
+    service = FakeService()
+    server = RAGHTTPServer(("127.0.0.1", 0), service)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def _post(server: RAGHTTPServer, path: str, payload: dict) -> tuple[int, dict]:
+    host, port = server.server_address[:2]
+    request = urllib.request.Request(
+        f"http://{host}:{port}{path}",
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.loads(exc.read())
+
+
+def test_search_passes_numbers_through(server):
+    status, body = _post(server, "/search", {"question": "q", "k": "3"})
+
+    assert status == 200
+    assert body == {"results": []}
+    assert server.service.calls[0]["k"] == 3
+
+
+@pytest.mark.parametrize("k", [0, -2, "many"])
+def test_bad_k_is_a_client_error(server, k):
+    status, body = _post(server, "/search", {"question": "q", "k": k})
+
+    assert status == 400
+    assert "'k'" in body["error"]
+    assert server.service.calls == []
+
+
+def test_min_score_may_be_zero(server):
+    status, _ = _post(
+        server, "/search", {"question": "q", "min_score": 0}
+    )
+
+    assert status == 200
+    assert server.service.calls[0]["min_score"] == 0.0
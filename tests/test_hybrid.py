@@ -0,0 +1,113 @@
+import math
+
+import pytest
+
+from rag.models import SearchResult
+from rag.retrieval.hybrid import reciprocal_rank_fusion
+from rag.retrieval.lexical import BM25Index, tokenize
+
+
+def _record(chunk_id: str, text: str, document_id: str = "doc") -> dict:
+    return {
+        "chunk_id": chunk_id,
+        "document_id": document_id,
+        "source": f"{document_id}.pdf",
+        "text": text,
+    }
+
+
+def _dense(chunk_id: str, row: int, score: float) -> SearchResult:
+    return SearchResult(
+        row=row,
+        score=score,
+        metadata={"chunk_id": chunk_id},
+        dense_score=score,
+    )
+
+
+def _lexical(chunk_id: str, score: float) -> SearchResult:
+    return SearchResult(row=None, score=score, metadata={"chunk_id": chunk_id})
+
+
+@pytest.fixture
+def bm25(tmp_path):
+    BM25Index.build(
+        tmp_path,
+        [
+            _record("a", "the quick brown fox", "d1"),
+            _record("b", "the lazy dog sleeps all day", "d1"),
+            _record("c", "fox fox fox", "d2"),
+            _record("d", "nothing relevant here at all", "d2"),
+        ],
+    )
+    return BM25Index(tmp_path)
+
+
+def test_tokenize_casefolds_and_drops_punctuation():
+    assert tokenize("Hello, World! État") == ["hello", "world", "état"]
+
+
+def test_rrf_sums_reciprocal_ranks_and_sets_score():
+    fused = reciprocal_rank_fusion(
+        [
+            [_dense("a", 0, 0.9), _dense("b", 1, 0.8)],
+            [_lexical("b", 12.0), _lexical("c", 3.0)],
+        ],
+        rrf_k=60,
+    )
+
+    assert [item.chunk_id for item in fused] == ["b", "a", "c"]
+    assert fused[0].score == pytest.approx(1 / 62 + 1 / 61)
+    assert fused[1].score == pytest.approx(1 / 61)
+    assert fused[2].score == pytest.approx(1 / 62)
+
+
+def test_rrf_keeps_dense_record_for_chunks_found_by_both():
+    fused = reciprocal_rank_fusion(
+        [[_lexical("a", 5.0)], [_dense("a", 7, 0.4)]]
+    )
+
+    assert len(fused) == 1
+    assert fused[0].row == 7
+    assert fused[0].dense_score == 0.4
+
+
+def test_rrf_lexical_only_hits_have_no_row_or_dense_score():
+    fused = reciprocal_rank_fusion(
+        [[_dense("a", 0, 0.9)], [_lexical("z", 1.0)]]
+    )
+
+    lexical_only = next(item for item in fused if item.chunk_id == "z")
+    assert lexical_only.row is None
+    assert lexical_only.dense_score is None
+
+
+def test_bm25_ranks_by_term_frequency_and_idf(bm25):
+    results = bm25.search("fox", k=4)
+
+    assert [item.chunk_id for item in results] == ["c", "a"]
+    assert results[0].score > results[1].score > 0
+    assert all(item.row is None for item in results)
+    assert results[0].text == "fox fox fox"
+
+
+def test_bm25_score_matches_okapi_formula(bm25):
+    (result,) = bm25.search("lazy", k=1)
+
+    n, df, tf = 4, 1, 1
+    lengths = [4, 6, 3, 5]
+    avg_length = sum(lengths) / n
+    idf = math.log1p((n - df + 0.5) / (df + 0.5))
+    norm = bm25.k1 * (1 - bm25.b + bm25.b * lengths[1] / avg_length)
+    expected = idf * tf * (bm25.k1 + 1) / (tf + norm)
+
+    assert result.chunk_id == "b"
+    assert result.score == pytest.approx(expected, rel=1e-5)
+
+
+def test_bm25_unknown_terms_and_filters(bm25):
+    assert bm25.search("unicorn") == []
+    assert [
+        item.chunk_id for item in bm25.search("fox", document_ids=["d1"])
+    ] == ["a"]
+    assert bm25.search("fox", sources=["missing.pdf"]) == []
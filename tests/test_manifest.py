@@ -0,0 +1,95 @@
+import os
+
+from rag.ingestion.manifest import Manifest, file_hash
+
+
+def _pdf(directory, name: str, content: bytes):
+    path = directory / name
+    path.write_bytes(content)
+    return path
+
+
+def _recorded(directory) -> Manifest:
+    manifest = Manifest()
+    for path in sorted(directory.glob("*.pdf")):
+        manifest.record(path)
+    return manifest
+
+
+def test_new_files_are_added(tmp_path):
+    a = _pdf(tmp_path, "a.pdf", b"a")
+    _pdf(tmp_path, "notes.txt", b"ignored")
+
+    diff = Manifest().diff(tmp_path)
+
+    assert diff.added == [a]
+    assert not diff.changed and not diff.removed and not diff.unchanged
+    assert not diff.is_empty
+
+
+def test_recorded_files_are_unchanged(tmp_path):
+    _pdf(tmp_path, "a.pdf", b"a")
+    _pdf(tmp_path, "b.pdf", b"b")
+
+    diff = _recorded(tmp_path).diff(tmp_path)
+
+    assert diff.unchanged == ["a.pdf", "b.pdf"]
+    assert diff.is_empty
+
+
+def test_changed_and_removed_files(tmp_path):
+    a = _pdf(tmp_path, "a.pdf", b"a")
+    b = _pdf(tmp_path, "b.pdf", b"b")
+    manifest = _recorded(tmp_path)
+
+    a.write_bytes(b"a, edited")
+    b.unlink()
+    c = _pdf(tmp_path, "c.pdf", b"c")
+
+    diff = manifest.diff(tmp_path)
+
+    assert diff.added == [c]
+    assert diff.changed == [a]
+    assert diff.removed == ["b.pdf"]
+    assert diff.unchanged == []
+
+
+def test_touched_file_with_same_content_is_unchanged(tmp_path):
+    a = _pdf(tmp_path, "a.pdf", b"a")
+    manifest = _recorded(tmp_path)
+    stat = a.stat()
+    os.utime(a, (stat.st_atime, stat.st_mtime + 10))
+
+    diff = manifest.diff(tmp_path)
+
+    assert diff.unchanged == ["a.pdf"]
+    assert diff.is_empty
+    assert manifest.entries["a.pdf"].mtime == a.stat().st_mtime
+
+
+def test_same_size_edit_with_new_mtime_is_changed(tmp_path):
+    a = _pdf(tmp_path, "a.pdf", b"aaaa")
+    manifest = _recorded(tmp_path)
+    stat = a.stat()
+    a.write_bytes(b"bbbb")
+    os.utime(a, (stat.st_atime, stat.st_mtime + 10))
+
+    assert manifest.diff(tmp_path).changed == [a]
+
+
+def test_save_load_round_trip(tmp_path):
+    a = _pdf(tmp_path, "a.pdf", b"a")
+    manifest = Manifest()
+    manifest.record(a, document_id="doc-a")
+    path = tmp_path / "state" / "manifest.json"
+
+    manifest.save(path)
+    loaded = Manifest.load(path)
+
+    assert loaded.entries == manifest.entries
+    assert loaded.entries["a.pdf"].document_id == "doc-a"
+    assert loaded.entries["a.pdf"].sha256 == file_hash(a)
+    assert not path.with_suffix(".json.tmp").exists()
+    assert loaded.forget("a.pdf").document_id == "doc-a"
+    assert loaded.forget("a.pdf") is None
+    assert Manifest.load(tmp_path / "missing.json").entries == {}
@@ -0,0 +1,135 @@
+import pytest
+
+from rag.evaluation import runner as runner_module
+from rag.evaluation.runner import EvaluationRunner
+from rag.generation.answer_cache import AnswerCache
+from rag.generation.prompts import NOT_FOUND_ANSWER
+from rag.models import SearchResult
+
+
+class FakeLLM:
+    """Prompt sizing only; one token per whitespace-separated word."""
+
+    model_name = "fake-model"
+    cache_key = "fake-model"
+
+    def count_tokens(self, text: str) -> int:
+        return len(text.split())
+
+    def truncate_tokens(self, text: str, max_tokens: int) -> str:
+        return " ".join(text.split()[:max_tokens])
+
+    def context_token_budget(
+        self,
+        prompt_without_context: str,
+        *,
+        max_new_tokens: int,
+        cap: int = 0,
+    ) -> int:
+        return 1000
+
+
+def _runner() -> EvaluationRunner:
+    # Skip __init__: no store, embedder or LLM is needed for these paths
+    runner = EvaluationRunner.__new__(EvaluationRunner)
+    runner.retrieval_k = 8
+    runner.context_k = 4
+    runner.max_new_tokens = 16
+    runner.chunk_texts = {}
+    runner.llm = None
+    runner.answer_cache = None
+    runner.answer_one = lambda question: question.upper()
+    return runner
+
+
+def test_batched_fallback_reports_each_row_once():
+    runner = _runner()
+
+    def failing_retrieve(questions, *, rows=None):
+        raise RuntimeError("index offline")
+
+    runner.retrieve = failing_retrieve
+    reported: list[tuple[int, str]] = []
+
+    answers = runner.run_batched(
+        ["a", " ", "b", "c"],
+        done={3: "C"},
+        on_answer=lambda row, answer, seconds: reported.append((row, answer)),
+    )
+
+    assert answers == ["A", "", "B", "C"]
+    assert sorted(reported) == [(0, "A"), (1, ""), (2, "B")]
+
+
+def _hit(chunk_id: str, text: str) -> SearchResult:
+    return SearchResult(
+        row=0,
+        score=0.9,
+        metadata={"chunk_id": chunk_id, "text": text},
+        dense_score=0.9,
+    )
+
+
+@pytest.fixture
+def parallel_runner(tmp_path, monkeypatch):
+    runner = _runner()
+    runner.llm = FakeLLM()
+    runner.answer_cache = AnswerCache(tmp_path / "answers.sqlite")
+    retrieved = {0: [_hit("a", "alpha")], 1: [_hit("b", "beta")], 2: []}
+    runner.retrieve = lambda questions, *, rows=None: {
+        row: retrieved[row] for row in rows
+    }
+
+    dispatched: list[tuple[int, str]] = []
+
+    def fake_generate_parallel(tasks, **kwargs):
+        dispatched.extend(tasks)
+        for row, prompt in tasks:
+            yield row, f"generated {row}", "fake-model", 0.5, None
+
+    monkeypatch.setattr(
+        runner_module, "generate_parallel", fake_generate_parallel
+    )
+    runner.dispatched = dispatched
+    yield runner
+    runner.answer_cache.close()
+
+
+def test_parallel_answers_cache_hits_before_dispatch(parallel_runner):
+    runner = parallel_runner
+    cached_prompt = runner._build_prompt("q0", [_hit("a", "alpha")])
+    runner.answer_cache.put("fake-model", cached_prompt, 16, "cached 0")
+    reported: dict[int, str] = {}
+
+    answers = runner.run_parallel(
+        ["q0", "q1", "q2"],
+        workers=2,
+        on_answer=lambda row, answer, seconds: reported.update({row: answer}),
+    )
+
+    assert answers == ["cached 0", "generated 1", NOT_FOUND_ANSWER]
+    assert reported == {
+        0: "cached 0",
+        1: "generated 1",
+        2: NOT_FOUND_ANSWER,
+    }
+    assert [row for row, _prompt in runner.dispatched] == [1]
+
+    # New answers are written back by the parent
+    prompt = runner.dispatched[0][1]
+    assert runner.answer_cache.get("fake-model", prompt, 16) == "generated 1"
+
+
+def test_parallel_skips_workers_when_everything_is_cached(parallel_runner):
+    runner = parallel_runner
+    hits = {"q0": _hit("a", "alpha"), "q1": _hit("b", "beta")}
+    for question, hit in hits.items():
+        prompt = runner._build_prompt(question, [hit])
+        runner.answer_cache.put(
+            "fake-model", prompt, 16, f"cached {question}"
+        )
+
+    answers = runner.run_parallel(["q0", "q1"], workers=2)
+
+    assert answers == ["cached q0", "cached q1"]
+    assert runner.dispatched == []
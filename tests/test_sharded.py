@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+
+from rag.retrieval.sharded import ShardedVectorStore
+from rag.retrieval.store import FaissVectorStore
+
+pytest.importorskip("faiss")
+
+DIMENSION = 8
+
+# (document_id, chunks)
+DOCUMENTS = [("d0", 2), ("d1", 1), ("d2", 3), ("d3", 1)]
+
+
+def _corpus() -> tuple[np.ndarray, list[dict[str, str]]]:
+    metadatas = [
+        {
+            "chunk_id": f"{document_id}-{i}",
+            "document_id": document_id,
+            "source": f"{document_id}.pdf",
+            "text": f"chunk {i} of {document_id}",
+        }
+        for document_id, count in DOCUMENTS
+        for i in range(count)
+    ]
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((len(metadatas), DIMENSION))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype("float32"), metadatas
+
+
+@pytest.fixture
+def corpus():
+    return _corpus()
+
+
+@pytest.fixture
+def sharded(corpus):
+    vectors, metadatas = corpus
+    store = ShardedVectorStore(DIMENSION, shard_size=2, search_threads=2)
+    store.add(vectors, metadatas)
+    return store
+
+
+def test_documents_stay_in_one_shard(sharded):
+    owners = {}
+    for shard in sharded._shards:
+        for document_id in shard.document_ids:
+            assert document_id not in owners
+            owners[document_id] = shard.name
+
+    assert sharded.num_shards == 3
+    assert sharded.ntotal == 7
+    assert owners["d0"] != owners["d2"]
+
+
+def test_merge_matches_single_store(corpus, sharded):
+    vectors, metadatas = corpus
+    single = FaissVectorStore(DIMENSION)
+    single.add(vectors, metadatas)
+
+    queries = vectors[[0, 3, 6]] + 0.01
+    for merged, expected in zip(
+        sharded.search_batch(queries, k=4),
+        single.search_batch(queries, k=4),
+    ):
+        assert [hit.chunk_id for hit in merged] == [
+            hit.chunk_id for hit in expected
+        ]
+        assert [hit.score for hit in merged] == pytest.approx(
+            [hit.score for hit in expected], abs=1e-5
+        )
+
+
+def test_rows_are_offset_by_preceding_shards(corpus, sharded):
+    vectors, metadatas = corpus
+    # Shard order is document order here, so global rows match the input
+    for row in range(len(vectors)):
+        (hit,) = sharded.search(vectors[row], k=1)
+        assert hit.row == row
+        assert hit.chunk_id == metadatas[row]["chunk_id"]
+
+
+def test_document_filter_skips_other_shards(corpus, sharded, tmp_path):
+    vectors, _ = corpus
+    sharded.save(tmp_path)
+    reopened = ShardedVectorStore.load(tmp_path, lazy=True)
+
+    hits = reopened.search(vectors[0], k=5, document_ids=["d3"])
+
+    assert [hit.chunk_id for hit in hits] == ["d3-0"]
+    assert hits[0].row == 6
+    loaded = [shard.store is not None for shard in reopened._shards]
+    assert loaded == [False, False, True]
+
+
+def test_save_load_and_remove(corpus, sharded, tmp_path):
+    vectors, _ = corpus
+    sharded.save(tmp_path)
+
+    reopened = ShardedVectorStore.load(tmp_path, lazy=False)
+    assert reopened.ntotal == 7
+    assert reopened.remove_documents({"d0", "d1"}) == 3
+    reopened.save(tmp_path)
+
+    final = ShardedVectorStore.load(tmp_path)
+    assert final.num_shards == 2
+    assert final.ntotal == 4
+    (hit,) = final.search(vectors[3], k=1)
+    assert hit.chunk_id == "d2-0"
+    assert hit.row == 0
+
+
+def test_close_stops_search_threads(corpus):
+    vectors, metadatas = corpus
+    with ShardedVectorStore(DIMENSION, shard_size=2) as store:
+        store.add(vectors, metadatas)
+        assert store.search(vectors[0], k=1)[0].row == 0
+
+    with pytest.raises(RuntimeError):
+        store.search(vectors[0], k=1)
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from rag.retrieval.store import FaissVectorStore
+
+pytest.importorskip("faiss")
+
+DIMENSION = 8
+
+
+def _batch(document_ids: list[str], seed: int):
+    metadatas = [
+        {
+            "chunk_id": f"{document_id}-{i}",
+            "document_id": document_id,
+            "source": f"{document_id}.pdf",
+            "text": f"chunk {i} of {document_id}",
+        }
+        for document_id in document_ids
+        for i in range(2)
+    ]
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((len(metadatas), DIMENSION))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype("float32"), metadatas
+
+
+def _chunk_ids(store: FaissVectorStore) -> list[str]:
+    return [store.metadata[row]["chunk_id"] for row in range(store.ntotal)]
+
+
+@pytest.fixture(params=["flat", "ivf_flat", "hnsw"])
+def saved(request, tmp_path):
+    store = FaissVectorStore(DIMENSION, index_type=request.param, nlist=2)
+    store.add(*_batch(["d0", "d1", "d2", "d3", "d4"], seed=0))
+    store.save(tmp_path)
+    return tmp_path
+
+
+def test_update_is_invisible_on_disk_until_save(saved):
+    before = _chunk_ids(FaissVectorStore.load(saved))
+
+    store = FaissVectorStore.load(saved)
+    assert store.remove_documents({"d1"}) == 2
+    store.add(*_batch(["d5"], seed=1))
+
+    # Interrupted before save: the old store still loads
+    reopened = FaissVectorStore.load(saved)
+    assert _chunk_ids(reopened) == before
+
+    store.save(saved)
+    reopened = FaissVectorStore.load(saved)
+    expected = [cid for cid in before if not cid.startswith("d1-")]
+    assert _chunk_ids(reopened) == expected + ["d5-0", "d5-1"]
+    assert not list(saved.glob("*.pending")) + list(saved.glob("*.tmp"))
+
+
+def test_rows_stay_aligned_after_update(saved):
+    store = FaissVectorStore.load(saved)
+    store.remove_documents({"d0", "d3"})
+    vectors, metadatas = _batch(["d6"], seed=2)
+    store.add(vectors, metadatas)
+    store.save(saved)
+
+    reopened = FaissVectorStore.load(saved)
+    for vector, meta in zip(vectors, metadatas):
+        (hit,) = reopened.search(vector, k=1)
+        assert hit.chunk_id == meta["chunk_id"]
+        assert hit.text == meta["text"]
+
+
+def test_save_elsewhere_leaves_source_untouched(saved, tmp_path_factory):
+    before = _chunk_ids(FaissVectorStore.load(saved))
+    target = tmp_path_factory.mktemp("copy")
+
+    store = FaissVectorStore.load(saved)
+    store.remove_documents({"d2"})
+    store.save(target)
+
+    assert _chunk_ids(FaissVectorStore.load(saved)) == before
+    assert not list(saved.glob("*.pending"))
+    assert "d2-0" not in _chunk_ids(FaissVectorStore.load(target))
+    assert store.metadata.path == target
+
+
+def test_sharded_save_elsewhere_leaves_source_shards_untouched(
+    tmp_path_factory,
+):
+    from rag.retrieval.sharded import ShardedVectorStore
+
+    source = tmp_path_factory.mktemp("source")
+    target = tmp_path_factory.mktemp("target")
+    with ShardedVectorStore(DIMENSION, shard_size=4) as store:
+        store.add(*_batch(["d0", "d1", "d2", "d3"], seed=0))
+        store.save(source)
+
+    with ShardedVectorStore.load(source, lazy=False) as store:
+        store.remove_documents({"d0", "d2"})
+        store.save(target)
+
+    with ShardedVectorStore.load(source, lazy=False) as reopened:
+        assert reopened.ntotal == 8
+    with ShardedVectorStore.load(target, lazy=False) as copied:
+        assert copied.ntotal == 4